@@ -0,0 +1,52 @@
+"""
+Extracción masiva en modo batch contra un servidor local que emula la Batch API.
+
+Scrapea el corpus desde el servidor HTTP local, serializa todas las peticiones de
+chunks en JSONL, envía el batch, espera a que termine y fusiona los resultados por
+sitio según llegan.
+
+Uso:
+    python -m benchmarks.bench_batch_mode --sites 20 --batch-delay 2
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from benchmarks.corpus import load_corpus
+from benchmarks.fake_openai_server import serve_openai
+from benchmarks.local_server import serve_pages
+from src.features.content_processor import ContentProcessor
+from src.features.scraper import Scraper
+from src.models.batch_handler import OpenAIBatchHandler
+from src.models.openai_handler import OpenAIHandler
+from src.utils.token_cost_calculator import TokenCostCalculator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sites", type=int, default=20)
+    parser.add_argument("--batch-delay", type=float, default=2.0)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    os.environ.setdefault("OPENAI_API_KEY", "sk-local")
+    pages = {f"/{name}": html for name, html in load_corpus(args.sites).items()}
+
+    with serve_pages(pages) as web, serve_openai(batch_delay=args.batch_delay) as api:
+        handler = OpenAIHandler(base_url=api.base_url)
+        processor = ContentProcessor(handler, TokenCostCalculator())
+        batch_handler = OpenAIBatchHandler(handler, poll_interval=args.poll_interval)
+        urls = {web.base_url + path: path.lstrip("/") for path in pages}
+        scraped = {urls[result["url"]]: result["content"] for result in Scraper().scrape_all(urls)}
+
+        start = time.perf_counter()
+        requests_path = os.path.join(tempfile.mkdtemp(), "batch_requests.jsonl")
+        for site_name, result in processor.extract_batch(scraped, batch_handler, requests_path):
+            print(f"{time.perf_counter() - start:6.2f}s {site_name}: {result}")
+
+
+if __name__ == "__main__":
+    main()
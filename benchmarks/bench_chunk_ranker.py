@@ -0,0 +1,78 @@
+"""
+Benchmark de la selección de chunks por relevancia (ChunkRanker).
+
+Extrae los precios de páginas sintéticas con y sin ChunkRanker usando
+FakeOpenAIHandler sin latencia, y compara los tokens enviados al LLM, el número de
+llamadas y si el resultado fusionado es idéntico. Se desactiva el filtro de
+regiones de precios del HtmlReducer para reproducir el caso en que no puede
+aislarlas (contenido markdown de Jina AI, páginas sin patrones reconocibles) y la
+página entera llega al chunking.
+
+Requiere el tokenizador cl100k_base de tiktoken en su caché local
+(TIKTOKEN_CACHE_DIR) si se ejecuta sin red.
+
+Uso:
+    python -m benchmarks.bench_chunk_ranker --sites 20 --top-k 3 --max-chunk-tokens 1000
+"""
+import argparse
+import logging
+import time
+from typing import Any, Callable, Dict, List
+
+from benchmarks.corpus import load_corpus
+from benchmarks.fakes import FakeOpenAIHandler
+from src.features.chunk_ranker import ChunkRanker
+from src.features.content_processor import ContentProcessor
+from src.features.html_reducer import HtmlReducer
+from src.utils.metrics import metrics
+from src.utils.rate_limiter import RateLimiter
+from src.utils.token_cost_calculator import TokenCostCalculator
+
+
+class CountingHandler(FakeOpenAIHandler):
+    """FakeOpenAIHandler sin latencia que cuenta los tokens de los chunks recibidos."""
+
+    def __init__(self, calculator: TokenCostCalculator):
+        super().__init__(latency=0.0, jitter=0.0)
+        self.calculator = calculator
+        self.prompt_tokens = 0
+
+    def get_completion(self, messages: List[Dict[str, str]], before_request: Callable[[], Any] | None = None) -> str:
+        with self._lock:
+            self.prompt_tokens += self.calculator.count_tokens(messages[-1]["content"])
+        return super().get_completion(messages, before_request)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sites", type=int, default=20)
+    parser.add_argument("--filler-blocks", type=int, default=80)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--max-chunk-tokens", type=int, default=1000)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    pages = load_corpus(args.sites, filler_blocks=args.filler_blocks)
+    calculator = TokenCostCalculator()
+    results = {}
+    for label, ranker in (("todos los chunks", None), (f"top-{args.top_k}", ChunkRanker(top_k=args.top_k))):
+        handler = CountingHandler(calculator)
+        processor = ContentProcessor(handler, calculator, max_chunk_tokens=args.max_chunk_tokens,
+                                     rate_limiter=RateLimiter(10_000, 10**9),
+                                     reducer=HtmlReducer(pricing_only=False), chunk_ranker=ranker)
+        metrics.reset()
+        start = time.perf_counter()
+        outputs = {name: processor.extract(html) for name, html in pages.items()}
+        elapsed = time.perf_counter() - start
+        saved = sum(count["value"] for count in metrics.run_summary()["counters"].get("tokens_saved_total", []))
+        results[label] = outputs
+        print(f"{label:<18} {handler.calls:>5} llamadas al LLM  {handler.prompt_tokens:>9} tokens enviados  "
+              f"{saved:>9.0f} tokens ahorrados  {elapsed:7.2f}s")
+
+    baseline, ranked = results.values()
+    same = sum(baseline[name] == ranked[name] for name in pages)
+    print(f"resultados idénticos: {same}/{len(pages)}")
+
+
+if __name__ == "__main__":
+    main()
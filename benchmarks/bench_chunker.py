@@ -0,0 +1,66 @@
+"""
+Micro-benchmark del chunker por tokens frente al antiguo chunker por palabras.
+
+Mide tiempo, pico de memoria (tracemalloc) y el tamaño real en tokens del mayor
+chunk sobre páginas de varios MB. Requiere el tokenizador cl100k_base de tiktoken.
+
+Uso:
+    python -m benchmarks.bench_chunker --sizes 1 4 --max-tokens 4000
+"""
+import argparse
+import logging
+import time
+import tracemalloc
+from typing import Callable, List
+
+from benchmarks.corpus import make_large_page
+from src.utils.token_chunker import TokenChunker
+from src.utils.token_cost_calculator import TokenCostCalculator
+
+
+def word_chunker(content: str, max_tokens: int) -> List[str]:
+    """Réplica del chunker original, que contaba palabras en lugar de tokens."""
+    words = content.split()
+    chunks, current = [], []
+    for word in words:
+        if len(current) + 1 > max_tokens:
+            chunks.append(' '.join(current))
+            current = []
+        current.append(word)
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
+
+
+def measure(name: str, chunker: Callable[[], List[str]], tokenizer) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    chunks = chunker()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    largest = max(len(tokenizer.encode(chunk, disallowed_special=())) for chunk in chunks)
+    print(f"  {name:<12} {elapsed:8.3f}s  pico={peak / 2 ** 20:8.1f} MiB  "
+          f"chunks={len(chunks):5d}  mayor chunk={largest} tokens")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 4], help="Tamaños de página en MB")
+    parser.add_argument("--max-tokens", type=int, default=4000)
+    parser.add_argument("--overlap", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    tokenizer = TokenCostCalculator().tokenizer
+    chunker = TokenChunker(tokenizer, args.max_tokens, args.overlap)
+
+    for size in args.sizes:
+        page = make_large_page(int(size * 2 ** 20))
+        print(f"página de {len(page) / 2 ** 20:.1f} MB, max_tokens={args.max_tokens}")
+        measure("palabras", lambda: word_chunker(page, args.max_tokens), tokenizer)
+        measure("tokens", lambda: list(chunker.iter_chunks(page)), tokenizer)
+
+
+if __name__ == "__main__":
+    main()
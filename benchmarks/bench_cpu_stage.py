@@ -0,0 +1,91 @@
+"""
+Benchmark de escalado de la etapa de CPU (parseo, limpieza, chunking y conteo de tokens).
+
+Prepara las páginas del corpus offline en serie en el proceso principal
+(ContentProcessor.prepare_content + chunk_content), con un pool de hilos
+(limitado por el GIL) y con CpuStage para distintos números de procesos. CpuStage
+se mide por los dos caminos de producción: en lotes de batch_size con
+submit_batch, como los envía BatchRunner, y página a página con prepare, como
+prepara ContentProcessor.extract las páginas que no le llegan preparadas (desde
+tantos hilos como núcleos). Informa de páginas/s, aceleración frente a un proceso
+y eficiencia por núcleo, y comprueba que el contenido reducido y los chunks son
+idénticos en todos los casos. El arranque del pool no se mide.
+
+Requiere el tokenizador cl100k_base de tiktoken en su caché local
+(TIKTOKEN_CACHE_DIR) si se ejecuta sin red.
+
+Uso:
+    python -m benchmarks.bench_cpu_stage --pages 400 --workers 1 2 4 8 --batch-size 8
+"""
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from benchmarks.corpus import load_corpus
+from src.features.content_processor import ContentProcessor
+from src.features.cpu_stage import CpuStage
+from src.utils.token_cost_calculator import TokenCostCalculator
+
+Prepared = Tuple[str, List[str]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--filler-blocks", type=int, default=50)
+    parser.add_argument("--max-chunk-tokens", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=None,
+                        help="Números de procesos a medir (por defecto, potencias de 2 hasta los núcleos)")
+    parser.add_argument("--batch-size", type=int, default=8, help="Páginas por envío al pool, como en BatchRunner")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    cores = os.cpu_count() or 1
+    workers = args.workers or [n for n in (1, 2, 4, 8, 16, 32, 64) if n < cores] + [cores]
+    pages = list(load_corpus(args.pages, filler_blocks=args.filler_blocks).values())
+    processor = ContentProcessor(None, TokenCostCalculator(), max_chunk_tokens=args.max_chunk_tokens)
+
+    def prepare(content: str) -> Prepared:
+        reduced = processor.prepare_content(content)
+        return reduced, processor.chunk_content(reduced)
+
+    start = time.perf_counter()
+    expected = [prepare(content) for content in pages]
+    serial = time.perf_counter() - start
+    print(f"{cores} núcleos, {len(pages)} páginas")
+    print(f"{'serie (1 hilo)':<22} {len(pages) / serial:9.1f} páginas/s")
+
+    with ThreadPoolExecutor(max_workers=cores) as executor:
+        start = time.perf_counter()
+        list(executor.map(prepare, pages))
+        threaded = time.perf_counter() - start
+    print(f"{f'hilos ({cores})':<22} {len(pages) / threaded:9.1f} páginas/s")
+
+    baseline = None
+    for count in workers:
+        with CpuStage(count, max_chunk_tokens=args.max_chunk_tokens, reducer=processor.reducer,
+                      batch_size=args.batch_size) as stage:
+            # Arranque del pool e inicialización del tokenizador en cada proceso
+            list(stage.prepare_many(pages[:count * stage.batch_size]))
+            start = time.perf_counter()
+            batches = [stage.submit_batch(pages[i:i + stage.batch_size])
+                       for i in range(0, len(pages), stage.batch_size)]
+            prepared = [page for batch in batches for page in batch.result()]
+            elapsed = time.perf_counter() - start
+            with ThreadPoolExecutor(max_workers=cores) as executor:
+                start = time.perf_counter()
+                single = list(executor.map(stage.prepare, pages))
+                single_elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        identical = all((page.content, page.chunks) == (other.content, other.chunks) == reference
+                        for page, other, reference in zip(prepared, single, expected))
+        print(f"{f'CpuStage ({count} proc.)':<22} {len(pages) / elapsed:9.1f} páginas/s en lotes de "
+              f"{stage.batch_size}, {len(pages) / single_elapsed:.1f} de una en una  "
+              f"x{baseline / elapsed:5.2f}  eficiencia {baseline / elapsed / count:5.0%}  "
+              f"{'idéntico' if identical else 'DIFERENTE'}")
+
+if __name__ == "__main__":
+    main()
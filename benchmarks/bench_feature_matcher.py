@@ -0,0 +1,110 @@
+"""
+Benchmark del emparejamiento de características de Evaluator._compare_results.
+
+Compara los bucles anidados originales (subcadenas en minúsculas, O(esperadas ×
+generadas) por tier) con FeatureMatcher tal y como lo usa Evaluator: las
+características del golden set se preparan una vez (FeatureMatcher.index) y se
+reutilizan en cada evaluación del mismo golden set (otro modelo, otro prompt...).
+Cada página redacta las características a su manera: igual que el golden set,
+con guiones o con palabras añadidas, y con algunas características extra tomadas
+de un catálogo común. En cada evaluación el LLM copia de la página un subconjunto
+al azar de ellas. Se informa del tiempo de preparación, de la primera evaluación
+(en la que ningún texto generado se ha visto antes) y de las siguientes, y se
+comprueba que el resultado coincide con el de FeatureMatcher.match sobre las
+listas sin índice.
+
+Uso:
+    python -m benchmarks.bench_feature_matcher --sites 300 --features 10 60 --runs 5
+"""
+import argparse
+import random
+import time
+
+from src.utils.feature_matcher import FeatureMatcher, normalize, prepare
+
+WORDS = ("unlimited", "lessons", "learners", "analytics", "custom", "domain", "support", "priority", "export",
+         "scorm", "branding", "team", "workspace", "ai", "assistant", "multi", "language", "logo", "sso",
+         "reports", "api", "access", "storage", "templates", "integrations", "review", "comments")
+
+
+def make_catalog(rng: random.Random, size: int):
+    return [" ".join(rng.sample(WORDS, rng.randint(2, 5))).capitalize() for _ in range(size)]
+
+
+def make_page(rng: random.Random, catalog, expected):
+    page = []
+    for feature in expected:
+        variant = rng.random()
+        if variant < 0.35:
+            page.append(feature.replace(" ", "-", 1))
+        elif variant < 0.6:
+            page.append(feature + " included")
+        else:
+            page.append(feature)
+    return page + rng.sample(catalog, len(expected) // 5)
+
+
+def make_generated(rng: random.Random, page):
+    generated = [feature for feature in page if rng.random() < 0.8]
+    rng.shuffle(generated)
+    return list(dict.fromkeys(generated))
+
+
+def legacy_match(expected, generated):
+    matched = sum(1 for e in expected if any(e.lower() in g.lower() for g in generated))
+    extra = sum(1 for g in generated if not any(e.lower() in g.lower() for e in expected))
+    return matched, extra
+
+
+def run(features: int, args):
+    rng = random.Random(features)
+    catalog = make_catalog(rng, args.catalog)
+    golden = [list(dict.fromkeys(rng.sample(catalog, features))) for _ in range(args.sites * 3)]
+    pages = [make_page(rng, catalog, expected) for expected in golden]
+    runs = [[make_generated(rng, page) for page in pages] for _ in range(args.runs)]
+    total = sum(len(expected) for expected in golden) * args.runs
+    prepare.cache_clear()
+    normalize.cache_clear()
+
+    start = time.perf_counter()
+    legacy = [[legacy_match(expected, generated) for expected, generated in zip(golden, tiers)] for tiers in runs]
+    legacy_time = time.perf_counter() - start
+
+    matcher = FeatureMatcher()
+    start = time.perf_counter()
+    indexes = [matcher.index(expected) for expected in golden]
+    index_time = time.perf_counter() - start
+    current, run_times = [], []
+    for tiers in runs:
+        start = time.perf_counter()
+        current.append([matcher.match(index, generated) for index, generated in zip(indexes, tiers)])
+        run_times.append(time.perf_counter() - start)
+    current_time = index_time + sum(run_times)
+
+    reference = [[matcher.match(expected, generated) for expected, generated in zip(golden, tiers)] for tiers in runs]
+    legacy_matched = sum(m for results in legacy for m, _ in results)
+    matched = sum(len(r["matched"]) for results in current for r in results)
+    print(f"{features} características por tier: {len(golden)} tiers × {args.runs} evaluaciones")
+    print(f"  original        {legacy_time:7.2f}s  ({legacy_time / args.runs:.2f}s por evaluación)  "
+          f"coincidencias={legacy_matched / total:.1%}")
+    print(f"  FeatureMatcher  {current_time:7.2f}s  (índices {index_time:.2f}s, primera evaluación "
+          f"{run_times[0]:.2f}s, siguientes {sum(run_times[1:]) / max(1, len(run_times) - 1):.2f}s)  "
+          f"coincidencias={matched / total:.1%}")
+    print(f"  x{legacy_time / current_time:.2f} frente al original; "
+          f"idéntico sin índice: {current == reference}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sites", type=int, default=300)
+    parser.add_argument("--features", type=int, nargs="+", default=[10, 60],
+                        help="Características esperadas por tier (uno o varios tamaños)")
+    parser.add_argument("--runs", type=int, default=5, help="Evaluaciones del mismo golden set")
+    parser.add_argument("--catalog", type=int, default=5000, help="Características distintas en el portfolio")
+    args = parser.parse_args()
+    for features in args.features:
+        run(features, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark de los backends de parseo de HTML sobre el corpus de páginas de precios.
+
+Para cada backend instalado mide el tiempo de extracción de texto de HtmlReducer
+y el pico de memoria residente, cada uno en un proceso nuevo para que las medidas
+no se contaminen entre sí. También comprueba que todos los backends producen
+exactamente el mismo texto. Las páginas guardadas en `benchmarks/pages/` se
+añaden al corpus sintético.
+
+Uso:
+    python -m benchmarks.bench_html_parsers --pages 50 --repeat 3
+"""
+import argparse
+import hashlib
+import logging
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any
+
+from benchmarks.corpus import load_corpus
+from src.features.html_reducer import HtmlReducer
+from src.utils.html_parser import available_parsers
+
+
+def run_backend(parser: str, pages: int, repeat: int) -> Dict[str, Any]:
+    logging.disable(logging.CRITICAL)
+    corpus = list(load_corpus(pages).values())
+    reducer = HtmlReducer(pricing_only=False, parser=parser)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    digest = hashlib.sha256()
+    start = time.perf_counter()
+    for i in range(repeat):
+        for page in corpus:
+            text = reducer.to_text(page)
+            if i == 0:
+                digest.update(text.encode("utf-8"))
+    elapsed = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "parser": parser,
+        "per_page_ms": elapsed * 1000 / (repeat * len(corpus)),
+        "peak_rss_delta_mib": (rss_after - rss_before) / 1024,
+        "digest": digest.hexdigest(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = []
+    for backend in available_parsers():
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results.append(executor.submit(run_backend, backend, args.pages, args.repeat).result())
+
+    baseline = next(r for r in results if r["parser"] == "html.parser")
+    for r in results:
+        same = "sí" if r["digest"] == baseline["digest"] else "NO"
+        print(f"{r['parser']:<12} {r['per_page_ms']:8.2f} ms/página  "
+              f"pico RSS +{r['peak_rss_delta_mib']:6.1f} MiB  "
+              f"x{baseline['per_page_ms'] / r['per_page_ms']:.1f}  mismo texto: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Benchmark de la etapa de reducción de HTML.
+
+Informa, por página del corpus, de los tokens antes y después de la reducción y
+del tiempo empleado. Requiere el tokenizador cl100k_base de tiktoken.
+
+Uso:
+    python -m benchmarks.bench_html_reducer --pages 20
+"""
+import argparse
+import logging
+import statistics
+import time
+
+from benchmarks.corpus import load_corpus
+from src.features.html_reducer import HtmlReducer
+from src.utils.token_cost_calculator import TokenCostCalculator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--full-text", action="store_true", help="No recortar a las regiones de precios")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    calculator = TokenCostCalculator()
+    reducer = HtmlReducer(pricing_only=not args.full_text)
+
+    ratios = []
+    for name, page in load_corpus(args.pages).items():
+        start = time.perf_counter()
+        report = reducer.reduce_with_report(page, calculator)
+        elapsed = time.perf_counter() - start
+        ratios.append(report["ratio"])
+        print(f"{name:<24} {report['original_tokens']:>8} -> {report['reduced_tokens']:>6} tokens "
+              f"(x{report['ratio']:.1f}) en {elapsed * 1000:.1f} ms")
+    print(f"reducción mediana: x{statistics.median(ratios):.1f}")
+
+
+if __name__ == "__main__":
+    main()
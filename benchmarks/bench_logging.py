@@ -0,0 +1,98 @@
+"""
+Benchmark del coste de log_operation sobre funciones que reciben páginas enteras.
+
+Compara el decorador original (que formatea todos los argumentos en cada llamada)
+con el actual: con el nivel activo, con el nivel desactivado, con muestreo y con el
+handler asíncrono basado en cola. El log se escribe en un fichero temporal.
+
+Uso:
+    python -m benchmarks.bench_logging --calls 2000 --arg-kb 512
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+from functools import wraps
+
+from src.utils import loggingDecorator
+from src.utils.loggingDecorator import enable_async_logging, log_operation
+
+bench_logger = logging.getLogger("benchmarks.logging")
+
+
+def legacy_log_operation(func):
+    """Réplica del decorador original."""
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        bench_logger.info(f"Ejecutando {func.__name__} con args: {args}, kwargs: {kwargs}")
+        result = func(self, *args, **kwargs)
+        bench_logger.info(f"{func.__name__} completado")
+        return result
+    return wrapper
+
+
+class Target:
+    def plain(self, content):
+        return len(content)
+
+    @legacy_log_operation
+    def legacy(self, content):
+        return len(content)
+
+    @log_operation
+    def current(self, content):
+        return len(content)
+
+    @log_operation(level=logging.DEBUG)
+    def debug_level(self, content):
+        return len(content)
+
+    @log_operation(sample_rate=100)
+    def sampled(self, content):
+        return len(content)
+
+
+def timed(method, content, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        method(content)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--arg-kb", type=int, default=512)
+    args = parser.parse_args()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    log_path = os.path.join(tempfile.mkdtemp(), "bench.log")
+    root.addHandler(logging.FileHandler(log_path))
+    root.setLevel(logging.INFO)
+    loggingDecorator.logger.setLevel(logging.INFO)
+
+    content = "<div>$10 / month</div>" * (args.arg_kb * 1024 // 22)
+    target = Target()
+    baseline = timed(target.plain, content, args.calls)
+    rows = [
+        ("sin decorador", baseline),
+        ("original", timed(target.legacy, content, max(1, args.calls // 20))),
+        ("actual (INFO)", timed(target.current, content, args.calls)),
+        ("actual (DEBUG desactivado)", timed(target.debug_level, content, args.calls)),
+        ("actual (muestreo 1/100)", timed(target.sampled, content, args.calls)),
+    ]
+    listener = enable_async_logging()
+    rows.append(("actual (INFO, handler asíncrono)", timed(target.current, content, args.calls)))
+    listener.stop()
+
+    print(f"argumento de {len(content) / 1024:.0f} KiB, {args.calls} llamadas")
+    for name, micros in rows:
+        print(f"  {name:<34} {micros:10.1f} µs/llamada  (+{micros - baseline:.1f} µs)")
+    print(f"tamaño del log: {os.path.getsize(log_path) / 2 ** 20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark extremo a extremo del pipeline sin red ni coste de API.
+
+Sirve las páginas del corpus desde un servidor HTTP local y sustituye OpenAIHandler
+por FakeOpenAIHandler (latencia y tasa de errores configurables). Ejecuta
+scrape → reducción → chunking → extracción → fusión sobre N sitios sintéticos e
+informa de sitios/s, latencia por sitio p50/p95/p99, pico de RSS y latencia por
+etapa. Con --rules se activa la extracción por reglas antes del LLM y con --pack
+los sitios pequeños se agrupan en una sola petición (RequestPacker). Con
+--cpu-workers las reglas, la reducción, el chunking y el conteo de tokens se hacen en
+un pool de procesos (CpuStage). Con --json se guarda el informe para compararlo entre
+versiones.
+
+Requiere el tokenizador cl100k_base de tiktoken en su caché local
+(TIKTOKEN_CACHE_DIR) si se ejecuta sin red.
+
+Uso:
+    python -m benchmarks.bench_pipeline --sites 50 --llm-latency 0.3 --error-rate 0.05
+"""
+import argparse
+import asyncio
+import json
+import logging
+import resource
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from benchmarks.corpus import load_corpus
+from benchmarks.fakes import FakeOpenAIHandler
+from benchmarks.local_server import serve_pages
+from src.features.content_processor import ContentProcessor
+from src.features.cpu_stage import CpuStage
+from src.features.request_packer import RequestPacker
+from src.features.rule_extractor import RuleBasedExtractor
+from src.features.scraper import Scraper
+from src.utils.metrics import metrics, percentile
+from src.utils.rate_limiter import RateLimiter
+from src.utils.token_cost_calculator import TokenCostCalculator
+
+
+async def run_pipeline(urls: List[str], processor: ContentProcessor, scraper: Scraper,
+                       site_workers: int, scrape_concurrency: int) -> List[Dict[str, Any]]:
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=site_workers)
+
+    def extract(result: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        with metrics.span("site", url=result["url"]):
+            output = json.loads(processor.extract(result["content"]))
+        return {"url": result["url"], "latency": result["elapsed"] + time.perf_counter() - start,
+                "error": "error" in output}
+
+    pending = []
+    async for result in scraper.scrape_many(urls, max_concurrency=scrape_concurrency,
+                                            per_host_limit=scrape_concurrency):
+        if result["error"]:
+            pending.append(asyncio.sleep(0, {"url": result["url"], "latency": result["elapsed"], "error": True}))
+        else:
+            pending.append(loop.run_in_executor(executor, extract, result))
+    results = await asyncio.gather(*pending)
+    executor.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sites", type=int, default=50)
+    parser.add_argument("--web-latency", type=float, default=0.1)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--site-workers", type=int, default=8)
+    parser.add_argument("--scrape-concurrency", type=int, default=16)
+    parser.add_argument("--rules", action="store_true",
+                        help="Extraer por reglas antes del LLM (RuleBasedExtractor)")
+    parser.add_argument("--pack", action="store_true",
+                        help="Agrupar los sitios pequeños en una sola petición al LLM (RequestPacker)")
+    parser.add_argument("--cpu-workers", type=int, default=0,
+                        help="Procesos de la etapa de CPU (CpuStage); 0 para hacerla en los hilos")
+    parser.add_argument("--json", help="Ruta donde guardar el informe en JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    pages = {f"/{name}": html for name, html in load_corpus(args.sites).items()}
+    handler = FakeOpenAIHandler(latency=args.llm_latency, error_rate=args.error_rate)
+    calculator, rate_limiter = TokenCostCalculator(), RateLimiter(10_000, 10**8)
+    packer = RequestPacker(handler, calculator, rate_limiter) if args.pack else None
+    processor = ContentProcessor(handler, calculator, rate_limiter=rate_limiter,
+                                 rule_extractor=RuleBasedExtractor() if args.rules else None, packer=packer)
+    if args.cpu_workers > 0:
+        processor.cpu_stage = CpuStage(args.cpu_workers, processor.max_chunk_tokens, reducer=processor.reducer,
+                                       rule_extractor=processor.rule_extractor)
+    scraper = Scraper(parse_html=processor.cpu_stage is None)
+    metrics.reset()
+
+    with serve_pages(pages, latency=args.web_latency) as web:
+        urls = [web.base_url + path for path in pages]
+        start = time.perf_counter()
+        results = asyncio.run(run_pipeline(urls, processor, scraper, args.site_workers, args.scrape_concurrency))
+        elapsed = time.perf_counter() - start
+    if packer is not None:
+        packer.close()
+    if processor.cpu_stage is not None:
+        processor.cpu_stage.close()
+
+    latencies = [r["latency"] for r in results]
+    summary = metrics.run_summary()
+    report = {
+        "sites": len(results),
+        "failed_sites": sum(r["error"] for r in results),
+        "llm_calls": handler.calls,
+        "llm_errors": handler.errors,
+        "elapsed_seconds": elapsed,
+        "sites_per_second": len(results) / elapsed,
+        "latency_p50": percentile(latencies, 0.50),
+        "latency_p95": percentile(latencies, 0.95),
+        "latency_p99": percentile(latencies, 0.99),
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "stages": {h["labels"]["stage"]: {"count": h["count"], "mean": h["mean"], "p95": h["p95"]}
+                   for h in summary["histograms"].get("stage_latency_seconds", [])},
+    }
+
+    print(f"{report['sites']} sitios en {elapsed:.2f}s -> {report['sites_per_second']:.2f} sitios/s "
+          f"({report['failed_sites']} fallidos, {handler.calls} llamadas al LLM, {handler.errors} errores)")
+    print(f"latencia por sitio: p50={report['latency_p50']:.3f}s p95={report['latency_p95']:.3f}s "
+          f"p99={report['latency_p99']:.3f}s")
+    print(f"pico de RSS: {report['peak_rss_mib']:.1f} MiB")
+    for stage, stats in sorted(report["stages"].items()):
+        print(f"  {stage:<14} n={stats['count']:<6} media={stats['mean'] * 1000:8.1f} ms")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Benchmark del scraping concurrente frente al scraping secuencial.
+
+Con N páginas de latencia L, el recorrido secuencial tarda ~N×L, mientras que
+Scraper.scrape_many debería acercarse a max(L) mientras N <= max_concurrency.
+
+Uso:
+    python -m benchmarks.bench_scrape_many --pages 20 --latency 0.2
+"""
+import argparse
+import logging
+import time
+
+from benchmarks.local_server import serve_pages
+from src.features.scraper import Scraper
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--max-concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    scraper = Scraper()
+
+    with serve_pages(latency=args.latency) as server:
+        urls = [f"{server.base_url}/pricing/{i}" for i in range(args.pages)]
+
+        start = time.perf_counter()
+        for url in urls:
+            scraper.beautiful_soup_scrape_url(url)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = scraper.scrape_all(urls, max_concurrency=args.max_concurrency,
+                                     per_host_limit=args.max_concurrency)
+        concurrent = time.perf_counter() - start
+
+    errors = sum(1 for r in results if r["error"])
+    print(f"páginas={args.pages} latencia={args.latency:.3f}s errores={errors}")
+    print(f"secuencial: {sequential:.3f}s ({args.pages / sequential:.1f} páginas/s)")
+    print(f"concurrente: {concurrent:.3f}s ({args.pages / concurrent:.1f} páginas/s)")
+    print(f"aceleración: x{sequential / concurrent:.1f}")
+
+
+if __name__ == "__main__":
+    main()
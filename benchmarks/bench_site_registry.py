@@ -0,0 +1,84 @@
+"""
+Benchmark del registro de sitios frente al fichero JSON plano original.
+
+Compara dar de alta N sitios uno a uno reescribiendo el JSON completo (como hacía
+CompetitorSites) con la importación en bloque y las altas individuales del
+registro en SQLite, y la búsqueda lineal por nombre con la búsqueda indexada.
+Un 10 % de los sitios son duplicados con variantes de la URL.
+
+Uso:
+    python -m benchmarks.bench_site_registry --sites 5000
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+
+from src.utils.competitor_sites import CompetitorSites
+
+
+def make_sites(count: int):
+    sites = [{"name": f"Competitor {i}", "url": f"https://competitor-{i}.example.com/pricing"} for i in range(count)]
+    duplicates = [{"name": f"Competitor {i} (copia)", "url": f"http://WWW.competitor-{i}.example.com/pricing/"}
+                  for i in range(0, count, 10)]
+    return sites + duplicates
+
+
+def legacy_add_all(sites, path: str):
+    stored = []
+    for site in sites:
+        stored.append(site)
+        with open(path, "w") as file:
+            json.dump(stored, file, indent=4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sites", type=int, default=5000)
+    parser.add_argument("--legacy-sites", type=int, default=1000,
+                        help="Sitios para la versión original (es cuadrática)")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    directory = tempfile.mkdtemp()
+    sites = make_sites(args.sites)
+
+    start = time.perf_counter()
+    legacy_add_all(sites[:args.legacy_sites], os.path.join(directory, "legacy.json"))
+    legacy = time.perf_counter() - start
+
+    registry = CompetitorSites(os.path.join(directory, "sites.json"))
+    start = time.perf_counter()
+    added = registry.add_sites(sites)
+    bulk = time.perf_counter() - start
+
+    single_registry = CompetitorSites(os.path.join(directory, "single.json"))
+    start = time.perf_counter()
+    for site in sites[:args.legacy_sites]:
+        single_registry.add_site(site["name"], site["url"])
+    single = time.perf_counter() - start
+
+    names = [site["name"] for site in sites[:args.sites:max(1, args.sites // 500)]]
+    listed = registry.get_sites()
+    start = time.perf_counter()
+    for name in names:
+        next((site for site in listed if site["name"] == name), None)
+    linear = (time.perf_counter() - start) / len(names)
+    start = time.perf_counter()
+    for name in names:
+        registry.get_site(name)
+    indexed = (time.perf_counter() - start) / len(names)
+
+    print(f"{len(sites)} sitios de entrada, {added} únicos tras eliminar duplicados")
+    print(f"  JSON original, altas una a una      {legacy / args.legacy_sites * 1000:8.3f} ms/sitio "
+          f"({args.legacy_sites} sitios)")
+    print(f"  registro, altas una a una           {single / args.legacy_sites * 1000:8.3f} ms/sitio")
+    print(f"  registro, importación en bloque     {bulk / len(sites) * 1000:8.3f} ms/sitio")
+    print(f"  búsqueda lineal por nombre          {linear * 1e6:8.1f} µs")
+    print(f"  búsqueda indexada por nombre        {indexed * 1e6:8.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark del arranque en frío frente al acceso en caliente a los servicios.
+
+Cada medición en frío se hace en un proceso nuevo: primero el tiempo de importar
+los módulos del pipeline (que ya no cargan openai, tiktoken ni bs4 al importarse)
+y después el de crear cada componente del ServiceContainer la primera vez. Como
+referencia se mide también la importación directa de esas dependencias pesadas,
+que antes se pagaba en cada arranque. El acceso en caliente mide lo que cuesta a
+una re-ejecución de Streamlit obtener de nuevo los componentes ya creados.
+
+Uso:
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+COMPONENTS = ("competitor_sites", "scraper", "openai_handler", "token_calculator",
+              "content_processor", "evaluator")
+
+HEAVY_IMPORTS = """
+import json, time
+start = time.perf_counter()
+import bs4, openai, tiktoken
+print(json.dumps({"heavy_imports": time.perf_counter() - start}))
+"""
+
+COLD_START = """
+import json, sys, time
+start = time.perf_counter()
+import src.features.evaluation
+from src.utils.service_container import ServiceContainer
+result = {"import": time.perf_counter() - start, "errors": {}}
+container = ServiceContainer(sys.argv[1])
+for name in %r:
+    try:
+        getattr(container, name)
+    except Exception as e:
+        result["errors"][name] = str(e)
+result["init_times"] = container.init_times
+start = time.perf_counter()
+for _ in range(1000):
+    for name in container.init_times:
+        getattr(container, name)
+result["warm_access"] = (time.perf_counter() - start) / 1000
+print(json.dumps(result))
+""" % (COMPONENTS,)
+
+
+def run_python(code: str, *args: str) -> dict:
+    env = dict(os.environ, OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "sk-bench"))
+    output = subprocess.run([sys.executable, "-c", code, *args], capture_output=True, text=True,
+                            check=True, env=env, cwd=os.getcwd())
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp()
+    shutil.copy(os.path.join("data", "competitor_sites.json"), data_dir)
+
+    heavy = [run_python(HEAVY_IMPORTS)["heavy_imports"] for _ in range(args.runs)]
+    runs = [run_python(COLD_START, data_dir) for _ in range(args.runs)]
+
+    print(f"{args.runs} procesos por medición (mediana)")
+    print(f"  importar bs4 + openai + tiktoken       {statistics.median(heavy) * 1000:8.1f} ms")
+    print(f"  importar módulos del pipeline          {statistics.median(r['import'] for r in runs) * 1000:8.1f} ms")
+    for name in COMPONENTS:
+        times = [r["init_times"][name] for r in runs if name in r["init_times"]]
+        if times:
+            print(f"  crear {name:<32} {statistics.median(times) * 1000:8.1f} ms")
+        else:
+            print(f"  crear {name:<32}    error: {runs[0]['errors'].get(name, 'desconocido')}")
+    cold = statistics.median(r["import"] + sum(r["init_times"].values()) for r in runs)
+    warm = statistics.median(r["warm_access"] for r in runs)
+    print(f"arranque en frío total                   {cold * 1000:8.1f} ms")
+    print(f"acceso en caliente a todos los servicios {warm * 1e6:8.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
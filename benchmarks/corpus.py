@@ -0,0 +1,109 @@
+"""
+Corpus sintético de páginas de precios para los benchmarks.
+
+Genera páginas HTML con la estructura típica de una página de precios real:
+scripts, estilos, navegación, SVG en línea, tarjetas de planes y pie de página.
+Si existe el directorio `benchmarks/pages/` se usan también los HTML guardados en él.
+"""
+import os
+import random
+from typing import Dict, List
+
+PAGES_DIR = os.path.join(os.path.dirname(__file__), "pages")
+
+_PLAN_NAMES = ["Free", "Starter", "Basic", "Professional", "Business", "Team", "Enterprise"]
+_FEATURES = [
+    "Unlimited lessons", "Custom theming", "SCORM export", "Priority support", "Analytics dashboard",
+    "Custom domain", "Single sign-on", "Multi-language lessons", "API access", "Team workspace",
+    "Branding tools", "Real-time collaboration", "Unlimited learners", "AI assistant",
+]
+_FILLER = (
+    "Our platform helps teams create engaging content faster than ever before. "
+    "Read what our customers say about the product and discover new ways to learn. "
+)
+
+
+def make_pricing_page(seed: int = 0, filler_blocks: int = 50, plans: int = 3) -> str:
+    """
+    Genera una página de precios sintética.
+
+    Args:
+        seed (int): Semilla para que la página sea reproducible.
+        filler_blocks (int): Número de bloques de relleno (blog, testimonios, etc.).
+        plans (int): Número de planes de precios.
+
+    Returns:
+        str: HTML de la página.
+    """
+    rng = random.Random(seed)
+    names = sorted(rng.sample(_PLAN_NAMES, plans), key=_PLAN_NAMES.index)
+    prices = sorted(rng.sample(range(5, 200), plans))
+    parts = [
+        "<!DOCTYPE html><html><head><title>Pricing</title>",
+        "<style>" + ".card{padding:1rem;margin:0 auto;display:flex}" * 40 + "</style>",
+        "<script>" + "window.dataLayer=window.dataLayer||[];function gtag(){dataLayer.push(arguments)}" * 30
+        + "</script>",
+        "</head><body>",
+        "<nav><ul>" + "".join(f"<li><a href='/p{i}'>Link {i}</a></li>" for i in range(30)) + "</ul></nav>",
+        "<header><h1>Simple, transparent pricing</h1></header><main>",
+    ]
+    for i in range(filler_blocks // 2):
+        parts.append(f"<section class='blog'><h2>Story {seed}-{i}</h2><p>{_FILLER * 3}</p></section>")
+    parts.append("<section class='pricing'>")
+    for name, price in zip(names, prices):
+        features = rng.sample(_FEATURES, 5)
+        parts.append(
+            f"<div class='card plan'><h3>{name}</h3>"
+            f"<svg viewBox='0 0 24 24'><path d='M12 2L2 7l10 5 10-5-10-5z'/></svg>"
+            f"<p class='price'>${price} / month</p><ul>"
+            + "".join(f"<li>{feature}</li>" for feature in features)
+            + "</ul><a class='btn'>Get started</a></div>"
+        )
+    parts.append("</section>")
+    for i in range(filler_blocks - filler_blocks // 2):
+        parts.append(f"<section class='testimonial'><blockquote>{_FILLER * 2}</blockquote></section>")
+    parts.append("</main><footer>" + "<a href='/legal'>Legal</a> " * 40 + "© 2024</footer></body></html>")
+    return "\n".join(parts)
+
+
+def load_corpus(count: int = 50, filler_blocks: int = 50) -> Dict[str, str]:
+    """
+    Devuelve el corpus de páginas: las guardadas en disco más las sintéticas.
+
+    Args:
+        count (int): Número de páginas sintéticas a generar.
+        filler_blocks (int): Bloques de relleno por página sintética.
+
+    Returns:
+        Dict[str, str]: Mapa de nombre de página a HTML.
+    """
+    pages = {}
+    if os.path.isdir(PAGES_DIR):
+        for filename in sorted(os.listdir(PAGES_DIR)):
+            if filename.endswith((".html", ".htm")):
+                with open(os.path.join(PAGES_DIR, filename), encoding="utf-8", errors="replace") as file:
+                    pages[filename] = file.read()
+    for i in range(count):
+        pages[f"synthetic-{i}.html"] = make_pricing_page(seed=i, filler_blocks=filler_blocks)
+    return pages
+
+
+def make_large_page(target_bytes: int) -> str:
+    """
+    Genera una página de al menos target_bytes bytes concatenando páginas sintéticas.
+
+    Args:
+        target_bytes (int): Tamaño mínimo deseado.
+
+    Returns:
+        str: HTML de la página.
+    """
+    parts: List[str] = []
+    size = 0
+    seed = 0
+    while size < target_bytes:
+        page = make_pricing_page(seed=seed, filler_blocks=200)
+        parts.append(page)
+        size += len(page)
+        seed += 1
+    return "\n".join(parts)
@@ -0,0 +1,54 @@
+"""
+Respuestas simuladas del LLM para los benchmarks sin coste.
+
+Imita la extracción de precios del modelo buscando importes en el contenido del
+último mensaje, de forma determinista.
+"""
+import json
+import re
+from typing import Dict, List
+
+_PRICE = re.compile(
+    r"^#+\s*(?P<name>[^\n]+)\n(?:[^#\n][^\n]*\n)?[^#\n]*?\$\s?(?P<price>\d+(?:\.\d+)?)",
+    re.MULTILINE
+)
+_AMOUNT = re.compile(r"\$\s?(\d+(?:\.\d+)?)")
+# Cabecera de cada sitio en las peticiones agrupadas de RequestPacker
+_SECTION = re.compile(r"^=== (\S+) ===\n", re.MULTILINE)
+
+
+def fake_extraction(messages: List[Dict[str, str]]) -> str:
+    """
+    Genera una respuesta JSON con los tiers cheapest/middle/most_expensive.
+
+    Args:
+        messages (List[Dict[str, str]]): Mensajes de la petición.
+
+    Returns:
+        str: JSON con los tres tiers (precios null si no se encuentra ninguno) o, si la
+        petición agrupa varios sitios, un objeto con los tiers de cada uno por su clave.
+    """
+    content = messages[-1]["content"]
+    sections = _SECTION.split(content)
+    if len(sections) > 1:
+        # Petición agrupada: un objeto por clave de sitio
+        return json.dumps({
+            key: json.loads(_extract_tiers(section))
+            for key, section in zip(sections[1::2], sections[2::2])
+        })
+    return _extract_tiers(content)
+
+
+def _extract_tiers(content: str) -> str:
+    tiers = [{"name": m.group("name").strip(), "price": float(m.group("price"))} for m in _PRICE.finditer(content)]
+    if not tiers:
+        tiers = [{"name": f"Plan {i + 1}", "price": float(p)} for i, p in enumerate(_AMOUNT.findall(content))]
+    if not tiers:
+        empty = {"name": None, "price": None}
+        return json.dumps({"cheapest": empty, "middle": empty, "most_expensive": empty})
+    tiers.sort(key=lambda tier: tier["price"])
+    return json.dumps({
+        "cheapest": tiers[0],
+        "middle": tiers[len(tiers) // 2],
+        "most_expensive": tiers[-1]
+    })
@@ -0,0 +1,180 @@
+"""
+Servidor local que emula los endpoints de la API de OpenAI usados por el proyecto.
+
+Implementa /v1/chat/completions (también en streaming), /v1/files y /v1/batches con respuestas de
+benchmarks.fake_llm, para probar el modo batch sin red ni coste. Los batches
+permanecen 'in_progress' durante `batch_delay` segundos antes de completarse.
+"""
+import email.parser
+import itertools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List
+
+from benchmarks.fake_llm import fake_extraction
+
+_ids = itertools.count(1)
+
+
+def _completion_body(content: str, model: str) -> Dict[str, Any]:
+    return {
+        "id": f"chatcmpl-{next(_ids)}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+class _OpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, payload: Any, status: int = 200):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, content: str, model: str, fragment_size: int = 8):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        completion_id = f"chatcmpl-{next(_ids)}"
+        try:
+            for i in range(0, len(content), fragment_size):
+                chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                         "model": model, "choices": [{"index": 0, "finish_reason": None,
+                                                      "delta": {"content": content[i:i + fragment_size]}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(self.server.token_latency)
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # El cliente ha cancelado el stream
+            pass
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_POST(self):
+        server = self.server
+        body = self._read_body()
+        if self.path == "/v1/chat/completions":
+            request = json.loads(body)
+            time.sleep(server.latency)
+            content = server.responder(request["messages"])
+            if request.get("stream"):
+                self._send_stream(content, request["model"])
+            else:
+                self._send_json(_completion_body(content, request["model"]))
+        elif self.path == "/v1/files":
+            message = email.parser.BytesParser().parsebytes(
+                b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + body)
+            content, filename = b"", "input.jsonl"
+            for part in message.walk():
+                if part.get_param("name", header="content-disposition") == "file":
+                    content = part.get_payload(decode=True)
+                    filename = part.get_filename() or filename
+            file_id = f"file-{next(_ids)}"
+            server.files[file_id] = content
+            self._send_json({"id": file_id, "object": "file", "bytes": len(content),
+                             "created_at": int(time.time()), "filename": filename,
+                             "purpose": "batch", "status": "processed"})
+        elif self.path == "/v1/batches":
+            request = json.loads(body)
+            batch_id = f"batch-{next(_ids)}"
+            server.started[batch_id] = time.monotonic()
+            server.batches[batch_id] = {
+                "id": batch_id, "object": "batch", "endpoint": request["endpoint"],
+                "input_file_id": request["input_file_id"],
+                "completion_window": request["completion_window"],
+                "status": "in_progress", "created_at": int(time.time()),
+                "output_file_id": None, "error_file_id": None,
+                "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            }
+            self._send_json(server.batches[batch_id])
+        else:
+            self._send_json({"error": {"message": "not found"}}, 404)
+
+    def do_GET(self):
+        server = self.server
+        parts = self.path.strip("/").split("/")
+        if parts[:2] == ["v1", "batches"] and len(parts) == 3 and parts[2] in server.batches:
+            batch = server.batches[parts[2]]
+            if batch["status"] == "in_progress" and time.monotonic() - server.started[batch["id"]] >= server.batch_delay:
+                self._complete(batch)
+            self._send_json(batch)
+        elif parts[:2] == ["v1", "files"] and len(parts) == 4 and parts[3] == "content" and parts[2] in server.files:
+            data = server.files[parts[2]]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self._send_json({"error": {"message": "not found"}}, 404)
+
+    def _complete(self, batch: Dict[str, Any]):
+        lines: List[str] = []
+        for raw in self.server.files[batch["input_file_id"]].decode("utf-8").splitlines():
+            if not raw.strip():
+                continue
+            request = json.loads(raw)
+            content = self.server.responder(request["body"]["messages"])
+            lines.append(json.dumps({
+                "id": f"batch_req_{next(_ids)}",
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "request_id": "req",
+                             "body": _completion_body(content, request["body"]["model"])},
+                "error": None,
+            }))
+        output_id = f"file-{next(_ids)}"
+        self.server.files[output_id] = ("\n".join(lines) + "\n").encode("utf-8")
+        batch.update(status="completed", output_file_id=output_id,
+                     request_counts={"total": len(lines), "completed": len(lines), "failed": 0})
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def serve_openai(latency: float = 0.0, batch_delay: float = 0.0, token_latency: float = 0.0,
+                 responder: Callable[[List[Dict[str, str]]], str] = fake_extraction) -> Iterator[ThreadingHTTPServer]:
+    """
+    Arranca el servidor que emula la API de OpenAI en un puerto libre.
+
+    Args:
+        latency (float): Segundos de espera en cada completación síncrona.
+        batch_delay (float): Segundos que tarda un batch en completarse.
+        token_latency (float): Segundos entre fragmentos de una completación en streaming.
+        responder (Callable): Función que genera el contenido de la respuesta a partir de los mensajes.
+
+    Yields:
+        ThreadingHTTPServer: Servidor en ejecución; la URL base de la API está en `server.base_url`.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OpenAIHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.batch_delay = batch_delay
+    server.token_latency = token_latency
+    server.responder = responder
+    server.files = {}
+    server.batches = {}
+    server.started = {}
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,63 @@
+"""
+Sustitutos locales de los componentes externos para los benchmarks.
+"""
+import json
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from benchmarks.fake_llm import fake_extraction
+
+
+class FakeOpenAIHandler:
+    """
+    Sustituto en proceso de OpenAIHandler con latencia y tasa de errores configurables.
+
+    Responde con benchmarks.fake_llm.fake_extraction y, como el manejador real,
+    devuelve un JSON con la clave 'error' cuando la llamada falla.
+
+    Attributes:
+        latency (float): Latencia media en segundos de cada llamada.
+        jitter (float): Variación máxima (±) de la latencia en segundos.
+        error_rate (float): Probabilidad de que una llamada falle.
+        calls (int): Número de llamadas realizadas.
+        errors (int): Número de llamadas fallidas.
+    """
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.1, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.model = "fake-llm"
+        self.response_format = {"type": "json_object"}
+        self.cache = None
+        self.client = None
+        self.calls = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _simulate(self) -> bool:
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        time.sleep(delay)
+        return failed
+
+    def get_completion(self, messages: List[Dict[str, str]], before_request: Callable[[], Any] | None = None) -> str:
+        if before_request is not None:
+            before_request()
+        if self._simulate():
+            return json.dumps({"error": "Simulated API error"})
+        return fake_extraction(messages)
+
+    def stream_completion(self, messages: List[Dict[str, str]],
+                          required_keys: Iterable[str] | None = None) -> Iterator[Tuple[str, Any]]:
+        if self._simulate():
+            yield "error", "Simulated API error"
+            return
+        yield from json.loads(fake_extraction(messages)).items()
@@ -0,0 +1,74 @@
+"""
+Servidor HTTP local que sustituye a los sitios reales durante los benchmarks.
+
+Sirve páginas en memoria con una latencia artificial configurable, de modo que
+los benchmarks no dependen de la red ni de los sitios de la competencia.
+"""
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator
+
+
+class _PageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency)
+        server.hits += 1
+        body = server.pages.get(self.path)
+        if body is None:
+            body = server.default_page
+        if body is None:
+            self.send_error(404)
+            return
+        data = body.encode("utf-8")
+        etag = '"' + hashlib.sha1(data).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def serve_pages(pages: Dict[str, str] | None = None, latency: float = 0.0,
+                default_page: str | None = "<html><body>ok</body></html>") -> Iterator[ThreadingHTTPServer]:
+    """
+    Arranca un servidor HTTP local en un puerto libre.
+
+    Args:
+        pages (Dict[str, str] | None): Mapa de ruta a contenido HTML.
+        latency (float): Segundos de espera antes de responder cada petición.
+        default_page (str | None): Contenido para rutas no registradas (None devuelve 404).
+
+    Yields:
+        ThreadingHTTPServer: Servidor en ejecución; su URL base está en `server.base_url`.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _PageHandler)
+    server.daemon_threads = True
+    server.pages = pages or {}
+    server.latency = latency
+    server.default_page = default_page
+    server.hits = 0
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
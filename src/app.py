@@ -1,12 +1,10 @@
 import streamlit as st
-from src.utils.competitor_sites import CompetitorSites
-from src.features.scraper import Scraper
-from src.features.content_processor import ContentProcessor
-from src.utils.token_cost_calculator import TokenCostCalculator
-from src.models.openai_handler import OpenAIHandler
-from src.features.evaluation import Evaluator
+from src.utils.metrics import metrics
+from src.utils.service_container import ServiceContainer, get_container
+from src.utils.price_store import rank_tiers
 import json
 import logging
+from datetime import datetime
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -55,16 +53,41 @@ def display_evaluation_results(evaluation):
             st.write(f"- {info}")
 
 
+def display_price_history(price_store):
+    # Se dibuja a partir del histórico guardado, sin scrapear ni llamar al LLM
+    tracked_sites = price_store.sites()
+    if not tracked_sites:
+        return
+    with st.expander("Price history"):
+        st.write("Latest prices:")
+        st.dataframe([
+            {"site": site, "tier": tier, "plan": point["name"], "price": point["price_text"],
+             "observed": datetime.fromtimestamp(point["observed_at"])}
+            for site, tiers in price_store.latest().items() for tier, point in tiers.items()
+        ])
+
+        trend_site = st.selectbox("Show price trend for", tracked_sites, key="trend_site")
+        rows = {}
+        for point in price_store.history(trend_site):
+            row = rows.setdefault(point["observed_at"], {"observed": datetime.fromtimestamp(point["observed_at"])})
+            row[point["tier"]] = point["price"]
+        tiers = sorted({key for row in rows.values() for key in row} - {"observed"})
+        if tiers:
+            st.line_chart(list(rows.values()), x="observed", y=tiers)
+
+
+@st.cache_resource
+def get_services() -> ServiceContainer:
+    # Un único contenedor por proceso: las re-ejecuciones reutilizan los componentes ya creados
+    return get_container()
+
+
 def main():
     st.title("Web Scraping and LLM-powered Analysis Tool")
 
-    # Inicializar componentes
-    competitor_sites = CompetitorSites("../data/competitor_sites.json")
-    scraper = Scraper()
-    openai_handler = OpenAIHandler()
-    token_calculator = TokenCostCalculator()
-    content_processor = ContentProcessor(openai_handler, token_calculator)
-    evaluator = Evaluator()
+    # Los componentes pesados se crean la primera vez que se usan
+    services = get_services()
+    competitor_sites = services.competitor_sites
 
     # Sidebar para añadir nuevos sitios
     st.sidebar.header("Add New Competitor Site")
@@ -72,12 +95,16 @@ def main():
     new_site_url = st.sidebar.text_input("Site URL")
     if st.sidebar.button("Add Site"):
         if new_site_name and new_site_url:
-            competitor_sites.add_site(new_site_name, new_site_url)
-            st.sidebar.success(f"Added {new_site_name}")
+            if competitor_sites.add_site(new_site_name, new_site_url):
+                st.sidebar.success(f"Added {new_site_name}")
+            else:
+                st.sidebar.warning(f"{new_site_name} is already registered")
         else:
             st.sidebar.error("Please enter both site name and URL")
 
     # Main page
+    display_price_history(services.price_store)
+
     st.header("Competitor Sites")
     sites = competitor_sites.get_sites()
     if not sites:
@@ -88,7 +115,7 @@ def main():
         selected_site_name = st.selectbox("Select a site to analyze", site_names)
 
         # Encontrar el sitio seleccionado
-        selected_site = next((site for site in sites if site['name'] == selected_site_name), None)
+        selected_site = competitor_sites.get_site(selected_site_name)
 
         if selected_site:
             st.write(f"Selected site: **{selected_site['name']}** - {selected_site['url']}")
@@ -155,11 +182,23 @@ def main():
                 }
 
                 # Scraping y análisis
+                st.header("Analysis Results")
+                streamed_tiers = []
+
+                def show_tier(tier, details):
+                    # Se muestra cada tier en cuanto llega del stream
+                    streamed_tiers.append(tier)
+                    if tier == "answer" and isinstance(details, dict):
+                        for nested_tier, nested_details in details.items():
+                            display_pricing_tier(nested_tier, nested_details)
+                    elif isinstance(details, dict):
+                        display_pricing_tier(tier, details)
+
                 with st.spinner(f"Analyzing {selected_site['name']}..."):
                     try:
                         # Aquí usamos el evaluador para obtener tanto el resultado como la evaluación
-                        evaluation_result = evaluator.evaluate_response(selected_site['name'], user_query,
-                                                                        expected_result)
+                        evaluation_result = services.evaluator.evaluate_response(selected_site['name'], user_query,
+                                                                        expected_result, on_tier=show_tier)
 
                         if "error" in evaluation_result:
                             st.error(f"Error: {evaluation_result['error']}")
@@ -167,13 +206,16 @@ def main():
 
                         result_dict = evaluation_result["raw_response"]
                         st.success("Analysis successful")
+                        tiers = result_dict.get("answer") if isinstance(result_dict.get("answer"), dict) else result_dict
+                        # Solo se guardan los planes con precio, con las claves de la extracción por lotes
+                        services.price_store.record(selected_site['name'], rank_tiers(tiers))
 
-                        st.header("Analysis Results")
-                        if "answer" in result_dict and isinstance(result_dict["answer"], dict):
-                            for tier, details in result_dict["answer"].items():
-                                display_pricing_tier(tier, details)
-                        else:
-                            st.write(result_dict.get("answer", "No structured answer available."))
+                        if not streamed_tiers:
+                            if "answer" in result_dict and isinstance(result_dict["answer"], dict):
+                                for tier, details in result_dict["answer"].items():
+                                    display_pricing_tier(tier, details)
+                            else:
+                                st.write(result_dict.get("answer", "No structured answer available."))
 
                         # Logging para diagnóstico
                         logger.info(f"Expected result: {json.dumps(expected_result, indent=2)}")
@@ -187,6 +229,9 @@ def main():
                         with st.expander("Show raw JSON data"):
                             st.json(result_dict)
 
+                        with st.expander("Show pipeline metrics"):
+                            st.code(metrics.to_prometheus())
+
                     except Exception as e:
                         st.error(f"Error analyzing content for {selected_site['name']}: {str(e)}")
                         logger.exception("Error during analysis")
@@ -0,0 +1,444 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Set, Tuple
+from src.features.chunk_ranker import ChunkRanker
+from src.features.cpu_stage import CpuStage
+from src.features.request_packer import RequestPacker
+from src.features.scrape_strategy import AUTO_METHOD
+from src.utils.loggingDecorator import get_logger
+from src.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+# Fichero que anota la ejecución en curso dentro del directorio de ejecuciones
+CHECKPOINT_FILE = "checkpoint.json"
+
+
+class BatchRunner:
+    """
+    Ejecuta la extracción de precios de todos los sitios sin interfaz.
+
+    Scrapea los sitios de forma concurrente, extrae sus precios en un pool de hilos
+    y escribe cada resultado en un fichero JSONL en cuanto termina. Ese fichero es
+    también el checkpoint: al reanudar se omiten los sitios ya completados, y las
+    llamadas al LLM ya pagadas de los sitios a medias se sirven desde la caché del
+    LLM del contenedor de servicios. Con un ChangeDetector, las páginas sin cambios
+    reutilizan su última extracción y solo las que han cambiado llegan al LLM. Con
+    un PriceStore, cada extracción correcta se añade al histórico de precios. Si el
+    ContentProcessor tiene un CpuStage, las páginas scrapeadas se preparan en él en
+    lotes de batch_size.
+
+    Attributes:
+        scraper (Scraper): Scraper utilizado para descargar los sitios.
+        content_processor (ContentProcessor): Procesador que extrae los precios.
+        output_path (str): Ruta del fichero JSONL de resultados.
+        method (str): Nombre de la función de scraping a utilizar.
+        site_workers (int): Número de sitios extraídos en paralelo.
+        scrape_concurrency (int): Número máximo de descargas simultáneas.
+        max_errors (int | None): Sitios fallidos tras los cuales se detiene la ejecución.
+        change_detector (ChangeDetector | None): Detector de cambios, si está habilitado.
+        price_store (PriceStore | None): Histórico donde se guardan los precios extraídos.
+    """
+
+    def __init__(self, scraper: Any, content_processor: Any, output_path: str, method: str = "BeautifulSoup",
+                 site_workers: int = 4, scrape_concurrency: int = 10, max_errors: int | None = None,
+                 change_detector: Any = None, price_store: Any = None):
+        """
+        Inicializa la instancia de BatchRunner.
+
+        Args:
+            scraper (Scraper): Scraper utilizado para descargar los sitios.
+            content_processor (ContentProcessor): Procesador que extrae los precios.
+            output_path (str): Ruta del fichero JSONL de resultados.
+            method (str): Nombre de la función de scraping a utilizar.
+            site_workers (int): Número de sitios extraídos en paralelo.
+            scrape_concurrency (int): Número máximo de descargas simultáneas.
+            max_errors (int | None): Sitios fallidos tras los cuales se detiene la ejecución
+                (por ejemplo, al agotar el límite de la API). Sin límite por defecto.
+            change_detector (ChangeDetector | None): Detector de cambios. Si se indica, las
+                páginas sin cambios no se vuelven a enviar al LLM.
+            price_store (PriceStore | None): Histórico de precios. Si se indica, cada
+                extracción correcta se guarda en él.
+        """
+        self.scraper = scraper
+        self.content_processor = content_processor
+        self.output_path = output_path
+        self.method = method
+        self.site_workers = site_workers
+        self.scrape_concurrency = scrape_concurrency
+        self.max_errors = max_errors
+        self.change_detector = change_detector
+        self.price_store = price_store
+
+    def completed_urls(self) -> Set[str]:
+        """
+        Lee el checkpoint y devuelve las URLs ya extraídas correctamente.
+
+        Una última línea incompleta (por una interrupción a mitad de escritura) se ignora.
+
+        Returns:
+            Set[str]: URLs con un resultado 'ok' en el fichero de resultados.
+        """
+        completed: Set[str] = set()
+        if not os.path.exists(self.output_path):
+            return completed
+        with open(self.output_path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Línea incompleta ignorada en {self.output_path}")
+                    continue
+                if record.get("status") == "ok":
+                    completed.add(record["url"])
+        return completed
+
+    def pending_sites(self, sites: Iterable[Dict[str, str]]) -> List[Dict[str, str]]:
+        """
+        Filtra los sitios duplicados y los ya completados en una ejecución anterior.
+
+        Args:
+            sites (Iterable[Dict[str, str]]): Sitios con las claves 'name' y 'url'.
+
+        Returns:
+            List[Dict[str, str]]: Sitios pendientes, en el orden original.
+        """
+        seen = self.completed_urls()
+        skipped = len(seen)
+        pending = []
+        for site in sites:
+            if site["url"] not in seen:
+                seen.add(site["url"])
+                pending.append(site)
+        logger.info(f"{len(pending)} sitios pendientes ({skipped} ya completados)")
+        return pending
+
+    def _extract(self, site: Dict[str, str], scraped: Dict[str, Any], page: Any = None) -> Dict[str, Any]:
+        """
+        Extrae los precios de un sitio ya scrapeado y construye su registro.
+
+        Args:
+            site (Dict[str, str]): Sitio con las claves 'name' y 'url'.
+            scraped (Dict[str, Any]): Resultado de Scraper.scrape_many para el sitio.
+            page (PreparedPage | None): Página ya preparada en el CpuStage, si la hay.
+
+        Returns:
+            Dict[str, Any]: Registro con las claves 'name', 'url', 'status', 'result',
+            'error', 'changed', 'change_reason', 'elapsed' y 'finished_at'.
+        """
+        start = time.perf_counter()
+        result, error, change = None, scraped["error"], None
+        if error is None:
+            with metrics.span("site", site=site["name"]):
+                # Un fallo inesperado en un sitio se registra como error suyo y cuenta para
+                # max_errors, en lugar de detener toda la ejecución
+                try:
+                    text = None
+                    if self.change_detector is not None:
+                        # Con el mismo reductor, la página se parsea y se reduce una sola vez: el
+                        # detector usa la reducción del CpuStage o pasa su texto a la extracción
+                        shared = self.change_detector.reducer is self.content_processor.reducer
+                        # Si las reglas bastaron en el pool, la página no llegó a reducirse
+                        prepared = page is not None and (page.rules is None or bool(page.content))
+                        change = self.change_detector.check(site["url"], scraped["content"],
+                                                            page.content if shared and prepared else None)
+                        text = change["text"] if shared else None
+                    if change is not None and not change["changed"]:
+                        result = change["extraction"]
+                    else:
+                        result = json.loads(self.content_processor.extract(scraped["content"], page=page,
+                                                                           text=text))
+                        error = result.pop("error", None) if isinstance(result, dict) else None
+                        if change is not None and error is None:
+                            self.change_detector.record(site["url"], change["fingerprint"], result)
+                    if self.price_store is not None and error is None:
+                        self.price_store.record(site["name"], result)
+                except Exception as e:
+                    logger.error(f"Error inesperado al extraer {site['name']}: {str(e)}")
+                    error = f"{type(e).__name__}: {e}"
+        return {
+            "name": site["name"],
+            "url": site["url"],
+            "status": "error" if error else "ok",
+            "result": None if error else result,
+            "error": error,
+            "changed": None if change is None else change["changed"],
+            "change_reason": None if change is None else change["reason"],
+            "elapsed": scraped["elapsed"] + time.perf_counter() - start,
+            "finished_at": datetime.now(timezone.utc).isoformat()
+        }
+
+    def _terminate_last_line(self):
+        # Una interrupción a mitad de escritura puede dejar la última línea sin terminar
+        if not os.path.exists(self.output_path) or not os.path.getsize(self.output_path):
+            return
+        with open(self.output_path, "rb+") as file:
+            file.seek(-1, os.SEEK_END)
+            if file.read(1) != b"\n":
+                file.write(b"\n")
+
+    def _write(self, file, record: Dict[str, Any]):
+        file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        file.flush()
+        # Cada resultado queda en disco antes de seguir: es el checkpoint
+        os.fsync(file.fileno())
+
+    async def run_async(self, sites: Iterable[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Procesa los sitios pendientes y escribe cada resultado según termina.
+
+        Args:
+            sites (Iterable[Dict[str, str]]): Sitios con las claves 'name' y 'url'.
+
+        Returns:
+            Dict[str, Any]: Recuento de sitios 'ok', 'error', 'skipped' y 'unchanged', la
+            lista 'changed_sites' con los sitios cuyos precios se han vuelto a extraer y
+            'stopped', True si la ejecución se detuvo al alcanzar max_errors.
+        """
+        sites = list(sites)
+        pending = self.pending_sites(sites)
+        by_url = {site["url"]: site for site in pending}
+        counts = {"ok": 0, "error": 0, "skipped": len(sites) - len(pending), "unchanged": 0, "changed_sites": [],
+                  "stopped": False}
+        if not pending:
+            return counts
+
+        directory = os.path.dirname(self.output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.site_workers, thread_name_prefix="batch")
+        stopped = asyncio.Event()
+
+        async def extract_and_write(file, site: Dict[str, str], scraped: Dict[str, Any], page: Any = None):
+            record = await loop.run_in_executor(executor, self._extract, site, scraped, page)
+            # Las escrituras se hacen desde el bucle de eventos, por lo que no se solapan
+            self._write(file, record)
+            counts[record["status"]] += 1
+            if record["changed"] is False:
+                counts["unchanged"] += 1
+            elif record["changed"] and record["status"] == "ok":
+                counts["changed_sites"].append(record["name"])
+            if record["status"] == "error":
+                logger.error(f"Error en {record['name']}: {record['error']}")
+                if self.max_errors is not None and counts["error"] >= self.max_errors:
+                    logger.error(f"Se alcanzaron {counts['error']} errores; se detiene la ejecución. "
+                                 f"Vuelve a lanzarla para reanudar")
+                    stopped.set()
+
+        cpu_stage = self.content_processor.cpu_stage
+
+        async def prepare_and_extract(file, batch: List[Tuple[Dict[str, str], Dict[str, Any]]]):
+            try:
+                with metrics.span("cpu_stage", pages=len(batch)):
+                    pages = await asyncio.wrap_future(cpu_stage.submit_batch([scraped["content"]
+                                                                               for _, scraped in batch]))
+            except Exception as e:
+                # Cada página se vuelve a preparar por separado, para que el fallo quede en su sitio
+                logger.warning(f"Error al preparar un lote de {len(batch)} páginas: {str(e)}")
+                pages = [None] * len(batch)
+            await asyncio.gather(*(extract_and_write(file, site, scraped, page)
+                                   for (site, scraped), page in zip(batch, pages)))
+
+        try:
+            self._terminate_last_line()
+            with open(self.output_path, "a", encoding="utf-8") as file:
+                tasks, batch = [], []
+                async for scraped in self.scraper.scrape_many(list(by_url), self.method, self.scrape_concurrency,
+                                                              self.scrape_concurrency):
+                    if stopped.is_set():
+                        break
+                    site = by_url[scraped["url"]]
+                    if cpu_stage is None or scraped["error"] is not None:
+                        tasks.append(asyncio.create_task(extract_and_write(file, site, scraped)))
+                        continue
+                    # Las páginas viajan al pool de procesos en lotes de batch_size, en un solo envío cada lote
+                    batch.append((site, scraped))
+                    if len(batch) >= cpu_stage.batch_size:
+                        tasks.append(asyncio.create_task(prepare_and_extract(file, batch)))
+                        batch = []
+                if batch and not stopped.is_set():
+                    tasks.append(asyncio.create_task(prepare_and_extract(file, batch)))
+                await asyncio.gather(*tasks)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        counts["stopped"] = stopped.is_set()
+        logger.info(f"Ejecución terminada: {counts['ok']} correctos, {counts['error']} fallidos, "
+                    f"{counts['skipped']} omitidos, {counts['unchanged']} sin cambios")
+        if counts["changed_sites"]:
+            logger.info(f"Sitios con cambios: {', '.join(counts['changed_sites'])}")
+        return counts
+
+    def run(self, sites: Iterable[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Versión síncrona de run_async.
+
+        Args:
+            sites (Iterable[Dict[str, str]]): Sitios con las claves 'name' y 'url'.
+
+        Returns:
+            Dict[str, Any]: Recuentos y sitios con cambios, como en run_async.
+        """
+        return asyncio.run(self.run_async(sites))
+
+    @staticmethod
+    def resolve_run(runs_dir: str, fresh: bool = False) -> str:
+        """
+        Elige el fichero de resultados de la ejecución por defecto.
+
+        El fichero de la ejecución en curso se anota en <runs_dir>/checkpoint.json, de
+        modo que relanzar una ejecución interrumpida la reanuda aunque haya cambiado
+        el día. Si no hay ninguna en curso (o con fresh) se empieza una nueva con un
+        identificador basado en la hora de inicio.
+
+        Args:
+            runs_dir (str): Directorio de las ejecuciones.
+            fresh (bool): Descartar la ejecución en curso y empezar una nueva.
+
+        Returns:
+            str: Ruta del fichero JSONL de resultados.
+        """
+        checkpoint_path = os.path.join(runs_dir, CHECKPOINT_FILE)
+        if os.path.exists(checkpoint_path):
+            with open(checkpoint_path, "r", encoding="utf-8") as file:
+                output_path = os.path.join(runs_dir, json.load(file)["run_id"] + ".jsonl")
+            if not fresh:
+                logger.info(f"Se reanuda la ejecución en curso: {output_path}")
+                return output_path
+            if os.path.exists(output_path):
+                os.remove(output_path)
+
+        run_id = datetime.now().strftime("%Y-%m-%dT%H-%M-%S")
+        os.makedirs(runs_dir, exist_ok=True)
+        temporary_path = checkpoint_path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump({"run_id": run_id}, file)
+        os.replace(temporary_path, checkpoint_path)
+        logger.info(f"Nueva ejecución {run_id}")
+        return os.path.join(runs_dir, run_id + ".jsonl")
+
+    @staticmethod
+    def finish_run(runs_dir: str):
+        """
+        Marca como terminada la ejecución en curso, para que la siguiente empiece de nuevo.
+
+        Args:
+            runs_dir (str): Directorio de las ejecuciones.
+        """
+        checkpoint_path = os.path.join(runs_dir, CHECKPOINT_FILE)
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+    def export_parquet(self, parquet_path: str):
+        """
+        Convierte los resultados JSONL a Parquet, conservando el último registro de cada URL.
+
+        Requiere pyarrow, que es una dependencia opcional.
+
+        Args:
+            parquet_path (str): Ruta del fichero Parquet a escribir.
+
+        Raises:
+            ImportError: Si pyarrow no está instalado.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("La exportación a Parquet requiere pyarrow (pip install pyarrow)") from e
+
+        latest: Dict[str, Dict[str, Any]] = {}
+        with open(self.output_path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                # El resultado anidado se guarda como JSON para tener un esquema estable
+                record["result"] = json.dumps(record["result"], ensure_ascii=False)
+                latest[record["url"]] = record
+        pq.write_table(pa.Table.from_pylist(list(latest.values())), parquet_path)
+        logger.info(f"{len(latest)} resultados exportados a {parquet_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extrae los precios de todos los sitios sin interfaz. "
+                                                 "Si se interrumpe, al relanzarlo se reanuda desde el checkpoint.")
+    parser.add_argument("--data-dir", default="../data", help="Directorio con competitor_sites.json y las cachés")
+    parser.add_argument("--output", default=None,
+                        help="Fichero JSONL de resultados (por defecto <data-dir>/runs/<ejecución>.jsonl, "
+                             "reanudando la ejecución en curso si la hay)")
+    parser.add_argument("--parquet", help="Exportar también los resultados a este fichero Parquet")
+    parser.add_argument("--method", default="BeautifulSoup",
+                        help="Función de scraping a utilizar ('Auto' elige la mejor por dominio)")
+    parser.add_argument("--site-workers", type=int, default=4)
+    parser.add_argument("--scrape-concurrency", type=int, default=10)
+    parser.add_argument("--max-errors", type=int, default=None, help="Detener tras este número de sitios fallidos")
+    parser.add_argument("--fresh", action="store_true", help="Descartar el checkpoint y empezar de cero")
+    parser.add_argument("--force", action="store_true",
+                        help="Volver a extraer todos los sitios aunque sus páginas no hayan cambiado")
+    parser.add_argument("--top-k", type=int, default=3,
+                        help="Chunks por página enviados al LLM, los de más señal de precios (0 para enviarlos todos)")
+    parser.add_argument("--pack", action="store_true",
+                        help="Agrupar los sitios pequeños en una sola petición al LLM (conviene subir --site-workers)")
+    parser.add_argument("--cpu-workers", type=int, default=0,
+                        help="Procesos para parsear, reducir, dividir y contar tokens (0 para hacerlo en los hilos)")
+    parser.add_argument("--metrics", help="Guardar el resumen de métricas de la ejecución en este fichero JSON")
+    args = parser.parse_args()
+
+    from src.utils.service_container import ServiceContainer
+    services = ServiceContainer(args.data_dir)
+    if args.method == AUTO_METHOD:
+        services.scrape_strategy.register()
+    services.content_processor.chunk_ranker = ChunkRanker(top_k=args.top_k) if args.top_k > 0 else None
+    packer = None
+    if args.pack:
+        processor = services.content_processor
+        packer = RequestPacker(processor.openai_handler, processor.token_calculator, processor.rate_limiter)
+        processor.packer = packer
+    cpu_stage = None
+    if args.cpu_workers > 0:
+        processor = services.content_processor
+        cpu_stage = CpuStage(args.cpu_workers, processor.max_chunk_tokens, processor.chunk_overlap,
+                             processor.reducer, rule_extractor=processor.rule_extractor)
+        processor.cpu_stage = cpu_stage
+        # El HTML se parsea en el pool, no en los hilos de scraping
+        services.scraper.parse_html = False
+    # Sin --output, relanzar reanuda la ejecución en curso aunque haya cambiado el día, y una
+    # ejecución que termina deja paso a una nueva
+    runs_dir = os.path.join(args.data_dir, "runs")
+    if args.output:
+        output_path = args.output
+        if args.fresh and os.path.exists(output_path):
+            os.remove(output_path)
+    else:
+        output_path = BatchRunner.resolve_run(runs_dir, args.fresh)
+
+    runner = BatchRunner(services.scraper, services.content_processor, output_path, method=args.method,
+                         site_workers=args.site_workers, scrape_concurrency=args.scrape_concurrency,
+                         max_errors=args.max_errors,
+                         change_detector=None if args.force else services.change_detector,
+                         price_store=services.price_store)
+    try:
+        counts = runner.run(services.competitor_sites.get_sites())
+    finally:
+        if packer is not None:
+            packer.close()
+        if cpu_stage is not None:
+            cpu_stage.close()
+    if not args.output and not counts["stopped"]:
+        BatchRunner.finish_run(runs_dir)
+    print(json.dumps(counts))
+    if args.parquet:
+        runner.export_parquet(args.parquet)
+    if args.metrics:
+        metrics.write_summary(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
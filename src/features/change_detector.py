@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict
+from src.features.html_reducer import HtmlReducer, PRICE_PATTERN
+from src.utils.loggingDecorator import log_operation, get_logger
+from src.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+SIMHASH_BITS = 64
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """
+    Calcula el simhash de 64 bits de un texto a partir de sus shingles de palabras.
+
+    Textos casi iguales producen huellas a poca distancia de Hamming.
+
+    Args:
+        text (str): Texto normalizado.
+        shingle_size (int): Número de palabras por shingle.
+
+    Returns:
+        int: Huella de 64 bits.
+    """
+    words = WORD_PATTERN.findall(text)
+    shingles = {" ".join(words[i:i + shingle_size]) for i in range(max(1, len(words) - shingle_size + 1))}
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class ChangeDetector:
+    """
+    Detecta qué páginas de precios han cambiado desde la última extracción.
+
+    Para cada sitio guarda en SQLite una huella de la región de precios (la salida
+    de HtmlReducer): el hash del contenido normalizado, el hash de las líneas con
+    precios y un simhash del texto. Una página se considera sin cambios si su hash
+    coincide o si sus líneas de precios son idénticas y el simhash apenas varía
+    (fechas, contadores, textos rotativos); en ese caso se reutiliza la última
+    extracción en lugar de llamar al LLM.
+
+    Attributes:
+        path (str): Ruta del fichero SQLite.
+        reducer (HtmlReducer): Reductor que aísla la región de precios.
+        max_distance (int): Distancia de Hamming máxima entre simhash para considerar
+            que el texto no ha cambiado.
+        max_age_seconds (float | None): Antigüedad a partir de la cual se vuelve a
+            extraer aunque la página no haya cambiado (None para no forzarlo).
+    """
+
+    def __init__(self, path: str, reducer: HtmlReducer | None = None, max_distance: int = 3,
+                 max_age_seconds: float | None = 30 * 24 * 3600):
+        """
+        Inicializa la instancia de ChangeDetector.
+
+        Args:
+            path (str): Ruta del fichero SQLite. Se crea si no existe.
+            reducer (HtmlReducer | None): Reductor de contenido. Por defecto, uno que
+                conserva solo las regiones de precios.
+            max_distance (int): Distancia de Hamming máxima entre simhash.
+            max_age_seconds (float | None): Antigüedad máxima de una extracción reutilizada.
+        """
+        self.path = path
+        self.reducer = reducer or HtmlReducer()
+        self.max_distance = max_distance
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                price_hash TEXT NOT NULL,
+                simhash TEXT NOT NULL,
+                extraction TEXT NOT NULL,
+                extracted_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+        logger.info(f"ChangeDetector inicializado en {path} (max_distance={max_distance})")
+
+    def fingerprint(self, content: str, reduced: str | None = None) -> Dict[str, Any]:
+        """
+        Calcula la huella de la región de precios de una página.
+
+        Args:
+            content (str): Contenido scrapeado (HTML, markdown o texto).
+            reduced (str | None): Contenido ya reducido con el mismo reductor, si se tiene,
+                para no volver a parsear la página.
+
+        Returns:
+            Dict[str, Any]: Claves 'content_hash', 'price_hash' y 'simhash'.
+        """
+        with metrics.span("fingerprint"):
+            reduced = self.reducer.reduce(content) if reduced is None else reduced
+            lines = [" ".join(line.lower().split()) for line in reduced.splitlines()]
+            lines = [line for line in lines if line]
+            price_lines = [line for line in lines if PRICE_PATTERN.search(line)]
+            text = "\n".join(lines)
+            return {
+                "content_hash": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+                "price_hash": hashlib.sha256("\n".join(price_lines).encode("utf-8")).hexdigest(),
+                "simhash": simhash(text)
+            }
+
+    def check(self, url: str, content: str, reduced: str | None = None) -> Dict[str, Any]:
+        """
+        Compara una página con la huella guardada en la última extracción.
+
+        Args:
+            url (str): URL de la página.
+            content (str): Contenido scrapeado.
+            reduced (str | None): Contenido ya reducido con el mismo reductor (por ejemplo,
+                por el CpuStage). Si no se indica, la página se parsea aquí.
+
+        Returns:
+            Dict[str, Any]: Claves 'changed' (bool), 'reason', 'fingerprint',
+            'extraction' (la última extracción si la página no ha cambiado, o None) y
+            'text' (el texto de la página si se ha parseado aquí, o None), que puede
+            pasarse a ContentProcessor.extract para no volver a parsearla.
+        """
+        text = None
+        if reduced is None:
+            text = self.reducer.to_text(content)
+            reduced = self.reducer.reduce_text(text)
+        fingerprint = self.fingerprint(content, reduced)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, price_hash, simhash, extraction, extracted_at FROM fingerprints WHERE url = ?",
+                (url,)
+            ).fetchone()
+
+        if row is None:
+            changed, reason = True, "new"
+        elif self.max_age_seconds is not None and time.time() - row[4] >= self.max_age_seconds:
+            changed, reason = True, "expired"
+        elif row[0] == fingerprint["content_hash"]:
+            changed, reason = False, "identical"
+        elif row[1] != fingerprint["price_hash"]:
+            changed, reason = True, "prices"
+        elif hamming_distance(int(row[2], 16), fingerprint["simhash"]) > self.max_distance:
+            changed, reason = True, "content"
+        else:
+            changed, reason = False, "similar"
+
+        metrics.inc("change_detection_total", result="changed" if changed else "unchanged")
+        return {
+            "changed": changed,
+            "reason": reason,
+            "fingerprint": fingerprint,
+            "extraction": None if changed else json.loads(row[3]),
+            "text": text
+        }
+
+    def record(self, url: str, fingerprint: Dict[str, Any], extraction: Dict[str, Any]):
+        """
+        Guarda la huella y la extracción de una página tras enviarla al LLM.
+
+        Args:
+            url (str): URL de la página.
+            fingerprint (Dict[str, Any]): Huella calculada con fingerprint o check.
+            extraction (Dict[str, Any]): Resultado de la extracción.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fingerprints "
+                "(url, content_hash, price_hash, simhash, extraction, extracted_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, fingerprint["content_hash"], fingerprint["price_hash"], format(fingerprint["simhash"], "016x"),
+                 json.dumps(extraction, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+
+    @log_operation
+    def clear(self):
+        """
+        Elimina todas las huellas guardadas.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM fingerprints")
+            self._conn.commit()
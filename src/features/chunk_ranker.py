@@ -0,0 +1,113 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Sequence
+from src.features.html_reducer import PRICE_PATTERN
+
+TOKEN_PATTERN = re.compile(r"[$€£¥₹]|\w+")
+# Pseudo-término que representa cada importe o periodo de facturación encontrado por PRICE_PATTERN
+PRICE_TERM = "<price>"
+
+# Términos de la consulta y su peso: importes, monedas, periodos y nombres habituales de planes
+PRICING_TERMS: Dict[str, float] = {
+    PRICE_TERM: 3.0,
+    **dict.fromkeys(["$", "€", "£", "¥", "₹", "usd", "eur", "gbp"], 2.0),
+    **dict.fromkeys(["price", "prices", "pricing", "plan", "plans", "tier", "precio", "precios", "tarifa",
+                     "month", "monthly", "mo", "year", "yearly", "annual", "annually", "billed", "per",
+                     "user", "seat", "mes", "mensual", "anual"], 1.0),
+    **dict.fromkeys(["free", "starter", "basic", "pro", "professional", "plus", "premium", "business",
+                     "team", "enterprise", "trial"], 0.5),
+}
+
+
+class ChunkRanker:
+    """
+    Selección local de los chunks relevantes para la extracción de precios.
+
+    Puntúa cada chunk con BM25 frente a una consulta fija de términos de precios
+    (símbolos de moneda, periodos de facturación, nombres de planes y un
+    pseudo-término por cada importe que reconoce PRICE_PATTERN) y se queda con los
+    top_k mejores que tengan alguna señal de precios. Los chunks elegidos se
+    devuelven en su orden original para que la fusión de resultados siga siendo
+    determinista.
+
+    Attributes:
+        top_k (int): Número máximo de chunks que se envían al LLM.
+        k1 (float): Saturación de la frecuencia de términos de BM25.
+        b (float): Normalización por longitud de BM25.
+        terms (Dict[str, float]): Términos de la consulta y su peso.
+    """
+
+    def __init__(self, top_k: int = 3, k1: float = 1.2, b: float = 0.75, terms: Dict[str, float] | None = None):
+        """
+        Inicializa la instancia de ChunkRanker.
+
+        Args:
+            top_k (int): Número máximo de chunks que se envían al LLM.
+            k1 (float): Saturación de la frecuencia de términos de BM25.
+            b (float): Normalización por longitud de BM25.
+            terms (Dict[str, float] | None): Términos de la consulta y su peso. Por defecto, PRICING_TERMS.
+        """
+        if top_k < 1:
+            raise ValueError("top_k debe ser al menos 1")
+        self.top_k = top_k
+        self.k1 = k1
+        self.b = b
+        self.terms = terms or PRICING_TERMS
+
+    @staticmethod
+    def tokenize(chunk: str) -> List[str]:
+        tokens = TOKEN_PATTERN.findall(chunk.lower())
+        tokens.extend([PRICE_TERM] * len(PRICE_PATTERN.findall(chunk)))
+        return tokens
+
+    def score(self, chunks: Sequence[str]) -> List[float]:
+        """
+        Puntúa los chunks con BM25 frente a la consulta de términos de precios.
+
+        Args:
+            chunks (Sequence[str]): Chunks de una misma página.
+
+        Returns:
+            List[float]: Puntuación de cada chunk, en el orden de entrada (0 si no
+            contiene ningún término de la consulta).
+        """
+        counts = [Counter(self.tokenize(chunk)) for chunk in chunks]
+        lengths = [sum(count.values()) for count in counts]
+        average_length = sum(lengths) / len(lengths) if lengths else 0.0
+        # Frecuencia documental de cada término dentro de la página
+        frequencies = Counter(term for count in counts for term in self.terms if count[term])
+
+        scores = []
+        for count, length in zip(counts, lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / average_length) if average_length else self.k1
+            total = 0.0
+            for term, weight in self.terms.items():
+                tf = count[term]
+                if tf:
+                    idf = math.log(1 + (len(counts) - frequencies[term] + 0.5) / (frequencies[term] + 0.5))
+                    total += weight * idf * tf * (self.k1 + 1) / (tf + norm)
+            scores.append(total)
+        return scores
+
+    def select(self, chunks: Sequence[str]) -> List[int]:
+        """
+        Elige los top_k chunks con más señal de precios.
+
+        Los chunks sin ningún término de precios se descartan siempre; si ninguno
+        tiene señal se conserva el primero para que el LLM devuelva precios nulos
+        en lugar de no recibir nada.
+
+        Args:
+            chunks (Sequence[str]): Chunks de una misma página, en orden.
+
+        Returns:
+            List[int]: Índices de los chunks elegidos, en orden creciente.
+        """
+        scores = self.score(chunks)
+        # En caso de empate gana el chunk anterior
+        ranked = sorted((i for i, score in enumerate(scores) if score > 0), key=lambda i: (-scores[i], i))
+        selected = sorted(ranked[:self.top_k])
+        if not selected and chunks:
+            selected = [0]
+        return selected
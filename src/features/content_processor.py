@@ -1,10 +1,25 @@
+import contextvars
 import json
-from typing import List, Dict, Any
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Dict, Any, Iterator, Tuple
+from src.features.html_reducer import HtmlReducer
 from src.utils.loggingDecorator import log_operation, get_logger
+from src.utils.metrics import metrics
+from src.utils.rate_limiter import RateLimiter
+from src.utils.token_chunker import TokenChunker
 from src.utils.token_cost_calculator import TokenCostCalculator
 
 logger = get_logger(__name__)
 
+ENTITY_EXTRACTION_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "Get me the three pricing tiers from this website's content, and return as a JSON with three keys: {cheapest: {name: str, price: float}, middle: {name: str, price: float}, most_expensive: {name: str, price: float}}. If you can't find a price, use null for the price value."
+}
+
+# Estimación de tokens de la respuesta, que se reserva en el límite de TPM antes de cada llamada
+COMPLETION_TOKEN_ESTIMATE = 300
+
 class ContentProcessor:
     """
     Clase para procesar contenido y extraer información de precios.
@@ -15,51 +30,130 @@ class ContentProcessor:
     Attributes:
         openai_handler (OpenAIHandler): Instancia del manejador de OpenAI.
         token_calculator (TokenCostCalculator): Instancia del calculador de costos de tokens.
+        max_chunk_tokens (int): Número máximo de tokens por chunk.
+        chunk_overlap (int): Tokens de solapamiento entre chunks consecutivos.
+        rate_limiter (RateLimiter): Planificador de los límites RPM/TPM de la API.
+        max_workers (int): Número máximo de chunks procesados en paralelo.
+        reducer (HtmlReducer | None): Etapa de reducción del contenido previa al LLM.
+        rule_extractor (RuleBasedExtractor | None): Extracción por reglas previa al LLM.
+        chunk_ranker (ChunkRanker | None): Selección de los chunks con precios previa al LLM.
+        packer (RequestPacker | None): Agrupación de sitios pequeños en una sola petición.
+        cpu_stage (CpuStage | None): Pool de procesos para la reducción, el chunking y el conteo de tokens.
     """
 
-    def __init__(self, openai_handler: Any, token_calculator: TokenCostCalculator):
+    def __init__(self, openai_handler: Any, token_calculator: TokenCostCalculator,
+                 max_chunk_tokens: int = 4000, chunk_overlap: int = 0,
+                 rate_limiter: RateLimiter | None = None, max_workers: int = 4,
+                 reducer: HtmlReducer | None = None, rule_extractor: Any = None,
+                 chunk_ranker: Any = None, packer: Any = None, cpu_stage: Any = None):
         """
         Inicializa la instancia de ContentProcessor.
 
         Args:
             openai_handler (Any): Instancia del manejador de OpenAI.
             token_calculator (TokenCostCalculator): Instancia del calculador de costos de tokens.
+            max_chunk_tokens (int): Número máximo de tokens por chunk.
+            chunk_overlap (int): Tokens de solapamiento entre chunks consecutivos.
+            rate_limiter (RateLimiter | None): Planificador de límites de la API. Si no se
+                indica, se usa uno con los límites por defecto.
+            max_workers (int): Número máximo de chunks procesados en paralelo.
+            reducer (HtmlReducer | None): Etapa de reducción del contenido. Si no se
+                indica, se usa una HtmlReducer por defecto.
+            rule_extractor (RuleBasedExtractor | None): Extracción previa por reglas. Si se
+                indica, el LLM solo se usa cuando su confianza es baja.
+            chunk_ranker (ChunkRanker | None): Selección de chunks. Si se indica, solo los
+                top_k chunks con más señal de precios se envían al LLM.
+            packer (RequestPacker | None): Agrupación de peticiones. Si se indica, los sitios
+                que tras la reducción caben en max_site_tokens se extraen junto con otros en
+                una misma petición.
+            cpu_stage (CpuStage | None): Pool de procesos. Si se indica, la reducción, el
+                chunking y el conteo de tokens se hacen en él, con su propio max_chunk_tokens
+                y chunk_overlap, en lugar de en el hilo que llama.
         """
         self.openai_handler = openai_handler
         self.token_calculator = token_calculator
+        self.max_chunk_tokens = max_chunk_tokens
+        self.chunk_overlap = chunk_overlap
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_workers = max_workers
+        self.reducer = reducer or HtmlReducer()
+        self.rule_extractor = rule_extractor
+        self.chunk_ranker = chunk_ranker
+        self.packer = packer
+        self.cpu_stage = cpu_stage
         logger.info("ContentProcessor inicializado")
 
-    @staticmethod
+    def iter_chunks(self, content: str, max_tokens: int | None = None,
+                    overlap: int | None = None) -> Iterator[str]:
+        """
+        Genera de forma perezosa los chunks del contenido por número real de tokens.
+
+        Usa el tokenizador cl100k_base del TokenCostCalculator y prefiere cortar en
+        los límites de bloques HTML/markdown.
+
+        Args:
+            content (str): Contenido a dividir.
+            max_tokens (int | None): Número máximo de tokens por chunk (por defecto, max_chunk_tokens).
+            overlap (int | None): Tokens de solapamiento (por defecto, chunk_overlap).
+
+        Yields:
+            str: Chunks de como máximo max_tokens tokens.
+        """
+        chunker = TokenChunker(
+            self.token_calculator.tokenizer,
+            max_tokens=self.max_chunk_tokens if max_tokens is None else max_tokens,
+            overlap=self.chunk_overlap if overlap is None else overlap
+        )
+        return chunker.iter_chunks(content)
+
     @log_operation
-    def chunk_content(content: str, max_tokens: int = 4000) -> List[str]:
+    def chunk_content(self, content: str, max_tokens: int | None = None,
+                      overlap: int | None = None) -> List[str]:
         """
         Divide el contenido en chunks más pequeños.
 
         Args:
             content (str): Contenido a dividir.
-            max_tokens (int): Número máximo de tokens por chunk.
+            max_tokens (int | None): Número máximo de tokens por chunk (por defecto, max_chunk_tokens).
+            overlap (int | None): Tokens de solapamiento (por defecto, chunk_overlap).
 
         Returns:
             List[str]: Lista de chunks de contenido.
         """
-        words = content.split()
-        chunks = []
-        current_chunk = []
-        current_length = 0
+        with metrics.span("chunk") as span:
+            chunks = list(self.iter_chunks(content, max_tokens, overlap))
+            span["attributes"]["chunks"] = len(chunks)
+        logger.info(f"Contenido dividido en {len(chunks)} chunks")
+        return chunks
 
-        for word in words:
-            if current_length + len(word.split()) > max_tokens:
-                chunks.append(' '.join(current_chunk))
-                current_chunk = []
-                current_length = 0
-            current_chunk.append(word)
-            current_length += len(word.split())
+    def select_chunks(self, chunks: List[str], token_counts: Dict[str, int] | None = None) -> List[str]:
+        """
+        Se queda con los chunks relevantes para precios si hay un ChunkRanker configurado.
 
-        if current_chunk:
-            chunks.append(' '.join(current_chunk))
+        Args:
+            chunks (List[str]): Chunks de una página, en orden.
+            token_counts (Dict[str, int] | None): Tokens ya contados de cada chunk.
 
-        logger.info(f"Contenido dividido en {len(chunks)} chunks")
-        return chunks
+        Returns:
+            List[str]: Chunks que se envían al LLM, en su orden original.
+        """
+        if self.chunk_ranker is None or len(chunks) <= 1:
+            return chunks
+        with metrics.span("rank") as span:
+            indices = set(self.chunk_ranker.select(chunks))
+            selected = [chunk for i, chunk in enumerate(chunks) if i in indices]
+            saved = sum(self._count_tokens(chunk, token_counts)
+                        for i, chunk in enumerate(chunks) if i not in indices)
+            span["attributes"].update(chunks=len(chunks), selected=len(selected), tokens_saved=saved)
+        metrics.inc("tokens_saved_total", saved, stage="rank")
+        logger.info(f"Seleccionados {len(selected)}/{len(chunks)} chunks por relevancia "
+                    f"({saved} tokens ahorrados)")
+        return selected
+
+    def _count_tokens(self, text: str, token_counts: Dict[str, int] | None) -> int:
+        if token_counts is not None and text in token_counts:
+            return token_counts[text]
+        return self.token_calculator.count_tokens(text)
 
     @staticmethod
     def get_valid_price(tier: Dict[str, Any]) -> float | None:
@@ -74,58 +168,229 @@ class ContentProcessor:
         """
         return tier.get("price") if tier and isinstance(tier.get("price"), (int, float)) else None
 
+    def prepare_content(self, content: str, text: str | None = None) -> str:
+        """
+        Reduce el contenido scrapeado a texto compacto y regiones de precios.
+
+        Args:
+            content (str): Contenido scrapeado (HTML, markdown o texto).
+            text (str | None): Texto del contenido ya obtenido con el mismo reductor
+                (HtmlReducer.to_text), si se tiene, para no volver a parsearlo.
+
+        Returns:
+            str: Contenido reducido listo para dividir en chunks.
+        """
+        with metrics.span("reduce") as span:
+            report = self.reducer.reduce_with_report(content, self.token_calculator, text=text)
+            span["attributes"].update(original_tokens=report["original_tokens"],
+                                      reduced_tokens=report["reduced_tokens"])
+        logger.info(f"Contenido reducido de {report['original_tokens']} a {report['reduced_tokens']} "
+                    f"tokens (x{report['ratio']:.1f})")
+        return report["content"]
+
     @log_operation
-    def extract(self, user_input: str) -> str:
+    def extract(self, user_input: str, page: Any = None, text: str | None = None) -> str:
         """
         Extrae información de precios del contenido proporcionado.
 
         Args:
             user_input (str): Contenido del cual extraer información de precios.
+            page (PreparedPage | None): La página ya preparada por el CpuStage (por
+                ejemplo, en un lote de BatchRunner). Si no se indica y hay CpuStage, se
+                prepara aquí.
+            text (str | None): Texto de la página ya obtenido con el mismo reductor (por
+                ejemplo, por ChangeDetector.check), para no volver a parsearla en las
+                reglas ni en la reducción.
 
         Returns:
             str: JSON string con la información de precios extraída.
         """
-        entity_extraction_system_message = {
-            "role": "system",
-            "content": "Get me the three pricing tiers from this website's content, and return as a JSON with three keys: {cheapest: {name: str, price: float}, middle: {name: str, price: float}, most_expensive: {name: str, price: float}}. If you can't find a price, use null for the price value."
-        }
+        if page is None and self.cpu_stage is not None:
+            page = self.cpu_stage.prepare(user_input)
+        if self.rule_extractor is not None:
+            if page is not None and page.rules is not None:
+                # Las reglas ya se aplicaron en el pool, sobre el mismo parseo que la reducción
+                rules = page.rules
+            else:
+                with metrics.span("rules") as span:
+                    rules = self.rule_extractor.extract(user_input, text)
+                    span["attributes"].update(source=rules["source"], confidence=rules["confidence"])
+            if rules["confidence"] >= self.rule_extractor.min_confidence:
+                logger.info(f"Precios extraídos por reglas ({rules['source']}, confianza {rules['confidence']:.2f})")
+                metrics.inc("rule_extraction_total", result="hit", source=rules["source"])
+                return json.dumps(rules["result"])
+            metrics.inc("rule_extraction_total", result="fallback")
 
-        chunks = self.chunk_content(user_input)
-        all_results = []
-
-        for i, chunk in enumerate(chunks):
-            logger.info(f"Procesando chunk {i+1}/{len(chunks)}")
-            messages = [
-                entity_extraction_system_message,
-                {"role": "user", "content": chunk}
-            ]
-            try:
-                result = json.loads(self.openai_handler.get_completion(messages))
-                all_results.append(result)
-            except json.JSONDecodeError:
-                logger.error(f"Error al decodificar JSON para el chunk {i+1}")
+        chunks, token_counts = None, None
+        if page is not None:
+            logger.info(f"Contenido reducido de {page.original_tokens} a {page.reduced_tokens} tokens "
+                        f"y dividido en {len(page.chunks)} chunks en el pool de procesos")
+            content, chunks = page.content, page.chunks
+            token_counts = {content: page.reduced_tokens, **dict(zip(page.chunks, page.chunk_tokens))}
+        else:
+            content = self.prepare_content(user_input, text)
 
-        try:
-            final_result = {
-                "cheapest": min(
-                    (r["cheapest"] for r in all_results if "cheapest" in r),
-                    key=lambda x: self.get_valid_price(x) or float("inf")
-                ),
-                "most_expensive": max(
-                    (r["most_expensive"] for r in all_results if "most_expensive" in r),
-                    key=lambda x: self.get_valid_price(x) or float("-inf")
-                )
-            }
-
-            all_prices = [
-                tier for r in all_results for tier in [r.get("cheapest"), r.get("middle"), r.get("most_expensive")]
-                if tier and self.get_valid_price(tier) is not None
-            ]
-            all_prices.sort(key=lambda x: self.get_valid_price(x))
-            final_result["middle"] = all_prices[len(all_prices) // 2] if all_prices else None
+        if self.packer is not None:
+            tokens = self._count_tokens(content, token_counts)
+            if tokens <= self.packer.max_site_tokens:
+                try:
+                    result = self.packer.submit(content, tokens).result(timeout=self.packer.timeout)
+                except FutureTimeoutError:
+                    logger.warning(f"El paquete del sitio no respondió en {self.packer.timeout}s")
+                    result = None
+                if result is not None:
+                    return self.finalize_results([result])
+                logger.warning("El sitio no tiene un resultado válido en su paquete; se extrae por separado")
+
+        chunks = self.select_chunks(self.chunk_content(content) if chunks is None else chunks, token_counts)
+        system_tokens = self.token_calculator.count_tokens(ENTITY_EXTRACTION_SYSTEM_MESSAGE["content"])
+
+        def process_chunk(index: int, chunk: str) -> Dict[str, Any] | None:
+            logger.info(f"Procesando chunk {index + 1}/{len(chunks)}")
+            estimated_tokens = system_tokens + self._count_tokens(chunk, token_counts) + COMPLETION_TOKEN_ESTIMATE
+            with metrics.span("extract_chunk", chunk=index):
+                try:
+                    # El hueco del RateLimiter solo se reserva si la respuesta no está en la caché
+                    return json.loads(self.openai_handler.get_completion(
+                        self.build_messages(chunk), before_request=lambda: self.rate_limiter.acquire(estimated_tokens)))
+                except json.JSONDecodeError:
+                    logger.error(f"Error al decodificar JSON para el chunk {index + 1}")
+                    return None
+
+        # Cada hilo ejecuta su chunk en una copia del contexto actual para que los spans queden anidados
+        context = contextvars.copy_context()
+
+        def run_in_context(index: int, chunk: str) -> Dict[str, Any] | None:
+            return context.copy().run(process_chunk, index, chunk)
+
+        # map conserva el orden de los chunks, por lo que la fusión es determinista
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(chunks)))) as executor:
+            all_results = [r for r in executor.map(run_in_context, range(len(chunks)), chunks) if r is not None]
+
+        return self.finalize_results(all_results)
+
+    @staticmethod
+    def build_messages(chunk: str) -> List[Dict[str, str]]:
+        """
+        Construye los mensajes de extracción de precios para un chunk.
 
+        Args:
+            chunk (str): Chunk de contenido.
+
+        Returns:
+            List[Dict[str, str]]: Mensajes de sistema y de usuario para la API.
+        """
+        return [
+            ENTITY_EXTRACTION_SYSTEM_MESSAGE,
+            {"role": "user", "content": chunk}
+        ]
+
+    def finalize_results(self, all_results: List[Dict[str, Any]]) -> str:
+        """
+        Fusiona los resultados por chunk y los serializa como JSON.
+
+        Args:
+            all_results (List[Dict[str, Any]]): Resultados JSON de cada chunk, en orden.
+
+        Returns:
+            str: JSON string con la información de precios extraída o con una clave 'error'.
+        """
+        try:
+            with metrics.span("merge"):
+                final_result = self.merge_results(all_results)
             logger.info("Extracción de precios completada exitosamente")
             return json.dumps(final_result)
         except Exception as e:
             logger.error(f"Error al procesar los resultados finales: {e}")
-            return json.dumps({"error": "No se pudo extraer la información de precios"})
\ No newline at end of file
+            return json.dumps({"error": "No se pudo extraer la información de precios"})
+
+    def build_batch_requests(self, sites: Dict[str, str]) -> Iterator[Dict[str, Any]]:
+        """
+        Genera las peticiones de extracción de varios sitios para el modo batch.
+
+        Args:
+            sites (Dict[str, str]): Mapa de nombre de sitio a contenido scrapeado.
+
+        Yields:
+            Dict[str, Any]: Peticiones con las claves 'custom_id' ("<sitio>::<chunk>") y 'messages'.
+        """
+        for site_name, content in sites.items():
+            chunks = list(self.iter_chunks(self.prepare_content(content)))
+            for index, chunk in enumerate(self.select_chunks(chunks)):
+                yield {"custom_id": f"{site_name}::{index}", "messages": self.build_messages(chunk)}
+
+    def extract_batch(self, sites: Dict[str, str], batch_handler: Any,
+                      requests_path: str) -> Iterator[Tuple[str, str]]:
+        """
+        Extrae los precios de varios sitios mediante la Batch API de OpenAI.
+
+        Serializa todas las peticiones en un fichero JSONL, envía el batch, espera a que
+        termine y recorre los resultados en streaming; cada sitio se fusiona y se entrega
+        en cuanto han llegado todos sus chunks.
+
+        Args:
+            sites (Dict[str, str]): Mapa de nombre de sitio a contenido scrapeado.
+            batch_handler (Any): Instancia de OpenAIBatchHandler.
+            requests_path (str): Ruta del fichero JSONL de peticiones.
+
+        Yields:
+            Tuple[str, str]: Nombre del sitio y JSON string con sus precios extraídos.
+        """
+        pending: Dict[str, int] = defaultdict(int)
+        for custom_id in batch_handler.write_requests(self.build_batch_requests(sites), requests_path):
+            pending[custom_id.rsplit("::", 1)[0]] += 1
+
+        results: Dict[str, Dict[int, Dict[str, Any]]] = defaultdict(dict)
+        batch = batch_handler.wait(batch_handler.submit(requests_path))
+        for custom_id, content in batch_handler.iter_results(batch):
+            site_name, index = custom_id.rsplit("::", 1)
+            pending[site_name] -= 1
+            if content is not None:
+                try:
+                    results[site_name][int(index)] = json.loads(content)
+                except json.JSONDecodeError:
+                    logger.error(f"Error al decodificar JSON para {custom_id}")
+            if pending[site_name] == 0:
+                site_results = results.pop(site_name, {})
+                yield site_name, self.finalize_results([site_results[i] for i in sorted(site_results)])
+
+        # Sitios sin contenido o con peticiones perdidas en el batch
+        for site_name in sites:
+            if pending.get(site_name) != 0:
+                site_results = results.pop(site_name, {})
+                yield site_name, self.finalize_results([site_results[i] for i in sorted(site_results)])
+
+    def merge_results(self, all_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Fusiona los resultados por chunk en un único conjunto de tres tiers.
+
+        Los resultados deben venir en el orden de los chunks: en caso de empate se
+        conserva el primero, de modo que la fusión es determinista.
+
+        Args:
+            all_results (List[Dict[str, Any]]): Resultados JSON de cada chunk, en orden.
+
+        Returns:
+            Dict[str, Any]: Diccionario con las claves cheapest, middle y most_expensive.
+
+        Raises:
+            ValueError: Si ningún resultado contiene los tiers cheapest y most_expensive.
+        """
+        final_result = {
+            "cheapest": min(
+                (r["cheapest"] for r in all_results if "cheapest" in r),
+                key=lambda x: self.get_valid_price(x) or float("inf")
+            ),
+            "most_expensive": max(
+                (r["most_expensive"] for r in all_results if "most_expensive" in r),
+                key=lambda x: self.get_valid_price(x) or float("-inf")
+            )
+        }
+
+        all_prices = [
+            tier for r in all_results for tier in [r.get("cheapest"), r.get("middle"), r.get("most_expensive")]
+            if tier and self.get_valid_price(tier) is not None
+        ]
+        all_prices.sort(key=lambda x: self.get_valid_price(x))
+        final_result["middle"] = all_prices[len(all_prices) // 2] if all_prices else None
+        return final_result
@@ -0,0 +1,181 @@
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple
+from src.features.html_reducer import HtmlReducer
+from src.features.rule_extractor import RuleBasedExtractor
+from src.utils.loggingDecorator import get_logger
+from src.utils.metrics import metrics
+from src.utils.token_chunker import TokenChunker
+
+logger = get_logger(__name__)
+
+ENCODING_NAME = "cl100k_base"
+
+# Estado de cada proceso del pool: se crea una vez en _init_worker y se reutiliza en cada página
+_worker: Dict[str, Any] = {}
+
+
+class PreparedPage(NamedTuple):
+    content: str
+    chunks: List[str]
+    chunk_tokens: List[int]
+    original_tokens: int
+    reduced_tokens: int
+    rules: Dict[str, Any] | None = None
+
+
+def _init_worker(reducer_options: Dict[str, Any], max_chunk_tokens: int, chunk_overlap: int,
+                 rule_options: Dict[str, Any] | None):
+    # tiktoken se importa en el proceso hijo; cada proceso tiene su propio tokenizador
+    import tiktoken
+    encoding = tiktoken.get_encoding(ENCODING_NAME)
+    _worker["encoding"] = encoding
+    _worker["reducer"] = HtmlReducer(**reducer_options)
+    _worker["chunker"] = TokenChunker(encoding, max_tokens=max_chunk_tokens, overlap=chunk_overlap)
+    _worker["rules"] = None if rule_options is None else RuleBasedExtractor(reducer=_worker["reducer"],
+                                                                            **rule_options)
+
+
+def _prepare_page(content: str) -> PreparedPage:
+    # La página se convierte en texto una sola vez, para las reglas y para la reducción
+    text = _worker["reducer"].to_text(content)
+    rules = None
+    if _worker["rules"] is not None:
+        rules = _worker["rules"].extract(content, text)
+        if rules["confidence"] >= _worker["rules"].min_confidence:
+            # Las reglas bastan: no hace falta reducir, dividir ni contar tokens
+            return PreparedPage("", [], [], 0, 0, rules)
+    reduced = _worker["reducer"].reduce_text(text)
+    chunks = list(_worker["chunker"].iter_chunks(reduced))
+    # Una sola llamada al tokenizador para la página, el contenido reducido y sus chunks.
+    # num_threads=1: el paralelismo lo ponen los procesos, no los hilos de tiktoken
+    encoded = _worker["encoding"].encode_batch([content, reduced, *chunks], num_threads=1,
+                                               disallowed_special=())
+    original_tokens, reduced_tokens, *chunk_tokens = map(len, encoded)
+    return PreparedPage(reduced, chunks, chunk_tokens, original_tokens, reduced_tokens, rules)
+
+
+def _prepare_pages(contents: List[str]) -> List[PreparedPage]:
+    return [_prepare_page(content) for content in contents]
+
+
+class CpuStage:
+    """
+    Etapa de CPU del pipeline ejecutada en un pool de procesos.
+
+    Parsea y limpia el HTML (HtmlReducer), lo divide en chunks por tokens
+    (TokenChunker) y cuenta los tokens de la página, del contenido reducido y de
+    cada chunk con una única llamada a encode_batch de tiktoken. Con un
+    RuleBasedExtractor, las reglas se aplican también en el pool sobre el mismo
+    texto, y si bastan el resto del trabajo se omite. Cada proceso crea su reductor
+    y su tokenizador una sola vez al arrancar, de modo que por página solo viaja el
+    HTML de ida y el contenido reducido y sus chunks de vuelta. Así el trabajo de
+    CPU deja de ejecutarse bajo el GIL del proceso principal y puede repartirse
+    entre varios núcleos; la aceleración real depende de los núcleos disponibles
+    (benchmarks.bench_cpu_stage la mide).
+
+    Attributes:
+        workers (int): Número de procesos del pool.
+        max_chunk_tokens (int): Número máximo de tokens por chunk.
+        chunk_overlap (int): Tokens de solapamiento entre chunks consecutivos.
+        batch_size (int): Páginas enviadas juntas a un proceso en submit_batch y prepare_many.
+    """
+
+    def __init__(self, workers: int | None = None, max_chunk_tokens: int = 4000, chunk_overlap: int = 0,
+                 reducer: HtmlReducer | None = None, batch_size: int = 8,
+                 rule_extractor: RuleBasedExtractor | None = None):
+        """
+        Inicializa la instancia de CpuStage y arranca el pool de procesos.
+
+        Args:
+            workers (int | None): Número de procesos. Por defecto, el número de núcleos.
+            max_chunk_tokens (int): Número máximo de tokens por chunk.
+            chunk_overlap (int): Tokens de solapamiento entre chunks consecutivos.
+            reducer (HtmlReducer | None): Reductor cuya configuración se replica en cada
+                proceso. Si no se indica, se usa una HtmlReducer por defecto.
+            batch_size (int): Páginas enviadas juntas a un proceso en submit_batch y
+                prepare_many, para amortizar el coste de cada envío entre procesos.
+            rule_extractor (RuleBasedExtractor | None): Extractor por reglas cuya
+                configuración se replica en cada proceso. Si se indica, cada página pasa
+                primero por las reglas (PreparedPage.rules).
+        """
+        reducer = reducer or HtmlReducer()
+        self.workers = workers or os.cpu_count() or 1
+        self.max_chunk_tokens = max_chunk_tokens
+        self.chunk_overlap = chunk_overlap
+        self.batch_size = batch_size
+        reducer_options = {
+            "pricing_only": reducer.pricing_only,
+            "context_lines": reducer.context_lines,
+            "max_context_chars": reducer.max_context_chars,
+            "parser": reducer.parser
+        }
+        rule_options = None if rule_extractor is None else {
+            "min_confidence": rule_extractor.min_confidence,
+            "parser": rule_extractor.parser
+        }
+        # forkserver: los procesos no heredan los hilos ni los locks del proceso principal
+        context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        )
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=context, initializer=_init_worker,
+            initargs=(reducer_options, max_chunk_tokens, chunk_overlap, rule_options)
+        )
+        logger.info(f"CpuStage inicializada con {self.workers} procesos")
+
+    def prepare(self, content: str) -> PreparedPage:
+        """
+        Prepara una página en el pool. Puede llamarse a la vez desde varios hilos.
+
+        Args:
+            content (str): Contenido scrapeado (HTML, markdown o texto).
+
+        Returns:
+            PreparedPage: Contenido reducido, sus chunks, los tokens de cada chunk, los
+            tokens de la página antes y después de la reducción y el resultado de las
+            reglas. Si las reglas alcanzan su confianza mínima, el contenido y los chunks
+            quedan vacíos.
+        """
+        with metrics.span("cpu_stage") as span:
+            page = self._executor.submit(_prepare_page, content).result()
+            span["attributes"].update(chunks=len(page.chunks), original_tokens=page.original_tokens,
+                                      reduced_tokens=page.reduced_tokens)
+        return page
+
+    def submit_batch(self, contents: List[str]) -> Future:
+        """
+        Envía un lote de páginas a un mismo proceso, en un único envío entre procesos.
+
+        Args:
+            contents (List[str]): Contenidos scrapeados, normalmente batch_size.
+
+        Returns:
+            Future: Futuro con la lista de PreparedPage, en el orden de entrada.
+        """
+        return self._executor.submit(_prepare_pages, list(contents))
+
+    def prepare_many(self, contents: Iterable[str]) -> Iterator[PreparedPage]:
+        """
+        Prepara muchas páginas repartiéndolas en lotes entre los procesos.
+
+        Args:
+            contents (Iterable[str]): Contenidos scrapeados.
+
+        Yields:
+            PreparedPage: Páginas preparadas, en el orden de entrada.
+        """
+        return self._executor.map(_prepare_page, contents, chunksize=self.batch_size)
+
+    def close(self):
+        """
+        Detiene el pool de procesos.
+        """
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "CpuStage":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,46 +1,234 @@
+import argparse
+import contextvars
 import json
-import re
-from typing import Dict, List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
 from src.utils.competitor_sites import CompetitorSites
+from src.utils.feature_matcher import FeatureIndex, FeatureMatcher
+from src.features.scrape_strategy import ScrapeStrategy
 from src.features.scraper import Scraper
+from src.utils.http_cache import HttpCache
+from src.utils.llm_cache import LLMCache
 from src.features.content_processor import ContentProcessor
 from src.utils.token_cost_calculator import TokenCostCalculator
-from src.models.openai_handler import OpenAIHandler
+from src.models.openai_handler import OpenAIHandler, track_usage
+from src.utils.metrics import metrics, percentile
+from src.utils.price_store import parse_price
+
+# prompt: pregunta libre al LLM con el contenido completo; extract: el pipeline de producción
+# (ContentProcessor.extract, con sus reglas y su selección de chunks)
+EVALUATION_MODES = ("prompt", "extract")
+EXTRACTION_TIERS = ("cheapest", "middle", "most_expensive")
+
+
+def same_price(expected: Any, generated: Any) -> bool:
+    """
+    Compara dos precios por su importe ("$1,199", 1199.0...); dos precios sin importe
+    ("Custom", null) se consideran iguales.
+    """
+    expected_price, generated_price = parse_price(expected), parse_price(generated)
+    if expected_price is None or generated_price is None:
+        return expected_price is None and generated_price is None
+    return abs(expected_price - generated_price) < 0.005
 
 
 class Evaluator:
-    def __init__(self):
-        self.competitor_sites = CompetitorSites("../data/competitor_sites.json")
-        self.scraper = Scraper()
-        self.openai_handler = OpenAIHandler()
-        self.token_calculator = TokenCostCalculator()
-        self.content_processor = ContentProcessor(self.openai_handler, self.token_calculator)
+    def __init__(self, competitor_sites: CompetitorSites | None = None, scraper: Scraper | None = None,
+                 openai_handler: OpenAIHandler | None = None, token_calculator: TokenCostCalculator | None = None,
+                 content_processor: ContentProcessor | None = None, feature_matcher: FeatureMatcher | None = None,
+                 scrape_strategy: ScrapeStrategy | None = None):
+        # Los componentes pueden compartirse (ver ServiceContainer) para no duplicar clientes ni tokenizadores
+        self.competitor_sites = competitor_sites or CompetitorSites("../data/competitor_sites.json")
+        self.scraper = scraper or Scraper(cache=HttpCache("../data/cache/http_cache.db"))
+        self.openai_handler = openai_handler or OpenAIHandler(cache=LLMCache("../data/cache/llm_cache.db"))
+        self.token_calculator = token_calculator or TokenCostCalculator()
+        self.content_processor = content_processor or ContentProcessor(self.openai_handler, self.token_calculator)
+        self.feature_matcher = feature_matcher or FeatureMatcher()
+        # Sin estrategia se mantiene Jina AI como único método: la evaluación envía el contenido
+        # sin reducir, por lo que todos los casos deben recibir el mismo tipo de contenido
+        self.scrape_strategy = scrape_strategy
+        # Características esperadas de cada tier, preparadas una vez y reutilizadas en cada evaluación
+        self._feature_indexes: Dict[Tuple[str, ...], FeatureIndex] = {}
+
+    def feature_index(self, features: List[str]) -> FeatureIndex:
+        """
+        Devuelve las características esperadas de un tier preparadas para el FeatureMatcher.
+
+        Args:
+            features (List[str]): Características esperadas, sin duplicados.
+
+        Returns:
+            FeatureIndex: Índice construido la primera vez que se piden esas características.
+        """
+        key = tuple(features)
+        index = self._feature_indexes.get(key)
+        if index is None:
+            index = self._feature_indexes.setdefault(key, self.feature_matcher.index(features))
+        return index
 
-    def evaluate_response(self, site_name: str, query: str, expected_result: Dict) -> Dict:
-        sites = self.competitor_sites.get_sites()
-        selected_site = next((site for site in sites if site['name'] == site_name), None)
+    def evaluate_response(self, site_name: str, query: str, expected_result: Dict,
+                          on_tier: Callable[[str, Any], None] | None = None) -> Dict:
+        selected_site = self.competitor_sites.get_site(site_name)
 
         if not selected_site:
             return {"error": f"Site {site_name} not found"}
 
-        try:
-            content = self.scraper.scrape_jina_ai(selected_site['url'])
-            prompt = f"""Based on the following content from {site_name}, please answer this question: {query}
+        with metrics.span("site", site=site_name):
+            try:
+                content = self.scrape(selected_site['url'])
+                messages = self.build_messages(site_name, query, content)
+                if on_tier is None:
+                    result_dict = json.loads(self.openai_handler.get_completion(messages))
+                else:
+                    # Cada tier se entrega en cuanto su objeto JSON se cierra
+                    result_dict = {}
+                    for tier_name, details in self.openai_handler.stream_completion(
+                            messages, required_keys=expected_result.keys()):
+                        if tier_name == "error":
+                            raise RuntimeError(details)
+                        result_dict[tier_name] = details
+                        on_tier(tier_name, details)
+
+                evaluation = self._compare_results(result_dict, expected_result)
+                evaluation["raw_response"] = result_dict
+
+                return evaluation
+
+            except Exception as e:
+                return {"error": str(e)}
+
+    def scrape(self, url: str) -> str:
+        """
+        Obtiene el contenido de una URL para evaluarla.
 
-            If the question is about pricing or features, please structure your answer as a JSON object with keys for each pricing tier, including 'name', 'price', and 'features' for each tier.
+        Args:
+            url (str): URL a scrapear.
 
-            Content: {content}"""
+        Returns:
+            str: Contenido markdown de Jina AI o, si se ha indicado una ScrapeStrategy, el
+            del método elegido por ella.
 
-            result = self.openai_handler.get_completion([{"role": "user", "content": prompt}])
-            result_dict = json.loads(result)
+        Raises:
+            requests.RequestException: Si falla la descarga con Jina AI.
+            RuntimeError: Si ningún método de la estrategia obtiene un resultado válido.
+        """
+        if self.scrape_strategy is not None:
+            return self.scrape_strategy.scrape_content(url)
+        return self.scraper.scrape_jina_ai(url)
 
-            evaluation = self._compare_results(result_dict, expected_result)
-            evaluation["raw_response"] = result_dict
+    @staticmethod
+    def build_messages(site_name: str, query: str, content: str) -> List[Dict[str, str]]:
+        """
+        Construye el mensaje de la evaluación en modo prompt.
 
-            return evaluation
+        Args:
+            site_name (str): Nombre del sitio.
+            query (str): Pregunta del caso.
+            content (str): Contenido scrapeado, sin reducir.
 
-        except Exception as e:
-            return {"error": str(e)}
+        Returns:
+            List[Dict[str, str]]: Mensaje de usuario para la API.
+        """
+        # Texto idéntico al del prompt original, incluida la sangría de sus líneas, para que
+        # las respuestas ya guardadas en LLMCache sigan siendo válidas
+        indent = " " * 12
+        prompt = (f"Based on the following content from {site_name}, please answer this question: {query}\n\n"
+                  f"{indent}If the question is about pricing or features, please structure your answer as a JSON "
+                  f"object with keys for each pricing tier, including 'name', 'price', and 'features' for each tier.\n\n"
+                  f"{indent}Content: {content}")
+        return [{"role": "user", "content": prompt}]
+
+    def evaluate_case(self, case: Dict[str, Any], mode: str = "prompt") -> Dict[str, Any]:
+        """
+        Evalúa un caso del golden set midiendo su latencia, tokens y coste.
+
+        Los tokens son los que informa la API; las respuestas servidas desde LLMCache
+        no consumen tokens ni tienen coste.
+
+        Args:
+            case (Dict[str, Any]): Caso con las claves 'site', 'query' y 'expected'.
+            mode (str): 'prompt' pregunta al LLM con el contenido completo; 'extract'
+                extrae los tiers con ContentProcessor.extract, como en producción.
+
+        Returns:
+            Dict[str, Any]: Resultado con las claves 'site', 'accuracy', 'latency',
+            'prompt_tokens', 'completion_tokens', 'cost', 'error' y la evaluación detallada.
+        """
+        if mode not in EVALUATION_MODES:
+            raise ValueError(f"Modo de evaluación desconocido: {mode}")
+        start = time.perf_counter()
+        result = {"site": case["site"], "accuracy": 0.0, "prompt_tokens": 0, "completion_tokens": 0,
+                  "cost": 0.0, "error": None}
+        selected_site = self.competitor_sites.get_site(case["site"])
+        with metrics.span("site", site=case["site"]):
+            try:
+                if not selected_site:
+                    raise ValueError(f"Site {case['site']} not found")
+                # El contenido se sirve desde la caché HTTP del scraper entre ejecuciones
+                content = self.scrape(selected_site['url'])
+                if mode == "extract":
+                    # Incluye las llamadas de los hilos de chunks, que copian el contexto actual
+                    with track_usage() as usage:
+                        generated = json.loads(self.content_processor.extract(content))
+                    prompt_tokens, completion_tokens = usage["prompt_tokens"], usage["completion_tokens"]
+                else:
+                    completion = self.openai_handler.complete(self.build_messages(case["site"], case["query"], content))
+                    generated = json.loads(completion.content)
+                    prompt_tokens, completion_tokens = completion.prompt_tokens, completion.completion_tokens
+                result["prompt_tokens"], result["completion_tokens"] = prompt_tokens, completion_tokens
+                result["cost"] = ((prompt_tokens + completion_tokens) / 1_000_000
+                                  * self.token_calculator.cost_per_million_tokens)
+                if set(generated) == {"error"}:
+                    raise RuntimeError(generated["error"])
+                if mode == "extract":
+                    evaluation = self._compare_extraction(generated, case["expected"])
+                else:
+                    evaluation = self._compare_results(generated, case["expected"])
+                result.update(evaluation)
+            except Exception as e:
+                result["error"] = str(e)
+        result["latency"] = time.perf_counter() - start
+        return result
+
+    def evaluate_golden_set(self, cases: List[Dict[str, Any]], max_workers: int = 8,
+                            mode: str = "prompt") -> Dict[str, Any]:
+        """
+        Evalúa en paralelo todos los casos de un golden set.
+
+        Args:
+            cases (List[Dict[str, Any]]): Casos con las claves 'site', 'query' y 'expected'.
+            max_workers (int): Número de casos evaluados a la vez.
+            mode (str): Modo de evaluación de cada caso ('prompt' o 'extract').
+
+        Returns:
+            Dict[str, Any]: Claves 'cases' (resultado de cada caso, en el orden del golden
+            set) y 'summary' (precisión media, latencias p50/p95, tokens y coste totales).
+        """
+        # Las características del golden set se preparan antes de repartir los casos entre los hilos
+        for case in cases:
+            for details in case["expected"].values():
+                self.feature_index(list(dict.fromkeys(details.get("features", []))))
+        # Cada hilo ejecuta su caso en una copia del contexto actual para que los spans queden anidados
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(cases)))) as executor:
+            results = list(executor.map(lambda case: context.copy().run(self.evaluate_case, case, mode), cases))
+
+        succeeded = [r for r in results if r["error"] is None]
+        latencies = [r["latency"] for r in results]
+
+        summary = {
+            "cases": len(results),
+            "errors": len(results) - len(succeeded),
+            "mean_accuracy": sum(r["accuracy"] for r in results) / len(results) if results else 0.0,
+            "latency_p50": percentile(latencies, 0.50),
+            "latency_p95": percentile(latencies, 0.95),
+            "prompt_tokens": sum(r["prompt_tokens"] for r in results),
+            "completion_tokens": sum(r["completion_tokens"] for r in results),
+            "total_cost": sum(r["cost"] for r in results),
+        }
+        summary["cost_per_site"] = summary["total_cost"] / len(succeeded) if succeeded else 0.0
+        return {"cases": results, "summary": summary}
 
     def _compare_results(self, generated: Dict, expected: Dict) -> Dict:
         evaluation = {
@@ -62,98 +250,122 @@ class Evaluator:
 
             # Comparar nombre
             total_points += 1
-            if generated_tier.get("name", "").lower() == expected_details.get("name", "").lower():
+            if str(generated_tier.get("name") or "").lower() == expected_details.get("name", "").lower():
                 earned_points += 1
             else:
                 evaluation["incorrect_info"].append(f"Incorrect name for {expected_tier_name}")
 
             # Comparar precio
             total_points += 1
-            expected_price = re.findall(r'\d+', expected_details.get("price", "0"))
-            generated_price = re.findall(r'\d+', generated_tier.get("price", "0"))
-            if expected_price and generated_price and expected_price[0] == generated_price[0]:
+            if same_price(expected_details.get("price"), generated_tier.get("price")):
                 earned_points += 1
             else:
                 evaluation["incorrect_info"].append(f"Incorrect price for {expected_tier_name}")
 
-            # Comparar características
-            expected_features = set(expected_details.get("features", []))
-            generated_features = set(generated_tier.get("features", []))
+            # Comparar características (sin duplicados y en el orden original, para que el resultado sea determinista)
+            expected_features = list(dict.fromkeys(expected_details.get("features", [])))
+            generated_features = list(dict.fromkeys(generated_tier.get("features", [])))
+            feature_match = self.feature_matcher.match(self.feature_index(expected_features), generated_features)
 
             total_points += len(expected_features)
-            for expected_feature in expected_features:
-                if any(expected_feature.lower() in gen_feature.lower() for gen_feature in generated_features):
-                    earned_points += 1
-                else:
-                    evaluation["missing_info"].append(f"Missing feature in {expected_tier_name}: {expected_feature}")
-
-            for generated_feature in generated_features:
-                if not any(exp_feature.lower() in generated_feature.lower() for exp_feature in expected_features):
-                    evaluation["extra_info"].append(f"Extra feature in {expected_tier_name}: {generated_feature}")
+            earned_points += len(feature_match["matched"])
+            for expected_feature in feature_match["missing"]:
+                evaluation["missing_info"].append(f"Missing feature in {expected_tier_name}: {expected_feature}")
+            for generated_feature in feature_match["extra"]:
+                evaluation["extra_info"].append(f"Extra feature in {expected_tier_name}: {generated_feature}")
 
         evaluation["accuracy"] = earned_points / total_points if total_points > 0 else 0
 
         return evaluation
 
+    @staticmethod
+    def _compare_extraction(generated: Dict, expected: Dict) -> Dict:
+        """
+        Compara la salida de ContentProcessor.extract con los tiers esperados.
+
+        Cada tier extraído (cheapest, middle, most_expensive) con nombre suma un punto si
+        su nombre es el de un tier esperado y otro si además su precio coincide. Se
+        esperan tantos tiers como haya en el caso, hasta tres; los que falten puntúan 0.
+
+        Args:
+            generated (Dict): Resultado de ContentProcessor.extract.
+            expected (Dict): Tiers esperados del caso, con 'name' y 'price'.
+
+        Returns:
+            Dict: Claves 'accuracy', 'missing_info', 'incorrect_info' y 'extra_info'.
+        """
+        evaluation = {"accuracy": 0, "missing_info": [], "incorrect_info": [], "extra_info": []}
+        by_name = {details.get("name", "").lower(): details for details in expected.values()}
+        named = [(key, generated[key]) for key in EXTRACTION_TIERS
+                 if isinstance(generated.get(key), dict) and generated[key].get("name")]
+        expected_count = min(len(EXTRACTION_TIERS), len(expected))
+        if len(named) < expected_count:
+            evaluation["missing_info"].append(f"Missing tiers: {expected_count - len(named)}")
+
+        earned_points = 0
+        for key, tier in named:
+            details = by_name.get(str(tier["name"]).lower())
+            if details is None:
+                evaluation["extra_info"].append(f"Unexpected tier in {key}: {tier['name']}")
+                continue
+            earned_points += 1
+            if same_price(details.get("price"), tier.get("price")):
+                earned_points += 1
+            else:
+                evaluation["incorrect_info"].append(f"Incorrect price for {key}: {tier['name']}")
+
+        total_points = 2 * max(expected_count, len(named))
+        evaluation["accuracy"] = earned_points / total_points if total_points > 0 else 0
+        return evaluation
+
+
+def load_golden_set(path: str) -> List[Dict[str, Any]]:
+    """
+    Carga un golden set: una lista de casos con las claves 'site', 'query' y 'expected'.
+
+    Args:
+        path (str): Ruta del fichero JSON.
+
+    Returns:
+        List[Dict[str, Any]]: Casos del golden set.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
 
 def main():
-    evaluator = Evaluator()
-
-    # Example usage
-    site_name = "Mindsmith AI"
-    query = "What are the pricing tiers and their features?"
-    expected_result = {
-        "Free": {
-            "name": "Free",
-            "price": "$0",
-            "features": [
-                "Create unlimited lessons",
-                "Two active shared lessons",
-                "Generate five lessons",
-                "Authoring tool",
-                "Share via link, SMS, email, iframe",
-                "Export dynamic eLearning modules (SCORM)",
-                "Review and comment links",
-                "Unlimited learners",
-                "AI lesson assistant",
-                "Custom theming",
-                "Basic chat and email support"
-            ]
-        },
-        "Professional": {
-            "name": "Professional",
-            "price": "$39",
-            "features": [
-                "Unlimited active lessons",
-                "GPT-4 model",
-                "Unlimited premium generations",
-                "Granular lesson analytics",
-                "Basic customer support",
-                "Add your logo",
-                "Remove 'Built with Mindsmith' tag",
-                "Multi-language lessons"
-            ]
-        },
-        "Team": {
-            "name": "Team",
-            "price": "Custom",
-            "features": [
-                "Shared team workspace",
-                "Branding management tools",
-                "Multi-language lessons",
-                "Personalized+priority customer support",
-                "Export lesson analytics to pdf",
-                "Real-time lesson collaboration",
-                "Share lessons on a custom domain",
-                "Content development assistance",
-                "Turnkey eLearning development outsourcing"
-            ]
-        }
-    }
+    parser = argparse.ArgumentParser(description="Evalúa el pipeline sobre un golden set de precios esperados.")
+    parser.add_argument("--golden", default="../data/golden_set.json", help="Fichero JSON del golden set")
+    parser.add_argument("--data-dir", default="../data", help="Directorio con competitor_sites.json y las cachés")
+    parser.add_argument("--mode", choices=EVALUATION_MODES, default="prompt",
+                        help="'prompt' pregunta al LLM con el contenido completo; 'extract' usa el pipeline "
+                             "de extracción de producción (reglas, selección de chunks...)")
+    parser.add_argument("--workers", type=int, default=8, help="Casos evaluados en paralelo")
+    parser.add_argument("--model", default=None, help="Modelo a evaluar (por defecto, el del OpenAIHandler)")
+    parser.add_argument("--json", help="Guardar el informe completo en este fichero")
+    args = parser.parse_args()
+
+    from src.utils.service_container import ServiceContainer
+    services = ServiceContainer(args.data_dir)
+    evaluator = services.evaluator
+    if args.model:
+        evaluator.openai_handler.model = args.model
+    report = evaluator.evaluate_golden_set(load_golden_set(args.golden), max_workers=args.workers, mode=args.mode)
 
-    result = evaluator.evaluate_response(site_name, query, expected_result)
-    print(json.dumps(result, indent=2))
+    for case in report["cases"]:
+        status = f"error: {case['error']}" if case["error"] else f"accuracy={case['accuracy']:.2%}"
+        print(f"{case['site']:<30} {status:<40} latency={case['latency']:.2f}s cost=${case['cost']:.5f}")
+    summary = report["summary"]
+    # Sin casos (golden set vacío o filtrado por completo) no hay latencias: los percentiles son None
+    p50, p95 = ("n/a" if value is None else f"{value:.2f}s"
+                for value in (summary["latency_p50"], summary["latency_p95"]))
+    print(f"{summary['cases']} casos ({summary['errors']} con error): accuracy media {summary['mean_accuracy']:.2%}, "
+          f"p50={p50} p95={p95}, "
+          f"coste total ${summary['total_cost']:.4f} (${summary['cost_per_site']:.5f}/sitio)")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
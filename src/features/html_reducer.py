@@ -0,0 +1,257 @@
+import re
+from typing import List, Dict, Any, Tuple
+from src.utils.html_parser import resolve_parser
+from src.utils.loggingDecorator import get_logger
+
+logger = get_logger(__name__)
+
+# Nodos que nunca aportan información de precios
+NON_CONTENT_TAGS = (
+    "script", "style", "noscript", "svg", "iframe", "canvas", "template", "nav", "footer",
+    "aside", "form", "button", "img", "picture", "video", "audio", "link", "meta", "head"
+)
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "header", "li", "ul", "ol", "table", "tr",
+    "thead", "tbody", "blockquote", "pre", "h1", "h2", "h3", "h4", "h5", "h6", "dl", "dt",
+    "dd", "br", "hr", "body", "html"
+}
+
+HTML_PATTERN = re.compile(r"<(?:html|body|div|p|span|head|section|li|table)\b", re.IGNORECASE)
+PRICE_PATTERN = re.compile(
+    r"[$€£¥₹]\s?\d|\d(?:[.,]\d+)?\s?(?:[$€£¥₹]|(?:usd|eur|gbp)\b)"
+    r"|/\s?(?:mo|month|year|yr|user|seat)\b|per\s+(?:month|year|user|seat)"
+    r"|\b(?:al mes|mensual|anual|monthly|annually|yearly|billed|custom pricing|contact sales)\b",
+    re.IGNORECASE
+)
+
+
+class HtmlReducer:
+    """
+    Etapa de reducción del contenido scrapeado antes de enviarlo al LLM.
+
+    Elimina los nodos sin contenido (scripts, estilos, navegación, pies de página,
+    SVG en línea...), convierte la página en texto compacto con formato markdown y
+    puede quedarse solo con las regiones relevantes para precios.
+
+    Attributes:
+        pricing_only (bool): Si es True, se devuelven solo las regiones con precios
+            cuando se encuentran.
+        context_lines (int): Líneas de contexto alrededor de cada línea con precios.
+        max_context_chars (int): Longitud máxima de una línea de contexto; las más
+            largas (párrafos de blog, testimonios) se descartan.
+        parser (str): Backend de parseo ('selectolax', 'lxml' o 'html.parser').
+    """
+
+    def __init__(self, pricing_only: bool = True, context_lines: int = 8, max_context_chars: int = 300,
+                 parser: str | None = None):
+        """
+        Inicializa la instancia de HtmlReducer.
+
+        Args:
+            pricing_only (bool): Si es True, se devuelven solo las regiones con precios.
+            context_lines (int): Líneas de contexto alrededor de cada línea con precios.
+            max_context_chars (int): Longitud máxima de una línea de contexto.
+            parser (str | None): Backend de parseo. Si no se indica, se usa el más
+                rápido instalado. Todos producen el mismo texto.
+        """
+        self.pricing_only = pricing_only
+        self.context_lines = context_lines
+        self.max_context_chars = max_context_chars
+        self.parser = resolve_parser(parser)
+
+    @staticmethod
+    def is_html(content: str) -> bool:
+        """
+        Indica si el contenido parece HTML (y no texto o markdown, como el de Jina AI).
+
+        Args:
+            content (str): Contenido a comprobar.
+
+        Returns:
+            bool: True si se encuentran etiquetas HTML habituales al inicio del contenido.
+        """
+        return bool(HTML_PATTERN.search(content[:10_000]))
+
+    def to_text(self, content: str) -> str:
+        """
+        Convierte el contenido en texto compacto con formato markdown.
+
+        Args:
+            content (str): HTML, markdown o texto plano.
+
+        Returns:
+            str: Texto sin nodos de navegación ni espacios redundantes.
+        """
+        if self.is_html(content):
+            parts: List[str] = []
+            if self.parser == "selectolax":
+                from selectolax.lexbor import LexborHTMLParser
+                tree = LexborHTMLParser(content)
+                tree.strip_tags(list(NON_CONTENT_TAGS))
+                for node in tree.css('[aria-hidden="true"]'):
+                    node.decompose()
+                self._render_selectolax(tree.root, parts)
+            else:
+                from bs4 import BeautifulSoup, Comment, Doctype, ProcessingInstruction, Declaration
+                soup = BeautifulSoup(content, self.parser)
+                for node in soup.find_all(NON_CONTENT_TAGS):
+                    node.decompose()
+                for node in soup.find_all(attrs={"aria-hidden": "true"}):
+                    node.decompose()
+                self._render(soup, parts, (Comment, Doctype, ProcessingInstruction, Declaration))
+            content = "".join(parts)
+        return self._collapse_whitespace(content)
+
+    def _render(self, node: Any, parts: List[str], skipped: Tuple[type, ...]):
+        """
+        Recorre el árbol de BeautifulSoup añadiendo el texto con saltos de línea en los bloques.
+
+        Args:
+            node (Any): Nodo (Tag) a recorrer.
+            parts (List[str]): Fragmentos de texto acumulados.
+            skipped (Tuple[type, ...]): Tipos de cadena que no se muestran (comentarios, doctype...).
+        """
+        for child in node.children:
+            # Los nodos de texto de bs4 son subclases de str
+            if isinstance(child, str):
+                if not isinstance(child, skipped):
+                    parts.append(str(child))
+                continue
+            name = child.name
+            if name not in BLOCK_TAGS:
+                self._render(child, parts, skipped)
+                continue
+            parts.append("\n")
+            if name in ("h1", "h2", "h3", "h4", "h5", "h6"):
+                parts.append("#" * int(name[1]) + " ")
+            elif name == "li":
+                parts.append("- ")
+            self._render(child, parts, skipped)
+            parts.append("\n")
+
+    def _render_selectolax(self, node: Any, parts: List[str]):
+        """
+        Equivalente de _render para los nodos de selectolax.
+
+        Args:
+            node (Any): Nodo de selectolax a recorrer.
+            parts (List[str]): Fragmentos de texto acumulados.
+        """
+        if node is None:
+            return
+        for child in node.iter(include_text=True):
+            name = child.tag
+            if name == "-text":
+                parts.append(child.text_content)
+                continue
+            if name.startswith("-") or name.startswith("!"):
+                continue
+            if name not in BLOCK_TAGS:
+                self._render_selectolax(child, parts)
+                continue
+            parts.append("\n")
+            if name in ("h1", "h2", "h3", "h4", "h5", "h6"):
+                parts.append("#" * int(name[1]) + " ")
+            elif name == "li":
+                parts.append("- ")
+            self._render_selectolax(child, parts)
+            parts.append("\n")
+
+    @staticmethod
+    def _collapse_whitespace(text: str) -> str:
+        lines = []
+        for line in text.splitlines():
+            line = " ".join(line.split())
+            if line and line not in ("-", "#") and (not lines or line != lines[-1]):
+                lines.append(line)
+        return "\n".join(lines)
+
+    def find_pricing_regions(self, text: str) -> List[str]:
+        """
+        Localiza las regiones del texto relevantes para precios.
+
+        Una región es el conjunto de líneas alrededor de las que contienen símbolos de
+        moneda, periodos de facturación ("/month", "per user") o términos de planes;
+        las regiones solapadas se fusionan. Las líneas de contexto demasiado largas
+        se descartan.
+
+        Args:
+            text (str): Texto compacto devuelto por to_text.
+
+        Returns:
+            List[str]: Regiones encontradas, en el orden del documento.
+        """
+        lines = text.split("\n")
+        hits = [i for i, line in enumerate(lines) if PRICE_PATTERN.search(line)]
+        hit_set = set(hits)
+        regions: List[List[int]] = []
+        for i in hits:
+            start, end = max(0, i - self.context_lines), min(len(lines), i + self.context_lines + 1)
+            if regions and start <= regions[-1][1]:
+                regions[-1][1] = max(regions[-1][1], end)
+            else:
+                regions.append([start, end])
+        return [
+            "\n".join(lines[i] for i in range(start, end)
+                      if i in hit_set or len(lines[i]) <= self.max_context_chars)
+            for start, end in regions
+        ]
+
+    def reduce(self, content: str) -> str:
+        """
+        Reduce el contenido a su texto compacto y, si procede, a sus regiones de precios.
+
+        Args:
+            content (str): HTML, markdown o texto plano.
+
+        Returns:
+            str: Contenido reducido. Si no se encuentran regiones de precios se devuelve
+            el texto compacto completo.
+        """
+        return self.reduce_text(self.to_text(content))
+
+    def reduce_text(self, text: str) -> str:
+        """
+        Reduce un texto ya obtenido con to_text, sin volver a parsear la página.
+
+        Args:
+            text (str): Texto compacto devuelto por to_text.
+
+        Returns:
+            str: Regiones de precios del texto o, si no hay ninguna o pricing_only es
+            False, el texto completo.
+        """
+        if self.pricing_only:
+            regions = self.find_pricing_regions(text)
+            if regions:
+                return "\n\n".join(regions)
+        return text
+
+    def reduce_with_report(self, content: str, token_counter: Any = None, text: str | None = None) -> Dict[str, Any]:
+        """
+        Reduce el contenido e informa de la reducción conseguida.
+
+        Args:
+            content (str): HTML, markdown o texto plano.
+            token_counter (Any): Objeto con un método count_tokens (por ejemplo,
+                TokenCostCalculator). Si no se indica, se informa solo de caracteres.
+            text (str | None): Texto del contenido ya obtenido con to_text, si se tiene,
+                para no volver a parsearlo.
+
+        Returns:
+            Dict[str, Any]: Contenido reducido ('content'), caracteres y, si hay
+            token_counter, tokens antes y después, y el factor de reducción ('ratio').
+        """
+        reduced = self.reduce(content) if text is None else self.reduce_text(text)
+        report = {
+            "content": reduced,
+            "original_chars": len(content),
+            "reduced_chars": len(reduced),
+        }
+        if token_counter is not None:
+            report["original_tokens"] = token_counter.count_tokens(content)
+            report["reduced_tokens"] = token_counter.count_tokens(reduced)
+            report["ratio"] = report["original_tokens"] / max(1, report["reduced_tokens"])
+        else:
+            report["ratio"] = len(content) / max(1, len(reduced))
+        return report
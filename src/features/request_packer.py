@@ -0,0 +1,279 @@
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Set, Tuple
+from src.features.content_processor import COMPLETION_TOKEN_ESTIMATE
+from src.utils.loggingDecorator import get_logger
+from src.utils.metrics import metrics
+from src.utils.price_store import NUMBER_PATTERN, THOUSANDS_SEPARATOR, parse_price
+from src.utils.rate_limiter import RateLimiter
+from src.utils.token_cost_calculator import TokenCostCalculator
+
+logger = get_logger(__name__)
+
+PACKED_EXTRACTION_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "The user message contains the content of several websites. Each website starts with a line '=== <key> ===' and ends where the next one starts. Treat each website independently: get its three pricing tiers and return a JSON object with one entry per key: {<key>: {cheapest: {name: str, price: float}, middle: {name: str, price: float}, most_expensive: {name: str, price: float}}}. If you can't find a price, use null for the price value."
+}
+
+# (contenido, tokens, futuro con el resultado del sitio)
+PendingSite = Tuple[str, int, Future]
+
+
+def _amounts(content: str) -> Set[float]:
+    return {float(number.group().replace(",", "."))
+            for number in NUMBER_PATTERN.finditer(THOUSANDS_SEPARATOR.sub("", content))}
+
+
+def is_grounded(result: Dict[str, Any], content: str) -> bool:
+    """
+    Comprueba que todos los precios de un resultado aparecen en el contenido de su sitio.
+
+    En un paquete el modelo puede atribuir a un sitio los precios de otra sección; un
+    precio que no figura en el contenido del propio sitio delata ese cruce.
+
+    Args:
+        result (Dict[str, Any]): Tiers extraídos para el sitio.
+        content (str): Contenido reducido del sitio.
+
+    Returns:
+        bool: True si cada precio no nulo está entre los importes del contenido.
+    """
+    amounts = None
+    for tier in result.values():
+        price = parse_price(tier.get("price")) if isinstance(tier, dict) else None
+        if price is None:
+            continue
+        amounts = _amounts(content) if amounts is None else amounts
+        if not any(abs(price - amount) < 0.005 for amount in amounts):
+            return False
+    return True
+
+
+class RequestPacker:
+    """
+    Agrupación de varios sitios pequeños en una sola petición al LLM.
+
+    Los hilos de extracción envían el contenido ya reducido de cada sitio pequeño y
+    esperan su futuro. El empaquetador acumula sitios hasta llenar el presupuesto de
+    tokens de una petición (o max_sites, o hasta que el primero lleva max_wait
+    segundos esperando), los envía en un único mensaje con una sección por sitio y
+    reparte la respuesta, un objeto JSON con una clave por sitio, entre sus futuros.
+    Así el prompt de sistema se paga una vez por paquete y no por sitio, y se
+    hacen muchas menos peticiones frente al límite de RPM.
+
+    Un resultado cuyos precios no aparecen en el contenido de su sitio se descarta
+    (el sitio se extrae por separado). Los resultados válidos se guardan en la caché
+    del LLM con la clave del sitio como paquete de uno, de modo que al repetir la
+    ejecución se reutilizan aunque los paquetes se formen de otra manera. Al terminar
+    hay que llamar a close (o usarlo como context manager) para enviar los sitios
+    pendientes y detener su temporizador y su pool de hilos.
+
+    Attributes:
+        openai_handler (OpenAIHandler): Manejador de OpenAI.
+        token_calculator (TokenCostCalculator): Calculador usado para contar tokens.
+        rate_limiter (RateLimiter): Planificador de los límites RPM/TPM de la API.
+        max_pack_tokens (int): Tokens máximos de contenido por petición.
+        max_site_tokens (int): Tokens máximos de un sitio para poder agruparlo.
+        max_sites (int): Número máximo de sitios por petición.
+        max_wait (float): Segundos máximos que un sitio espera a que se llene su paquete.
+        timeout (float): Segundos máximos que un sitio espera el resultado de su paquete.
+    """
+
+    def __init__(self, openai_handler: Any, token_calculator: TokenCostCalculator,
+                 rate_limiter: RateLimiter | None = None, max_pack_tokens: int = 3000,
+                 max_site_tokens: int = 1000, max_sites: int = 8, max_wait: float = 0.5,
+                 max_workers: int = 4, timeout: float = 120.0):
+        """
+        Inicializa la instancia de RequestPacker.
+
+        Args:
+            openai_handler (Any): Manejador de OpenAI.
+            token_calculator (TokenCostCalculator): Calculador usado para contar tokens.
+            rate_limiter (RateLimiter | None): Planificador de límites de la API. Debe ser
+                el mismo del ContentProcessor para que ambos respeten un único límite.
+            max_pack_tokens (int): Tokens máximos de contenido por petición.
+            max_site_tokens (int): Tokens máximos de un sitio para poder agruparlo; los
+                mayores se extraen por separado.
+            max_sites (int): Número máximo de sitios por petición.
+            max_wait (float): Segundos máximos que un sitio espera a que se llene su paquete.
+            max_workers (int): Número máximo de paquetes enviados en paralelo.
+            timeout (float): Segundos máximos que un sitio espera el resultado de su
+                paquete antes de extraerse por separado.
+        """
+        self.openai_handler = openai_handler
+        self.token_calculator = token_calculator
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_pack_tokens = max_pack_tokens
+        self.max_site_tokens = min(max_site_tokens, max_pack_tokens)
+        self.max_sites = max_sites
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self._condition = threading.Condition()
+        self._pending: List[PendingSite] = []
+        self._pending_tokens = 0
+        self._deadline: float | None = None
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pack")
+        self._system_tokens = token_calculator.count_tokens(PACKED_EXTRACTION_SYSTEM_MESSAGE["content"])
+        self._timer = threading.Thread(target=self._flush_expired, name="pack-timer", daemon=True)
+        self._timer.start()
+        logger.info(f"RequestPacker inicializado ({max_pack_tokens} tokens y {max_sites} sitios por petición)")
+
+    def submit(self, content: str, tokens: int | None = None) -> Future:
+        """
+        Añade un sitio al paquete en curso.
+
+        Args:
+            content (str): Contenido reducido del sitio.
+            tokens (int | None): Tokens del contenido, si ya se conocen.
+
+        Returns:
+            Future: Futuro con el diccionario cheapest/middle/most_expensive del sitio, o
+            None si la respuesta no lo incluye y debe extraerse por separado.
+
+        Raises:
+            RuntimeError: Si el empaquetador ya se ha cerrado.
+        """
+        future: Future = Future()
+        cached = self._cached(content)
+        if cached is not None:
+            metrics.inc("packed_sites_total", result="cached")
+            future.set_result(cached)
+            return future
+        tokens = self.token_calculator.count_tokens(content) if tokens is None else tokens
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("RequestPacker cerrado: no admite más sitios")
+            if self._pending and self._pending_tokens + tokens > self.max_pack_tokens:
+                self._flush_locked()
+            if not self._pending:
+                self._deadline = time.monotonic() + self.max_wait
+                self._condition.notify()
+            self._pending.append((content, tokens, future))
+            self._pending_tokens += tokens
+            if len(self._pending) >= self.max_sites or self._pending_tokens >= self.max_pack_tokens:
+                self._flush_locked()
+        return future
+
+    def flush(self):
+        """
+        Envía el paquete en curso sin esperar a que se llene.
+        """
+        with self._condition:
+            if self._pending:
+                self._flush_locked()
+
+    def close(self):
+        """
+        Envía el paquete en curso, detiene el temporizador y espera a que terminen los
+        paquetes enviados antes de detener su pool de hilos.
+        """
+        with self._condition:
+            if self._pending:
+                self._flush_locked()
+            self._closed = True
+            self._condition.notify()
+        self._timer.join()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "RequestPacker":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _flush_locked(self):
+        pack, self._pending, self._pending_tokens, self._deadline = self._pending, [], 0, None
+        self._executor.submit(self._send, pack)
+
+    def _flush_expired(self):
+        # Hilo en segundo plano: envía el paquete cuando su primer sitio ha esperado max_wait
+        with self._condition:
+            while not self._closed:
+                if self._deadline is None:
+                    self._condition.wait()
+                elif self._deadline <= time.monotonic():
+                    self._flush_locked()
+                else:
+                    self._condition.wait(self._deadline - time.monotonic())
+
+    @staticmethod
+    def build_messages(keys: List[str], contents: List[str]) -> List[Dict[str, str]]:
+        """
+        Construye los mensajes de extracción de un paquete de sitios.
+
+        Args:
+            keys (List[str]): Clave de cada sitio en la respuesta.
+            contents (List[str]): Contenido reducido de cada sitio.
+
+        Returns:
+            List[Dict[str, str]]: Mensajes de sistema y de usuario para la API.
+        """
+        sections = [f"=== {key} ===\n{content}" for key, content in zip(keys, contents)]
+        return [
+            PACKED_EXTRACTION_SYSTEM_MESSAGE,
+            {"role": "user", "content": "\n\n".join(sections)}
+        ]
+
+    def _site_key(self, content: str) -> str | None:
+        # Clave de caché del sitio como paquete de uno: no depende de con qué sitios se agrupe
+        cache = getattr(self.openai_handler, "cache", None)
+        if cache is None:
+            return None
+        return cache.make_key(self.openai_handler.model, self.build_messages(["site_0"], [content]),
+                              self.openai_handler.response_format)
+
+    def _cached(self, content: str) -> Dict[str, Any] | None:
+        key = self._site_key(content)
+        if key is None:
+            return None
+        cached = self.openai_handler.cache.get(key)
+        try:
+            result = json.loads(cached)["site_0"] if cached is not None else None
+        except (json.JSONDecodeError, TypeError, KeyError):
+            result = None
+        return result if isinstance(result, dict) else None
+
+    def _send(self, pack: List[PendingSite]):
+        keys = [f"site_{i}" for i in range(len(pack))]
+        estimated_tokens = (self._system_tokens + sum(tokens for _, tokens, _ in pack)
+                            + COMPLETION_TOKEN_ESTIMATE * len(pack))
+        response: Any = {}
+        try:
+            with metrics.span("extract_pack", sites=len(pack)):
+                response = json.loads(self.openai_handler.get_completion(
+                    self.build_messages(keys, [content for content, _, _ in pack]),
+                    before_request=lambda: self.rate_limiter.acquire(estimated_tokens)))
+        except json.JSONDecodeError:
+            logger.error(f"Error al decodificar JSON para el paquete de {len(pack)} sitios")
+        except Exception as e:
+            logger.error(f"Error al procesar el paquete de {len(pack)} sitios: {str(e)}")
+        if not isinstance(response, dict):
+            response = {}
+        if "error" in response:
+            logger.error(f"Error en el paquete de {len(pack)} sitios: {response['error']}")
+
+        metrics.inc("packed_requests_total")
+        unpacked = 0
+        rejected = 0
+        for key, (content, _, future) in zip(keys, pack):
+            result = response.get(key)
+            if isinstance(result, dict) and not is_grounded(result, content):
+                logger.warning(f"Los precios de {key} no aparecen en su contenido; se extraerá por separado")
+                rejected += 1
+                result = None
+            if isinstance(result, dict):
+                unpacked += 1
+                site_key = self._site_key(content)
+                if site_key is not None:
+                    self.openai_handler.cache.put(site_key, self.openai_handler.model,
+                                                  json.dumps({"site_0": result}))
+                future.set_result(result)
+            else:
+                future.set_result(None)
+        metrics.inc("packed_sites_total", unpacked, result="ok")
+        metrics.inc("packed_sites_total", rejected, result="rejected")
+        metrics.inc("packed_sites_total", len(pack) - unpacked - rejected, result="missing")
+        logger.info(f"Paquete de {len(pack)} sitios extraído en una petición ({unpacked} con resultado)")
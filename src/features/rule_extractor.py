@@ -0,0 +1,283 @@
+import json
+import re
+from typing import Any, Dict, Iterator, List, Set, Tuple
+from src.features.html_reducer import HtmlReducer
+from src.utils.html_parser import BS4_PARSERS, resolve_parser
+from src.utils.loggingDecorator import get_logger
+from src.utils.price_store import parse_price
+
+logger = get_logger(__name__)
+
+JSON_LD_PATTERN = re.compile(
+    r"<script[^>]+type\s*=\s*[\"']application/ld\+json[\"'][^>]*>(.*?)</script>", re.IGNORECASE | re.DOTALL
+)
+MICRODATA_PRICE_PATTERN = re.compile(r"itemprop\s*=\s*[\"']price[\"']", re.IGNORECASE)
+# "$39 / month", "39 € per user", "£9.99/mo"...
+CARD_PRICE_PATTERN = re.compile(
+    r"(?:(?P<symbol>[$€£])\s?(?P<amount>\d+(?:[.,]\d{1,2})?)|(?P<amount2>\d+(?:[.,]\d{1,2})?)\s?(?P<symbol2>[$€£]))"
+    r"\s*(?:/|per)\s*(?P<period>month|mo|year|yr|user|seat)\b",
+    re.IGNORECASE
+)
+ANY_PRICE_PATTERN = re.compile(r"[$€£]\s?\d|\d\s?[$€£]")
+CUSTOM_PRICING_PATTERN = re.compile(r"\b(?:contact sales|custom pricing|get a quote|request a quote)\b", re.IGNORECASE)
+OFFER_TYPES = {"Offer", "AggregateOffer"}
+# Tipos de schema.org cuyas ofertas son planes de precios (y no, por ejemplo, libros o eventos)
+PRODUCT_TYPES = {"Product", "ProductGroup", "Service", "SoftwareApplication", "WebApplication", "MobileApplication"}
+MAX_PLAN_NAME_CHARS = 60
+# Periodos de las tarjetas ("/mo"), de unitCode de UN/CEFACT ("MON", "ANN") y de billingDuration ISO 8601 ("P1M")
+PERIOD_ALIASES = {
+    "mo": "month", "mon": "month", "monthly": "month", "p1m": "month",
+    "yr": "year", "ann": "year", "yearly": "year", "annual": "year", "annually": "year", "p1y": "year",
+    "p12m": "year"
+}
+
+# Nombre, precio, moneda y periodo de facturación (None si la fuente no los indica)
+Plan = Tuple[str, float, str | None, str | None]
+
+
+def normalize_period(value: Any) -> str | None:
+    """
+    Normaliza un periodo de facturación ("/mo", "MON", "P1Y", "per month"...).
+
+    Args:
+        value (Any): Periodo tal como aparece en la página o en schema.org.
+
+    Returns:
+        str | None: Periodo normalizado ('month', 'year', 'user'...), o None si no hay ninguno.
+    """
+    if isinstance(value, dict):
+        value = value.get("unitCode") or value.get("unitText")
+    if not isinstance(value, str) or not value.strip():
+        return None
+    period = value.strip().lower().removeprefix("per ").strip()
+    return PERIOD_ALIASES.get(period, period)
+
+
+def schema_types(value: Any) -> Set[str]:
+    """
+    Devuelve los tipos de schema.org de un @type de JSON-LD o un itemtype de microdatos.
+
+    Args:
+        value (Any): Tipo o lista de tipos, con o sin la URL de schema.org.
+
+    Returns:
+        Set[str]: Nombres de los tipos ('Product', 'Offer'...).
+    """
+    values = value if isinstance(value, list) else str(value or "").split()
+    return {str(item).rstrip("/").rsplit("/", 1)[-1] for item in values}
+
+
+class RuleBasedExtractor:
+    """
+    Extracción de precios sin LLM a partir de datos estructurados y patrones regulares.
+
+    Busca, por orden, planes en JSON-LD de schema.org (Product/Offer), en microdatos
+    (itemprop="price") y en tarjetas de precios con el formato "$X / month" bajo un
+    encabezado. Devuelve el mismo diccionario cheapest/middle/most_expensive que el
+    LLM junto con una confianza entre 0 y 1; por debajo de min_confidence se debe
+    recurrir al LLM.
+
+    Attributes:
+        min_confidence (float): Confianza mínima para usar el resultado sin llamar al LLM.
+        reducer (HtmlReducer): Reductor usado para obtener el texto de la página.
+        parser (str): Backend de BeautifulSoup para los microdatos.
+    """
+
+    def __init__(self, min_confidence: float = 0.8, reducer: HtmlReducer | None = None, parser: str | None = None):
+        """
+        Inicializa la instancia de RuleBasedExtractor.
+
+        Args:
+            min_confidence (float): Confianza mínima para prescindir del LLM.
+            reducer (HtmlReducer | None): Reductor para convertir la página en texto.
+            parser (str | None): Backend de BeautifulSoup ('lxml' o 'html.parser').
+        """
+        self.min_confidence = min_confidence
+        self.reducer = reducer or HtmlReducer()
+        self.parser = resolve_parser(parser, allowed=BS4_PARSERS)
+
+    def extract(self, content: str, text: str | None = None) -> Dict[str, Any]:
+        """
+        Extrae los tiers de precios de una página mediante reglas.
+
+        Args:
+            content (str): Contenido scrapeado (HTML, markdown o texto).
+            text (str | None): Texto de la página ya obtenido con HtmlReducer.to_text, si
+                se tiene, para no volver a parsearla.
+
+        Returns:
+            Dict[str, Any]: Claves 'result' (cheapest/middle/most_expensive, o None),
+            'confidence' (0 a 1) y 'source' ('json-ld', 'microdata', 'cards' o None).
+        """
+        candidates = []
+        if "ld+json" in content:
+            candidates.append(("json-ld", self.from_json_ld(content), 0.95))
+        if MICRODATA_PRICE_PATTERN.search(content):
+            candidates.append(("microdata", self.from_microdata(content), 0.9))
+        best = {"result": None, "confidence": 0.0, "source": None}
+        for source, plans, base_confidence in candidates:
+            if len(plans) >= 2:
+                result = self._result(plans, self._confidence(plans, base_confidence), source)
+                if result["confidence"] >= self.min_confidence:
+                    return result
+                best = max(best, result, key=lambda r: r["confidence"])
+
+        text = self.reducer.to_text(content) if text is None else text
+        plans, price_lines = self.from_cards(text)
+        if not plans:
+            return best
+        confidence = 0.0
+        if len(plans) >= 2:
+            confidence = self._confidence(plans, 0.85)
+            # Importes sueltos fuera de las tarjetas: la página es más ambigua de lo que parece
+            if price_lines > 2 * len(plans):
+                confidence -= 0.3
+            # Un plan sin precio (Enterprise, "contact sales") que las reglas no pueden representar
+            if CUSTOM_PRICING_PATTERN.search(text):
+                confidence -= 0.1
+        return max(self._result(plans, confidence, "cards"), best, key=lambda r: r["confidence"])
+
+    @staticmethod
+    def _confidence(plans: List[Plan], base_confidence: float) -> float:
+        confidence = base_confidence
+        # Monedas o periodos distintos (mensual/anual) no son comparables directamente
+        currencies = {currency for _, _, currency, _ in plans if currency}
+        periods = {period for _, _, _, period in plans if period}
+        if len(currencies) > 1 or len(periods) > 1:
+            confidence -= 0.3
+        # El mismo plan con varios precios (variantes de facturación, productos distintos con el mismo nombre)
+        names = [name.casefold() for name, _ in {(name, price) for name, price, _, _ in plans}]
+        if len(set(names)) < len(names):
+            confidence -= 0.3
+        return confidence
+
+    @staticmethod
+    def _result(plans: List[Plan], confidence: float, source: str) -> Dict[str, Any]:
+        unique = sorted({(name, price) for name, price, _, _ in plans}, key=lambda plan: (plan[1], plan[0]))
+        tiers = [{"name": name, "price": price} for name, price in unique]
+        return {
+            "result": {"cheapest": tiers[0], "middle": tiers[len(tiers) // 2], "most_expensive": tiers[-1]},
+            "confidence": max(0.0, confidence if len(unique) >= 2 else min(confidence, 0.5)),
+            "source": source
+        }
+
+    def from_json_ld(self, content: str) -> List[Plan]:
+        """
+        Obtiene los planes de los bloques JSON-LD de schema.org.
+
+        Solo se tienen en cuenta las ofertas de un producto o servicio (Product,
+        Service, SoftwareApplication...), no las de cualquier nodo con 'offers'.
+
+        Args:
+            content (str): HTML de la página.
+
+        Returns:
+            List[Plan]: Ofertas con nombre y precio numérico, con su moneda
+            (priceCurrency) y su periodo (billingDuration, unitCode o unitText).
+        """
+        plans = []
+        for block in JSON_LD_PATTERN.findall(content):
+            try:
+                data = json.loads(block)
+            except json.JSONDecodeError:
+                continue
+            plans.extend(self._walk_json_ld(data, None, False))
+        return plans
+
+    def _walk_json_ld(self, node: Any, parent_name: str | None, in_product: bool) -> Iterator[Plan]:
+        if isinstance(node, list):
+            for item in node:
+                yield from self._walk_json_ld(item, parent_name, in_product)
+            return
+        if not isinstance(node, dict):
+            return
+        types = schema_types(node.get("@type"))
+        name = node.get("name") if isinstance(node.get("name"), str) else parent_name
+        in_product = in_product or bool(types & PRODUCT_TYPES)
+        offered = node.get("itemOffered")
+        if types & OFFER_TYPES and (in_product or isinstance(offered, dict)
+                                    and schema_types(offered.get("@type")) & PRODUCT_TYPES):
+            specification = node.get("priceSpecification")
+            if isinstance(specification, list):
+                specification = next((item for item in specification if isinstance(item, dict)), None)
+            specification = specification if isinstance(specification, dict) else {}
+            price = parse_price(node.get("price", node.get("lowPrice", specification.get("price"))))
+            currency = node.get("priceCurrency") or specification.get("priceCurrency")
+            period = next(filter(None, map(normalize_period, (
+                specification.get("billingDuration"), specification.get("unitCode"),
+                specification.get("unitText"), specification.get("referenceQuantity"), node.get("unitText")
+            ))), None)
+            if name and price is not None:
+                yield name.strip(), price, currency, period
+        for key in ("@graph", "offers", "hasOfferCatalog", "itemListElement", "itemOffered"):
+            if key in node:
+                yield from self._walk_json_ld(node[key], name, in_product)
+
+    def from_microdata(self, content: str) -> List[Plan]:
+        """
+        Obtiene los planes de los microdatos (itemprop="price" en una Offer de un producto).
+
+        Args:
+            content (str): HTML de la página.
+
+        Returns:
+            List[Plan]: Ofertas con nombre y precio numérico, con su moneda y su periodo
+            (itemprop priceCurrency, billingDuration, unitCode o unitText).
+        """
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(content, self.parser)
+        plans = []
+        for price_node in soup.find_all(attrs={"itemprop": "price"}):
+            offer = price_node.find_parent(attrs={"itemscope": True})
+            if offer is None or not schema_types(offer.get("itemtype")) & OFFER_TYPES:
+                continue
+            scopes = [offer]
+            while scopes[-1].find_parent(attrs={"itemscope": True}) is not None:
+                scopes.append(scopes[-1].find_parent(attrs={"itemscope": True}))
+            if not any(schema_types(scope.get("itemtype")) & PRODUCT_TYPES for scope in scopes):
+                continue
+            price = parse_price(price_node.get("content") or price_node.get_text())
+            # La oferta puede no tener nombre propio y heredarlo del producto que la contiene
+            name = next(filter(None, (self._itemprop(scope, "name") for scope in scopes)), None)
+            currency = self._itemprop(offer, "priceCurrency")
+            period = next(filter(None, (normalize_period(self._itemprop(offer, prop))
+                                        for prop in ("billingDuration", "unitCode", "unitText"))), None)
+            if name and price is not None:
+                plans.append((name, price, currency, period))
+        return plans
+
+    @staticmethod
+    def _itemprop(scope: Any, prop: str) -> str | None:
+        node = scope.find(attrs={"itemprop": prop})
+        value = (node.get("content") or node.get_text()).strip() if node else ""
+        return value or None
+
+    @staticmethod
+    def from_cards(text: str) -> Tuple[List[Plan], int]:
+        """
+        Obtiene los planes de tarjetas de precios: un encabezado seguido de "$X / month".
+
+        Args:
+            text (str): Texto de la página en formato markdown (salida de HtmlReducer.to_text).
+
+        Returns:
+            Tuple[List[Plan], int]: Planes encontrados (el primer precio bajo cada
+            encabezado, con su símbolo de moneda y su periodo) y número total de líneas
+            con importes.
+        """
+        plans, heading, price_lines = [], None, 0
+        for line in text.splitlines():
+            stripped = line.strip()
+            if stripped.startswith("#"):
+                name = stripped.lstrip("#").strip()
+                heading = name if 0 < len(name) <= MAX_PLAN_NAME_CHARS else None
+                continue
+            if ANY_PRICE_PATTERN.search(stripped):
+                price_lines += 1
+            match = CARD_PRICE_PATTERN.search(stripped)
+            if match and heading is not None:
+                amount = (match.group("amount") or match.group("amount2")).replace(",", ".")
+                plans.append((heading, float(amount), match.group("symbol") or match.group("symbol2"),
+                              normalize_period(match.group("period"))))
+                heading = None
+        return plans, price_lines
@@ -0,0 +1,236 @@
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlparse
+from src.utils.loggingDecorator import log_operation, get_logger
+from src.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+AUTO_METHOD = "Auto"
+
+
+class ScrapeStrategy:
+    """
+    Selección adaptativa del método de scraping por dominio.
+
+    Mientras no conoce un host, lanza a la vez todos los métodos registrados en el
+    Scraper (BeautifulSoup, Jina AI y los añadidos con add_scrape_function), se
+    queda con el primer resultado válido y descarta el resto. De cada intento
+    aprende la tasa de éxito y la latencia por host y método, y las guarda en
+    SQLite; cuando un método es fiable para un host, las siguientes peticiones van
+    directamente al más rápido de ellos y solo se recurre a la carrera si falla.
+
+    Attributes:
+        scraper (Scraper): Scraper con las funciones de scraping registradas.
+        path (str | None): Ruta del fichero SQLite con las estadísticas (None para no persistirlas).
+        min_content_chars (int): Longitud mínima de un resultado para considerarlo válido.
+        min_attempts (int): Intentos necesarios antes de confiar en las estadísticas de un método.
+        min_success_rate (float): Tasa de éxito mínima de un método para usarlo directamente.
+    """
+
+    def __init__(self, scraper: Any, path: str | None = None, min_content_chars: int = 200,
+                 min_attempts: int = 3, min_success_rate: float = 0.8, max_workers: int = 8):
+        """
+        Inicializa la instancia de ScrapeStrategy.
+
+        Args:
+            scraper (Scraper): Scraper con las funciones de scraping registradas.
+            path (str | None): Ruta del fichero SQLite con las estadísticas. Se crea si no existe.
+            min_content_chars (int): Longitud mínima de un resultado válido.
+            min_attempts (int): Intentos necesarios antes de confiar en un método.
+            min_success_rate (float): Tasa de éxito mínima para usar un método directamente.
+            max_workers (int): Número máximo de métodos ejecutándose a la vez.
+        """
+        self.scraper = scraper
+        self.path = path
+        self.min_content_chars = min_content_chars
+        self.min_attempts = min_attempts
+        self.min_success_rate = min_success_rate
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scrape-race")
+        # (host, método) -> [intentos, éxitos, latencia total de los éxitos]
+        self._stats: Dict[Tuple[str, str], List[float]] = {}
+        self._conn = None
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS scrape_stats (
+                    host TEXT NOT NULL,
+                    method TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    successes INTEGER NOT NULL,
+                    total_latency REAL NOT NULL,
+                    PRIMARY KEY (host, method)
+                )
+            """)
+            self._conn.commit()
+            for host, method, attempts, successes, total_latency in self._conn.execute(
+                    "SELECT host, method, attempts, successes, total_latency FROM scrape_stats"):
+                self._stats[host, method] = [attempts, successes, total_latency]
+        logger.info(f"ScrapeStrategy inicializada con estadísticas de {len(self._stats)} pares host/método")
+
+    def register(self):
+        """
+        Registra la estrategia en el Scraper como la función de scraping 'Auto', si no lo está ya.
+        """
+        if AUTO_METHOD not in [f["name"] for f in self.scraper.get_scrape_functions()]:
+            self.scraper.add_scrape_function(AUTO_METHOD, self.scrape_content)
+
+    def methods(self) -> List[str]:
+        """
+        Devuelve los métodos de scraping que pueden competir.
+
+        Returns:
+            List[str]: Nombres de las funciones registradas en el Scraper, salvo 'Auto'.
+        """
+        return [f["name"] for f in self.scraper.get_scrape_functions() if f["name"] != AUTO_METHOD]
+
+    def is_valid(self, content: Any) -> bool:
+        return isinstance(content, str) and len(content.strip()) >= self.min_content_chars
+
+    def _record(self, host: str, method: str, success: bool, latency: float):
+        with self._lock:
+            stats = self._stats.setdefault((host, method), [0, 0, 0.0])
+            stats[0] += 1
+            if success:
+                stats[1] += 1
+                stats[2] += latency
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO scrape_stats (host, method, attempts, successes, total_latency) "
+                    "VALUES (?, ?, ?, ?, ?)", (host, method, *stats)
+                )
+                self._conn.commit()
+        metrics.inc("scrape_attempts_total", method=method, result="ok" if success else "error")
+
+    def stats(self, host: str) -> Dict[str, Dict[str, float]]:
+        """
+        Devuelve las estadísticas aprendidas para un host.
+
+        Args:
+            host (str): Host (netloc) de la URL.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Por método, 'attempts', 'success_rate' y
+            'mean_latency' (de los intentos correctos).
+        """
+        with self._lock:
+            items = [(method, list(values)) for (h, method), values in self._stats.items() if h == host]
+        return {
+            method: {
+                "attempts": attempts,
+                "success_rate": successes / attempts if attempts else 0.0,
+                "mean_latency": total_latency / successes if successes else float("inf")
+            }
+            for method, (attempts, successes, total_latency) in items
+        }
+
+    def best_method(self, host: str) -> str | None:
+        """
+        Elige el método más rápido entre los fiables para un host.
+
+        Args:
+            host (str): Host (netloc) de la URL.
+
+        Returns:
+            str | None: Nombre del método, o None si todavía no hay ninguno fiable.
+        """
+        available = set(self.methods())
+        reliable = [
+            (stats["mean_latency"], method) for method, stats in self.stats(host).items()
+            if method in available and stats["attempts"] >= self.min_attempts
+            and stats["success_rate"] >= self.min_success_rate
+        ]
+        return min(reliable)[1] if reliable else None
+
+    def _attempt(self, host: str, method: str, url: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            content = self.scraper.get_scrape_function(method)(url)
+            error = None if self.is_valid(content) else "Contenido vacío o demasiado corto"
+        except Exception as e:
+            content, error = None, str(e)
+        elapsed = time.perf_counter() - start
+        self._record(host, method, error is None, elapsed)
+        return {"url": url, "method": method, "content": content, "error": error, "elapsed": elapsed}
+
+    def race(self, url: str, methods: List[str]) -> Dict[str, Any]:
+        """
+        Lanza varios métodos a la vez y devuelve el primer resultado válido.
+
+        Los métodos que aún no han empezado se cancelan; los que ya están en curso
+        terminan en segundo plano (una petición HTTP síncrona no puede interrumpirse),
+        pero su resultado solo se usa para actualizar las estadísticas.
+
+        Args:
+            url (str): URL a scrapear.
+            methods (List[str]): Métodos que compiten.
+
+        Returns:
+            Dict[str, Any]: Resultado con las claves 'url', 'method', 'content', 'error' y 'elapsed'.
+        """
+        host = urlparse(url).netloc
+        pending: set[Future] = {self._executor.submit(self._attempt, host, method, url) for method in methods}
+        errors = []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result["error"] is None:
+                    for loser in pending:
+                        loser.cancel()
+                    return result
+                errors.append(f"{result['method']}: {result['error']}")
+        return {"url": url, "method": None, "content": None, "error": "; ".join(errors), "elapsed": None}
+
+    @log_operation
+    def scrape(self, url: str) -> Dict[str, Any]:
+        """
+        Scrapea una URL con el mejor método conocido para su host o, si no lo hay, con una carrera.
+
+        Args:
+            url (str): URL a scrapear.
+
+        Returns:
+            Dict[str, Any]: Resultado con las claves 'url', 'method', 'content', 'error' y 'elapsed'.
+        """
+        host = urlparse(url).netloc
+        methods = self.methods()
+        best = self.best_method(host)
+        if best is not None:
+            result = self._attempt(host, best, url)
+            if result["error"] is None:
+                return result
+            logger.warning(f"{best} ha fallado para {host}; se prueban los demás métodos")
+            methods = [method for method in methods if method != best]
+        result = self.race(url, methods)
+        if result["error"] is None:
+            logger.info(f"{result['method']} ha ganado la carrera para {host} en {result['elapsed']:.2f}s")
+        return result
+
+    def scrape_content(self, url: str) -> str:
+        """
+        Igual que scrape, pero con la firma de una función de scraping.
+
+        Args:
+            url (str): URL a scrapear.
+
+        Returns:
+            str: Contenido de la página.
+
+        Raises:
+            RuntimeError: Si ningún método obtiene un resultado válido.
+        """
+        result = self.scrape(url)
+        if result["error"] is not None:
+            raise RuntimeError(f"Ningún método de scraping ha funcionado para {url}: {result['error']}")
+        return result["content"]
@@ -1,7 +1,15 @@
+import asyncio
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Callable, Iterable, AsyncIterator, Any, Tuple
+from urllib.parse import urlparse
+
 import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict, Callable
+from src.utils.http_cache import HttpCache
+from src.utils.http_client import HttpClient
 from src.utils.loggingDecorator import log_operation, get_logger
+from src.utils.metrics import metrics
 
 logger = get_logger(__name__)
 
@@ -14,12 +22,29 @@ class Scraper:
 
     Attributes:
         scrape_functions (List[Dict[str, Callable]]): Lista de funciones de scraping disponibles.
+        http_client (HttpClient): Cliente HTTP compartido por todos los métodos de scraping.
+        cache (HttpCache | None): Caché en disco de las respuestas, si está habilitada.
+        parse_html (bool): Si es False, el método BeautifulSoup devuelve el HTML sin
+            parsearlo, para que lo parsee la CpuStage en un pool de procesos.
     """
 
-    def __init__(self):
+    def __init__(self, http_client: HttpClient | None = None, cache: HttpCache | None = None,
+                 parse_html: bool = True):
         """
         Inicializa la instancia de Scraper con funciones de scraping predefinidas.
+
+        Args:
+            http_client (HttpClient | None): Cliente HTTP a utilizar. Si no se indica,
+                se crea uno con la configuración por defecto.
+            cache (HttpCache | None): Caché en disco de las respuestas. Si no se indica,
+                todas las peticiones se descargan completas.
+            parse_html (bool): Parsear y normalizar el HTML con BeautifulSoup al scrapear.
+                Con False se devuelve el documento decodificado y el parseo queda para la
+                etapa de reducción (por ejemplo, en una CpuStage).
         """
+        self.http_client = http_client or HttpClient()
+        self.cache = cache
+        self.parse_html = parse_html
         self.scrape_functions = [
             {"name": "BeautifulSoup", "function": self.beautiful_soup_scrape_url},
             {"name": "JinaAI", "function": self.scrape_jina_ai}
@@ -41,10 +66,15 @@ class Scraper:
             requests.RequestException: Si ocurre un error al hacer la solicitud HTTP.
         """
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            return str(soup)
+            content, encoding = self._fetch(url, "BeautifulSoup")
+            if not self.parse_html:
+                return content.decode(encoding or "utf-8", errors="replace")
+            from bs4 import BeautifulSoup
+            # Siempre html.parser: el HTML devuelto no debe depender de los backends instalados
+            # (lxml repara los fragmentos de otra forma); los backends rápidos solo se usan en HtmlReducer
+            with metrics.span("parse", parser="html.parser"):
+                soup = BeautifulSoup(content, 'html.parser')
+                return str(soup)
         except requests.RequestException as e:
             logger.error(f"Error al scrapear {url} con BeautifulSoup: {e}")
             raise
@@ -64,13 +94,35 @@ class Scraper:
             requests.RequestException: Si ocurre un error al hacer la solicitud HTTP.
         """
         try:
-            response = requests.get("https://r.jina.ai/" + url)
-            response.raise_for_status()
-            return response.text
+            content, encoding = self._fetch(url, "JinaAI", "https://r.jina.ai/" + url)
+            return content.decode(encoding or "utf-8", errors="replace")
         except requests.RequestException as e:
             logger.error(f"Error al scrapear {url} con Jina AI: {e}")
             raise
 
+    def _fetch(self, url: str, method: str, request_url: str | None = None) -> Tuple[bytes, str | None]:
+        """
+        Descarga una página pasando por la caché en disco si está habilitada.
+
+        Args:
+            url (str): URL de la página.
+            method (str): Nombre del método de scraping que la solicita.
+            request_url (str | None): URL a solicitar realmente, si difiere de url.
+
+        Returns:
+            Tuple[bytes, str | None]: Cuerpo de la respuesta y su codificación.
+
+        Raises:
+            requests.RequestException: Si ocurre un error al hacer la solicitud HTTP.
+        """
+        with metrics.span("scrape", method=method, url=url):
+            if self.cache is not None:
+                return self.cache.fetch(self.http_client, url, method, request_url)
+            response = self.http_client.get(request_url or url)
+            response.raise_for_status()
+            metrics.inc("bytes_downloaded_total", len(response.content), method=method)
+            return response.content, response.encoding or response.apparent_encoding
+
     @log_operation
     def get_scrape_functions(self) -> List[Dict[str, Callable[[str], str]]]:
         """
@@ -91,4 +143,96 @@ class Scraper:
             function (Callable[[str], str]): La función de scraping a añadir.
         """
         self.scrape_functions.append({"name": name, "function": function})
-        logger.info(f"Nueva función de scraping añadida: {name}")
\ No newline at end of file
+        logger.info(f"Nueva función de scraping añadida: {name}")
+
+    def get_scrape_function(self, name: str) -> Callable[[str], str]:
+        """
+        Obtiene una función de scraping registrada por su nombre.
+
+        Args:
+            name (str): Nombre de la función de scraping.
+
+        Returns:
+            Callable[[str], str]: La función de scraping correspondiente.
+
+        Raises:
+            ValueError: Si no existe ninguna función registrada con ese nombre.
+        """
+        for scrape_function in self.scrape_functions:
+            if scrape_function["name"] == name:
+                return scrape_function["function"]
+        raise ValueError(f"Función de scraping no encontrada: {name}")
+
+    async def scrape_many(self, urls: Iterable[str], method: str = "BeautifulSoup",
+                          max_concurrency: int = 10, per_host_limit: int = 2) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Scrapea varias URLs de forma concurrente y entrega los resultados según terminan.
+
+        Las funciones de scraping son síncronas, por lo que se ejecutan en un pool de
+        hilos propio. Un semáforo global limita el número total de peticiones en curso
+        y un semáforo por host evita saturar un mismo dominio.
+
+        Args:
+            urls (Iterable[str]): URLs a scrapear.
+            method (str): Nombre de la función de scraping registrada a utilizar.
+            max_concurrency (int): Número máximo de peticiones simultáneas.
+            per_host_limit (int): Número máximo de peticiones simultáneas por host.
+
+        Yields:
+            Dict[str, Any]: Diccionario con las claves 'url', 'method', 'content',
+            'error' y 'elapsed' por cada URL, en orden de finalización.
+        """
+        function = self.get_scrape_function(method)
+        global_semaphore = asyncio.Semaphore(max_concurrency)
+        host_semaphores = defaultdict(lambda: asyncio.Semaphore(per_host_limit))
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="scraper")
+
+        async def scrape_one(url: str) -> Dict[str, Any]:
+            # Primero el límite por host, para no ocupar huecos globales mientras se espera
+            async with host_semaphores[urlparse(url).netloc]:
+                async with global_semaphore:
+                    start = time.perf_counter()
+                    try:
+                        content = await loop.run_in_executor(executor, function, url)
+                        error = None
+                    except Exception as e:
+                        logger.error(f"Error al scrapear {url} con {method}: {e}")
+                        content, error = None, str(e)
+                    return {
+                        "url": url,
+                        "method": method,
+                        "content": content,
+                        "error": error,
+                        "elapsed": time.perf_counter() - start
+                    }
+
+        tasks = [asyncio.create_task(scrape_one(url)) for url in urls]
+        logger.info(f"Scraping concurrente de {len(tasks)} URLs con {method} "
+                    f"(max_concurrency={max_concurrency}, per_host_limit={per_host_limit})")
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def scrape_all(self, urls: Iterable[str], method: str = "BeautifulSoup",
+                   max_concurrency: int = 10, per_host_limit: int = 2) -> List[Dict[str, Any]]:
+        """
+        Versión síncrona de scrape_many que devuelve todos los resultados en una lista.
+
+        Args:
+            urls (Iterable[str]): URLs a scrapear.
+            method (str): Nombre de la función de scraping registrada a utilizar.
+            max_concurrency (int): Número máximo de peticiones simultáneas.
+            per_host_limit (int): Número máximo de peticiones simultáneas por host.
+
+        Returns:
+            List[Dict[str, Any]]: Resultados en orden de finalización.
+        """
+        async def collect() -> List[Dict[str, Any]]:
+            return [result async for result in self.scrape_many(urls, method, max_concurrency, per_host_limit)]
+
+        return asyncio.run(collect())
\ No newline at end of file
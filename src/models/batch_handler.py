@@ -0,0 +1,163 @@
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+from src.utils.loggingDecorator import log_operation, get_logger
+
+logger = get_logger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+FINAL_BATCH_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class OpenAIBatchHandler:
+    """
+    Manejador del modo batch de la API de OpenAI para extracciones masivas.
+
+    Serializa las peticiones en un fichero JSONL, lo sube y crea el batch, consulta su
+    estado periódicamente y recorre el fichero de resultados en streaming. Reutiliza
+    el cliente, el modelo y el formato de respuesta de un OpenAIHandler.
+
+    Attributes:
+        client (OpenAI): Cliente de OpenAI.
+        model (str): Modelo utilizado en las completaciones.
+        response_format (Dict[str, Any]): Formato de respuesta solicitado a la API.
+        completion_window (str): Ventana de finalización del batch.
+        poll_interval (float): Segundos entre consultas del estado del batch.
+    """
+
+    def __init__(self, openai_handler: Any, completion_window: str = "24h", poll_interval: float = 30):
+        """
+        Inicializa la instancia de OpenAIBatchHandler.
+
+        Args:
+            openai_handler (Any): Instancia de OpenAIHandler cuyo cliente se reutiliza.
+            completion_window (str): Ventana de finalización del batch.
+            poll_interval (float): Segundos entre consultas del estado del batch.
+        """
+        self.client = openai_handler.client
+        self.model = openai_handler.model
+        self.response_format = openai_handler.response_format
+        self.completion_window = completion_window
+        self.poll_interval = poll_interval
+
+    def write_requests(self, requests: Iterable[Dict[str, Any]], path: str) -> List[str]:
+        """
+        Serializa las peticiones en el formato JSONL de la Batch API.
+
+        Args:
+            requests (Iterable[Dict[str, Any]]): Peticiones con las claves 'custom_id' y 'messages'.
+            path (str): Ruta del fichero JSONL a escribir.
+
+        Returns:
+            List[str]: custom_id de las peticiones escritas, en orden.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        custom_ids = []
+        with open(path, "w", encoding="utf-8") as file:
+            for request in requests:
+                line = {
+                    "custom_id": request["custom_id"],
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": {
+                        "model": self.model,
+                        "messages": request["messages"],
+                        "response_format": self.response_format
+                    }
+                }
+                file.write(json.dumps(line, ensure_ascii=False) + "\n")
+                custom_ids.append(request["custom_id"])
+        logger.info(f"{len(custom_ids)} peticiones escritas en {path}")
+        return custom_ids
+
+    @log_operation
+    def submit(self, path: str) -> str:
+        """
+        Sube el fichero de peticiones y crea el batch.
+
+        Args:
+            path (str): Ruta del fichero JSONL de peticiones.
+
+        Returns:
+            str: Identificador del batch creado.
+        """
+        with open(path, "rb") as file:
+            input_file = self.client.files.create(file=file, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=self.completion_window
+        )
+        logger.info(f"Batch {batch.id} creado con el fichero {input_file.id}")
+        return batch.id
+
+    def wait(self, batch_id: str, timeout: float | None = None) -> Any:
+        """
+        Espera a que el batch alcance un estado final.
+
+        Args:
+            batch_id (str): Identificador del batch.
+            timeout (float | None): Segundos máximos de espera (None para esperar sin límite).
+
+        Returns:
+            Any: Objeto Batch en su estado final.
+
+        Raises:
+            TimeoutError: Si el batch no termina dentro del timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status in FINAL_BATCH_STATUSES:
+                logger.info(f"Batch {batch_id} finalizado con estado {batch.status}")
+                return batch
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"El batch {batch_id} no ha terminado en {timeout}s")
+            logger.info(f"Batch {batch_id} en estado {batch.status}; nueva consulta en {self.poll_interval}s")
+            time.sleep(self.poll_interval)
+
+    def iter_results(self, batch: Any) -> Iterator[Tuple[str, str | None]]:
+        """
+        Recorre en streaming los resultados de un batch finalizado.
+
+        Args:
+            batch (Any): Objeto Batch devuelto por wait.
+
+        Yields:
+            Tuple[str, str | None]: custom_id y contenido de la respuesta, o None si la
+            petición falló.
+        """
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            with self.client.files.with_streaming_response.content(file_id) as response:
+                for line in response.iter_lines():
+                    if not line.strip():
+                        continue
+                    result = json.loads(line)
+                    yield result["custom_id"], self._result_content(result)
+
+    @staticmethod
+    def _result_content(result: Dict[str, Any]) -> str | None:
+        """
+        Extrae el contenido de la respuesta de una línea de resultados.
+
+        Args:
+            result (Dict[str, Any]): Línea del fichero de resultados.
+
+        Returns:
+            str | None: Contenido del mensaje, o None si la petición falló.
+        """
+        response = result.get("response") or {}
+        if result.get("error") or response.get("status_code") != 200:
+            logger.error(f"Petición {result.get('custom_id')} fallida en el batch: "
+                         f"{result.get('error') or response.get('status_code')}")
+            return None
+        try:
+            return response["body"]["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            logger.error(f"Respuesta sin contenido para {result.get('custom_id')}")
+            return None
@@ -1,12 +1,61 @@
 import os
 import json
-from typing import List, Dict
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Dict, Any, Callable, Iterator, Iterable, NamedTuple, Tuple
 from dotenv import load_dotenv
-from openai import OpenAI
+from src.utils.json_stream import IncrementalJSONParser
+from src.utils.llm_cache import LLMCache
 from src.utils.loggingDecorator import log_operation, get_logger
+from src.utils.metrics import metrics
 
 logger = get_logger(__name__)
 
+# Acumulador de uso activo en el contexto actual (ver track_usage)
+_usage: ContextVar[Dict[str, int] | None] = ContextVar("llm_usage", default=None)
+_usage_lock = threading.Lock()
+
+
+class Completion(NamedTuple):
+    content: str
+    prompt_tokens: int
+    completion_tokens: int
+    cached: bool
+
+
+@contextmanager
+def track_usage() -> Iterator[Dict[str, int]]:
+    """
+    Acumula el uso de la API de las completaciones hechas dentro del bloque.
+
+    Incluye las de los hilos que ejecutan su trabajo en una copia del contexto actual
+    (como los chunks de ContentProcessor). Los aciertos de caché no suman tokens.
+
+    Yields:
+        Dict[str, int]: Claves 'prompt_tokens', 'completion_tokens', 'calls' y
+        'cached_calls', actualizadas según terminan las completaciones.
+    """
+    usage = {"prompt_tokens": 0, "completion_tokens": 0, "calls": 0, "cached_calls": 0}
+    token = _usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage.reset(token)
+
+
+def _add_usage(completion: Completion):
+    usage = _usage.get()
+    if usage is None:
+        return
+    with _usage_lock:
+        usage["prompt_tokens"] += completion.prompt_tokens
+        usage["completion_tokens"] += completion.completion_tokens
+        usage["calls"] += 1
+        usage["cached_calls"] += completion.cached
+
+
 class OpenAIHandler:
     """
     Manejador para interactuar con la API de OpenAI.
@@ -17,15 +66,25 @@ class OpenAIHandler:
     Attributes:
         api_key (str): Clave API de OpenAI.
         client (OpenAI): Cliente de OpenAI inicializado.
+        model (str): Modelo utilizado en las completaciones.
+        response_format (Dict[str, Any]): Formato de respuesta solicitado a la API.
+        cache (LLMCache | None): Caché de respuestas, si está habilitada.
     """
 
     @log_operation
-    def __init__(self):
+    def __init__(self, model: str = "gpt-4o-mini", cache: LLMCache | None = None, base_url: str | None = None):
         """
         Inicializa la instancia de OpenAIHandler.
 
         Carga la clave API desde un archivo .env y configura el cliente de OpenAI.
 
+        Args:
+            model (str): Modelo utilizado en las completaciones.
+            cache (LLMCache | None): Caché de respuestas. Si se indica, las peticiones
+                idénticas se sirven desde ella sin llamar a la API.
+            base_url (str | None): URL base alternativa de la API (por ejemplo, un servidor
+                local que la emule). Por defecto se usa la de OpenAI.
+
         Raises:
             ValueError: Si no se encuentra la clave API de OpenAI en el archivo .env.
         """
@@ -34,33 +93,175 @@ class OpenAIHandler:
         if not self.api_key:
             logger.error("No se encontró la clave API de OpenAI en el archivo .env")
             raise ValueError("No se encontró la clave API de OpenAI. Asegúrate de tener un archivo .env con OPENAI_API_KEY definido.")
-        self.client = OpenAI(api_key=self.api_key)
+        from openai import OpenAI
+        self.client = OpenAI(api_key=self.api_key, base_url=base_url)
+        self.model = model
+        self.response_format = {"type": "json_object"}
+        self.cache = cache
         logger.info("OpenAIHandler inicializado correctamente")
 
     @log_operation
-    def get_completion(self, messages: List[Dict[str, str]]) -> str:
+    def get_completion(self, messages: List[Dict[str, str]], before_request: Callable[[], Any] | None = None) -> str:
         """
         Obtiene una completación de la API de OpenAI.
 
         Args:
             messages (List[Dict[str, str]]): Lista de mensajes para la conversación con la API.
+            before_request (Callable[[], Any] | None): Función que se llama justo antes de
+                la petición a la API, y no en los aciertos de caché; por ejemplo, para
+                reservar el hueco del RateLimiter solo cuando la petición es real.
 
         Returns:
             str: Contenido de la respuesta de la API en formato JSON.
+        """
+        return self.complete(messages, before_request).content
 
-        Raises:
-            Exception: Si ocurre un error durante la llamada a la API.
+    def complete(self, messages: List[Dict[str, str]], before_request: Callable[[], Any] | None = None) -> Completion:
+        """
+        Obtiene una completación junto con el uso de tokens informado por la API.
+
+        Args:
+            messages (List[Dict[str, str]]): Lista de mensajes para la conversación con la API.
+            before_request (Callable[[], Any] | None): Función que se llama justo antes de
+                la petición a la API, como en get_completion.
+
+        Returns:
+            Completion: Contenido de la respuesta (JSON, con una clave 'error' si la llamada
+            falla), tokens de prompt y de respuesta facturados y si se ha servido desde la
+            caché. Un acierto de caché o un error no consumen tokens.
         """
+        completion = self._complete(messages, before_request)
+        _add_usage(completion)
+        return completion
+
+    def _complete(self, messages: List[Dict[str, str]], before_request: Callable[[], Any] | None) -> Completion:
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(self.model, messages, self.response_format)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("Respuesta obtenida de la caché del LLM")
+                metrics.inc("cache_requests_total", cache="llm", result="hit")
+                return Completion(cached, 0, 0, True)
+            metrics.inc("cache_requests_total", cache="llm", result="miss")
+
+        if before_request is not None:
+            before_request()
         try:
             logger.info(f"Realizando llamada a la API de OpenAI con {len(messages)} mensajes")
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=messages,
-                stream=False,
-                response_format={"type": "json_object"}
-            )
+            with metrics.span("llm", model=self.model):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    stream=False,
+                    response_format=self.response_format
+                )
             logger.info("Llamada a la API completada exitosamente")
-            return response.choices[0].message.content
+            self._record_usage(response.usage)
+            content = response.choices[0].message.content
+            if cache_key is not None and content is not None:
+                self.cache.put(cache_key, self.model, content)
+            usage = response.usage
+            return Completion(content, getattr(usage, "prompt_tokens", 0) or 0,
+                              getattr(usage, "completion_tokens", 0) or 0, False)
         except Exception as e:
             logger.error(f"Error en la llamada a la API de OpenAI: {e}")
-            return json.dumps({"error": str(e)})
\ No newline at end of file
+            return Completion(json.dumps({"error": str(e)}), 0, 0, False)
+
+    def stream_tokens(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        """
+        Obtiene una completación en streaming, fragmento a fragmento.
+
+        Si el consumidor deja de iterar, el stream se cierra y la generación se cancela.
+
+        Args:
+            messages (List[Dict[str, str]]): Lista de mensajes para la conversación con la API.
+
+        Yields:
+            str: Fragmentos de texto de la respuesta según llegan.
+        """
+        logger.info(f"Realizando llamada en streaming a la API de OpenAI con {len(messages)} mensajes")
+        # Se mide a mano: un span abierto en un generador quedaría activo en el contexto del consumidor
+        start = time.perf_counter()
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True},
+            response_format=self.response_format
+        )
+        try:
+            for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    self._record_usage(chunk.usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            stream.close()
+            metrics.observe("stage_latency_seconds", time.perf_counter() - start, stage="llm_stream")
+
+    def _record_usage(self, usage: Any):
+        """
+        Registra los tokens de prompt y de respuesta informados por la API.
+
+        Args:
+            usage (Any): Campo usage de la respuesta de la API (puede ser None).
+        """
+        if usage is None:
+            return
+        metrics.inc("llm_tokens_total", usage.prompt_tokens or 0, kind="prompt", model=self.model)
+        metrics.inc("llm_tokens_total", usage.completion_tokens or 0, kind="completion", model=self.model)
+
+    def stream_completion(self, messages: List[Dict[str, str]],
+                          required_keys: Iterable[str] | None = None) -> Iterator[Tuple[str, Any]]:
+        """
+        Obtiene una completación JSON en streaming, entregando cada clave al cerrarse.
+
+        Cada par clave/valor del objeto de primer nivel se entrega en cuanto su valor
+        está completo. Si se indican required_keys, el stream se cancela en cuanto
+        todas ellas han llegado.
+
+        Args:
+            messages (List[Dict[str, str]]): Lista de mensajes para la conversación con la API.
+            required_keys (Iterable[str] | None): Claves tras las cuales se puede cancelar.
+
+        Yields:
+            Tuple[str, Any]: Pares (clave, valor) del objeto JSON de la respuesta. Si ocurre
+            un error se entrega ("error", mensaje).
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(self.model, messages, self.response_format)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("Respuesta obtenida de la caché del LLM")
+                metrics.inc("cache_requests_total", cache="llm", result="hit")
+                try:
+                    yield from json.loads(cached).items()
+                    return
+                except (json.JSONDecodeError, AttributeError):
+                    logger.warning("Respuesta en caché no válida; se solicita de nuevo")
+            metrics.inc("cache_requests_total", cache="llm", result="miss")
+
+        pending = set(required_keys or ())
+        parser = IncrementalJSONParser()
+        fragments = []
+        tokens = self.stream_tokens(messages)
+        try:
+            for fragment in tokens:
+                fragments.append(fragment)
+                for key, value in parser.feed(fragment):
+                    pending.discard(key)
+                    yield key, value
+                if required_keys is not None and not pending:
+                    logger.info("Todas las claves requeridas recibidas; se cancela el stream")
+                    break
+        except Exception as e:
+            logger.error(f"Error en la llamada en streaming a la API de OpenAI: {e}")
+            yield "error", str(e)
+            return
+        finally:
+            tokens.close()
+
+        if cache_key is not None and parser.closed:
+            self.cache.put(cache_key, self.model, "".join(fragments))
@@ -1,54 +1,299 @@
 import json
 import os
-from typing import List, Dict
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, List
+from urllib.parse import urlsplit
 from src.utils.loggingDecorator import log_operation, get_logger
 
 logger = get_logger(__name__)
 
 
+def normalize_url(url: str) -> str:
+    """
+    Normaliza una URL para detectar sitios duplicados.
+
+    Ignora el esquema, las mayúsculas del host, el prefijo www., el puerto por
+    defecto, el fragmento y la barra final.
+
+    Args:
+        url (str): URL a normalizar.
+
+    Returns:
+        str: Clave normalizada (host, ruta y consulta).
+    """
+    parts = urlsplit(url.strip() if "://" in url else "https://" + url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    key = host + parts.path.rstrip("/")
+    return f"{key}?{parts.query}" if parts.query else key
+
+
 class CompetitorSites:
-    def __init__(self, filename: str):
+    """
+    Registro de sitios competidores respaldado por SQLite.
+
+    Mantiene en memoria un índice por nombre y por URL normalizada, de modo que las
+    búsquedas son O(1) y los duplicados se descartan al insertar. Cada alta es una
+    transacción de SQLite, sin reescribir ningún fichero. El fichero JSON sigue
+    siendo editable: en cada arranque se sincroniza con la base de datos (los sitios
+    nuevos se añaden y los cambios de URL o de nombre se aplican). Los sitios dados de
+    alta desde la aplicación solo se guardan en la base de datos, que es el registro
+    completo; save_sites los exporta al JSON. Quitar un sitio del JSON no lo borra.
+
+    Attributes:
+        filename (str): Ruta del fichero JSON heredado.
+        db_path (str): Ruta de la base de datos SQLite del registro.
+    """
+
+    def __init__(self, filename: str, db_path: str | None = None):
+        """
+        Inicializa la instancia de CompetitorSites.
+
+        Args:
+            filename (str): Ruta del fichero JSON heredado. Sus sitios se sincronizan con
+                la base de datos al crear la instancia.
+            db_path (str | None): Ruta de la base de datos. Por defecto, la del JSON con
+                extensión .db.
+        """
         self.filename = filename
-        self.sites = self.load_sites()
-        logger.info(f"CompetitorSites inicializado con el archivo {filename}")
+        self.db_path = db_path or os.path.splitext(filename)[0] + ".db"
+        self._lock = threading.Lock()
+        self._by_name: Dict[str, Dict[str, str]] = {}
+        self._by_url: Dict[str, Dict[str, str]] = {}
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sites (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                url TEXT NOT NULL,
+                url_key TEXT NOT NULL UNIQUE,
+                added_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+        self.sync_json(filename)
+        logger.info(f"CompetitorSites inicializado con {len(self._by_name)} sitios en {self.db_path}")
+
+    @property
+    def sites(self) -> List[Dict[str, str]]:
+        return self.get_sites()
 
     @log_operation
     def load_sites(self) -> List[Dict[str, str]]:
-        try:
-            # Asegurarse de que el directorio existe
-            os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+        """
+        Carga los sitios de la base de datos y reconstruye los índices en memoria.
+
+        Returns:
+            List[Dict[str, str]]: Sitios en orden de alta.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT name, url, url_key FROM sites ORDER BY id").fetchall()
+            self._by_name.clear()
+            self._by_url.clear()
+            for name, url, url_key in rows:
+                site = {"name": name, "url": url}
+                self._by_name[name] = site
+                self._by_url[url_key] = site
+        return self.get_sites()
+
+    @staticmethod
+    def read_json(filename: str) -> List[Dict[str, str]]:
+        """
+        Lee una lista de sitios de un fichero JSON.
+
+        Args:
+            filename (str): Ruta del fichero con una lista de objetos {'name', 'url'}.
 
-            # Intentar abrir el archivo
-            with open(self.filename, 'r') as file:
+        Returns:
+            List[Dict[str, str]]: Sitios leídos, o una lista vacía si el fichero no existe
+            o no es válido.
+        """
+        try:
+            with open(filename, 'r') as file:
                 sites = json.load(file)
-            logger.info(f"Sitios cargados exitosamente desde {self.filename}")
+            logger.info(f"Sitios cargados exitosamente desde {filename}")
             return sites
         except FileNotFoundError:
-            logger.warning(f"Archivo {self.filename} no encontrado. Creando nuevo archivo.")
+            logger.warning(f"Archivo {filename} no encontrado. Iniciando con lista vacía.")
             return []
         except json.JSONDecodeError:
-            logger.error(f"Error al decodificar JSON desde {self.filename}. Iniciando con lista vacía.")
+            logger.error(f"Error al decodificar JSON desde {filename}. Iniciando con lista vacía.")
             return []
 
     @log_operation
-    def save_sites(self):
-        try:
-            # Asegurarse de que el directorio existe
-            os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+    def save_sites(self, filename: str | None = None):
+        """
+        Exporta el registro como JSON de forma atómica.
+
+        Se escribe un fichero temporal en el mismo directorio y se renombra, de modo
+        que una interrupción nunca deja el fichero a medias.
 
-            with open(self.filename, 'w') as file:
-                json.dump(self.sites, file, indent=4)
-            logger.info(f"Sitios guardados exitosamente en {self.filename}")
+        Args:
+            filename (str | None): Ruta de destino. Por defecto, el fichero JSON heredado.
+        """
+        filename = filename or self.filename
+        directory = os.path.dirname(filename) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False) as file:
+                json.dump(self.get_sites(), file, indent=4)
+            os.replace(file.name, filename)
+            logger.info(f"Sitios guardados exitosamente en {filename}")
         except IOError as e:
-            logger.error(f"Error al guardar sitios en {self.filename}: {str(e)}")
+            logger.error(f"Error al guardar sitios en {filename}: {str(e)}")
             raise
 
     @log_operation
-    def add_site(self, name: str, url: str):
-        new_site = {"name": name, "url": url}
-        self.sites.append(new_site)
-        self.save_sites()
-        logger.info(f"Sitio añadido: {new_site}")
+    def sync_json(self, filename: str | None = None) -> int:
+        """
+        Sincroniza los sitios de un fichero JSON con la base de datos.
+
+        Cada sitio del JSON se empareja por nombre o por URL normalizada: si no existe
+        se añade, si su URL ha cambiado se actualiza y si solo ha cambiado su nombre se
+        renombra. Los sitios cuyo nombre y URL pertenecen a dos sitios distintos del
+        registro se ignoran con un aviso.
+
+        Args:
+            filename (str | None): Ruta del fichero. Por defecto, el fichero JSON heredado.
+
+        Returns:
+            int: Número de sitios añadidos o actualizados.
+        """
+        self.load_sites()
+        now = time.time()
+        changes = 0
+        with self._lock, self._conn:
+            by_name = {name: site["url"] for name, site in self._by_name.items()}
+            by_url = {url_key: site["name"] for url_key, site in self._by_url.items()}
+            for site in self.read_json(filename or self.filename):
+                name, url = site["name"].strip(), site["url"].strip()
+                url_key = normalize_url(url)
+                owner = by_url.get(url_key)
+                if not name or (name in by_name and by_name[name] == url and owner == name):
+                    continue
+                if name in by_name and owner in (None, name):
+                    self._conn.execute("UPDATE sites SET url = ?, url_key = ? WHERE name = ?", (url, url_key, name))
+                    by_url.pop(normalize_url(by_name[name]), None)
+                elif name not in by_name and owner is not None:
+                    self._conn.execute("UPDATE sites SET name = ?, url = ? WHERE url_key = ?", (name, url, url_key))
+                    by_name.pop(owner)
+                elif name not in by_name:
+                    self._conn.execute("INSERT INTO sites (name, url, url_key, added_at) VALUES (?, ?, ?, ?)",
+                                       (name, url, url_key, now))
+                else:
+                    logger.warning(f"Sitio del JSON ignorado: {name} ({url}) choca con {owner}")
+                    continue
+                by_name[name] = url
+                by_url[url_key] = name
+                changes += 1
+        if changes:
+            logger.info(f"{changes} sitios sincronizados desde {filename or self.filename}")
+            self.load_sites()
+        return changes
+
+    @log_operation
+    def add_site(self, name: str, url: str) -> bool:
+        """
+        Añade un sitio si no existe ya otro con el mismo nombre o la misma URL.
+
+        Args:
+            name (str): Nombre del sitio.
+            url (str): URL de la página de precios.
+
+        Returns:
+            bool: True si se ha añadido, False si era un duplicado.
+        """
+        added = self.add_sites([{"name": name, "url": url}]) == 1
+        if added:
+            logger.info(f"Sitio añadido: {name} ({url})")
+        else:
+            logger.warning(f"Sitio duplicado ignorado: {name} ({url})")
+        return added
+
+    def add_sites(self, sites: Iterable[Dict[str, str]]) -> int:
+        """
+        Añade muchos sitios en una sola transacción, descartando los duplicados.
+
+        Args:
+            sites (Iterable[Dict[str, str]]): Sitios con las claves 'name' y 'url'.
+
+        Returns:
+            int: Número de sitios añadidos.
+        """
+        now = time.time()
+        with self._lock:
+            new_sites = []
+            for site in sites:
+                name, url = site["name"].strip(), site["url"].strip()
+                url_key = normalize_url(url)
+                if not name or name in self._by_name or url_key in self._by_url:
+                    continue
+                entry = {"name": name, "url": url}
+                self._by_name[name] = entry
+                self._by_url[url_key] = entry
+                new_sites.append((name, url, url_key, now))
+            try:
+                with self._conn:
+                    self._conn.executemany("INSERT INTO sites (name, url, url_key, added_at) VALUES (?, ?, ?, ?)",
+                                           new_sites)
+            except sqlite3.Error:
+                # La transacción se ha deshecho: los índices deben volver a reflejar la base de datos
+                for name, _, url_key, _ in new_sites:
+                    self._by_name.pop(name, None)
+                    self._by_url.pop(url_key, None)
+                raise
+        if len(new_sites) > 1:
+            logger.info(f"{len(new_sites)} sitios importados")
+        return len(new_sites)
+
+    @log_operation
+    def import_json(self, filename: str) -> int:
+        """
+        Importa en bloque los sitios de un fichero JSON.
+
+        Args:
+            filename (str): Ruta del fichero con una lista de objetos {'name', 'url'}.
+
+        Returns:
+            int: Número de sitios añadidos (los duplicados se descartan).
+        """
+        return self.add_sites(self.read_json(filename))
+
+    def get_site(self, name: str) -> Dict[str, str] | None:
+        """
+        Busca un sitio por su nombre.
+
+        Args:
+            name (str): Nombre del sitio.
+
+        Returns:
+            Dict[str, str] | None: El sitio o None si no existe.
+        """
+        return self._by_name.get(name)
+
+    def get_site_by_url(self, url: str) -> Dict[str, str] | None:
+        """
+        Busca un sitio por su URL, sin distinguir variantes equivalentes.
+
+        Args:
+            url (str): URL del sitio.
+
+        Returns:
+            Dict[str, str] | None: El sitio o None si no existe.
+        """
+        return self._by_url.get(normalize_url(url))
 
     def get_sites(self) -> List[Dict[str, str]]:
-        return self.sites
\ No newline at end of file
+        # Los diccionarios conservan el orden de inserción, que es el orden de alta
+        return list(self._by_name.values())
@@ -0,0 +1,295 @@
+import math
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
+from itertools import chain, count, repeat
+from typing import Dict, FrozenSet, List, NamedTuple, Sequence, Tuple
+
+NON_ALPHANUMERIC = re.compile(r"[^\w]+")
+NGRAM_SIZE = 3
+# Con hasta este número de esperadas se compara cada generada con todas directamente:
+# construir y recorrer los índices cuesta más que los propios pares
+PAIRWISE_FEATURES = 24
+
+
+class PreparedFeature(NamedTuple):
+    normalized: str
+    tokens: FrozenSet[str]
+    ngrams: FrozenSet[str]
+
+
+@lru_cache(maxsize=8192)
+def normalize(text: str) -> str:
+    """
+    Normaliza una característica: minúsculas, sin puntuación y con los espacios colapsados.
+    """
+    return " ".join(NON_ALPHANUMERIC.sub(" ", text.lower()).split())
+
+
+@lru_cache(maxsize=8192)
+def prepare(text: str) -> PreparedFeature:
+    """
+    Normaliza una característica y calcula sus conjuntos de tokens y n-gramas.
+
+    Se cachea porque las mismas características se repiten entre tiers y sitios, de
+    modo que cada texto distinto se normaliza una sola vez. Cada entrada ocupa solo
+    lo que ocupan sus propios tokens y n-gramas.
+
+    Args:
+        text (str): Texto de la característica.
+
+    Returns:
+        PreparedFeature: Texto normalizado (minúsculas, sin puntuación, espacios
+        colapsados) y los conjuntos de sus tokens y n-gramas de caracteres.
+    """
+    normalized = normalize(text)
+    tokens = normalized.split()
+    if not tokens:
+        return PreparedFeature(normalized, frozenset(), frozenset([" " * (NGRAM_SIZE - 1)]))
+    # Los n-gramas de " a b " son los de " a " y " b " más los que cruzan el espacio ("a b")
+    crossing = {f"{left[-1]} {right[0]}" for left, right in zip(tokens, tokens[1:])}
+    ngrams = frozenset().union(crossing, *map(_token_ngrams, tokens))
+    return PreparedFeature(normalized, frozenset(tokens), ngrams)
+
+
+@lru_cache(maxsize=8192)
+def _token_ngrams(token: str) -> FrozenSet[str]:
+    # Los tokens se repiten mucho más que las características: sus n-gramas se calculan una vez
+    padded = f" {token} "
+    return frozenset(padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1))
+
+
+def jaccard(a: PreparedFeature, b: PreparedFeature) -> float:
+    """
+    Similitud de Jaccard de los n-gramas de caracteres de dos características.
+    """
+    overlap = len(a.ngrams & b.ngrams)
+    return overlap / (len(a.ngrams) + len(b.ngrams) - overlap)
+
+
+def similarity(a: PreparedFeature, b: PreparedFeature) -> float:
+    """
+    Similitud de a con b: 1 si todos los tokens de a aparecen en b y, si no, la
+    similitud de Jaccard de sus n-gramas de caracteres.
+    """
+    if a.tokens and a.tokens <= b.tokens:
+        return 1.0
+    return jaccard(a, b)
+
+
+def _prefix_length(size: int, threshold: float) -> int:
+    # Dos conjuntos con Jaccard >= threshold comparten al menos ceil(threshold * size) elementos,
+    # así que comparten alguno de los size - ceil(threshold * size) + 1 primeros de cada uno
+    return size - math.ceil(threshold * size - 1e-9) + 1
+
+
+class FeatureIndex:
+    """
+    Características esperadas de un tier, preparadas una vez para compararlas con
+    cualquier número de listas generadas.
+
+    Con pocas esperadas cada generada se compara con todas directamente. Con más se
+    construyen un índice invertido de tokens (para la inclusión) y un índice de
+    prefijos de n-gramas: ordenados los n-gramas de menos a más frecuentes, dos
+    características con Jaccard >= threshold comparten alguno de sus primeros
+    n-gramas, de modo que solo se puntúan las esperadas que comparten uno de ellos
+    con la generada. Las puntuaciones de cada texto generado se guardan (hasta un
+    límite proporcional al número de esperadas), de modo que las características que
+    se repiten entre evaluaciones, o que solo cambian en mayúsculas o puntuación, no
+    se vuelven a puntuar.
+
+    Attributes:
+        features (List[str]): Características esperadas, en el orden de entrada.
+        prepared (List[PreparedFeature]): Característica preparada de cada esperada.
+        threshold (float): Similitud mínima con la que se construye el índice.
+    """
+
+    def __init__(self, features: Sequence[str], threshold: float, pairwise_features: int = PAIRWISE_FEATURES):
+        """
+        Inicializa la instancia de FeatureIndex.
+
+        Args:
+            features (Sequence[str]): Características esperadas.
+            threshold (float): Similitud mínima que interesa; las menores se omiten.
+            pairwise_features (int): Número de esperadas hasta el que se compara cada
+                generada con todas directamente, sin índices.
+        """
+        self.features = list(features)
+        self.prepared = [prepare(text) for text in self.features]
+        self.threshold = threshold
+        # Puntuaciones por texto generado y por texto normalizado
+        self._scores: Dict[str, List[Tuple[int, float]]] = {}
+        self._scores_limit = 4 * len(self.features) + 64
+        self._sizes = [len(feature.ngrams) for feature in self.prepared]
+        # Una característica sin tokens no está incluida en ninguna: su conjunto de tokens no
+        # puede ser subconjunto de ningún otro ({None} no lo es de ningún conjunto de textos)
+        self._token_sets = [feature.tokens or frozenset([None]) for feature in self.prepared]
+        self._pairwise = len(self.features) <= pairwise_features
+        if self._pairwise:
+            # Sin índices el orden de los n-gramas no importa
+            ngrams = dict.fromkeys(chain.from_iterable(feature.ngrams for feature in self.prepared))
+        else:
+            ngrams = self._build_indexes()
+        # Cada n-grama es también un bit, para contar los n-gramas compartidos con un AND
+        self._bits = dict(zip(ngrams, map((1).__lshift__, count())))
+        self._masks = [sum(map(self._bits.__getitem__, feature.ngrams)) for feature in self.prepared]
+
+    def _build_indexes(self) -> List[str]:
+        self._token_counts = [len(feature.tokens) for feature in self.prepared]
+        self._token_index: Dict[str, List[int]] = defaultdict(list)
+        for i, feature in enumerate(self.prepared):
+            for token in feature.tokens:
+                self._token_index[token].append(i)
+
+        frequencies = Counter(chain.from_iterable(feature.ngrams for feature in self.prepared))
+        # El orden entre n-gramas igual de frecuentes no afecta al resultado, solo a los candidatos
+        ordered = sorted(frequencies, key=frequencies.__getitem__)
+        self._ranks = dict(zip(ordered, count()))
+        self._prefix_index: Dict[int, List[int]] = defaultdict(list)
+        for i, feature in enumerate(self.prepared):
+            ranks = sorted(map(self._ranks.__getitem__, feature.ngrams))
+            for rank in ranks[:_prefix_length(len(ranks), self.threshold)]:
+                self._prefix_index[rank].append(i)
+        return ordered
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def scores(self, text: str) -> List[Tuple[int, float]]:
+        """
+        Puntúa una característica generada contra todas las esperadas.
+
+        Args:
+            text (str): Característica generada.
+
+        Returns:
+            List[Tuple[int, float]]: Pares (posición de la esperada, similitud) de las
+            esperadas con similitud mayor o igual que threshold, en orden creciente.
+        """
+        scores = self._scores.get(text)
+        if scores is None:
+            normalized = normalize(text)
+            scores = self._scores.get(normalized)
+            if scores is None:
+                scores = self._score(prepare(text))
+                if len(self._scores) < self._scores_limit:
+                    self._scores[normalized] = scores
+            if len(self._scores) < self._scores_limit:
+                self._scores[text] = scores
+        return scores
+
+    def _score(self, feature: PreparedFeature) -> List[Tuple[int, float]]:
+        threshold, ngrams, tokens = self.threshold, feature.ngrams, feature.tokens
+        size, sizes = len(ngrams), self._sizes
+        mask = sum(map(self._bits.get, ngrams, repeat(0)))
+        if self._pairwise:
+            contained = map(tokens.issuperset, self._token_sets)
+            overlaps = map(int.bit_count, map(mask.__and__, self._masks))
+            scores = [(i, 1.0 if inside else overlap / (other + size - overlap))
+                      for i, inside, overlap, other in zip(count(), contained, overlaps, sizes)]
+            return [item for item in scores if item[1] >= threshold]
+
+        shared = Counter(chain.from_iterable(map(self._token_index.get, tokens, repeat(()))))
+        token_counts = self._token_counts
+        scores = {i: 1.0 for i, found in shared.items() if found == token_counts[i]}
+        if threshold > 0:
+            # Los n-gramas que no aparecen en ninguna esperada (rango -1) van primero en el orden
+            ranks = sorted(map(self._ranks.get, ngrams, repeat(-1)))
+            prefix = ranks[:_prefix_length(len(ranks), threshold)]
+            candidates = set(chain.from_iterable(map(self._prefix_index.get, prefix, repeat(()))))
+            candidates.difference_update(scores)
+        else:
+            candidates = set(range(len(self.prepared))).difference(scores)
+        if candidates:
+            # La similitud de Jaccard nunca supera el cociente entre el menor y el mayor de los tamaños
+            low, high = threshold * size - 1e-9, (size / threshold if threshold > 0 else math.inf) + 1e-9
+            masks = self._masks
+            for i in candidates:
+                if low <= sizes[i] <= high:
+                    overlap = (mask & masks[i]).bit_count()
+                    score = overlap / (sizes[i] + size - overlap)
+                    if score >= threshold:
+                        scores[i] = score
+        return sorted(scores.items())
+
+
+class FeatureMatcher:
+    """
+    Emparejamiento aproximado de listas de características.
+
+    Compara características por sus tokens y n-gramas de caracteres normalizados:
+    una característica esperada coincide con una generada si todos sus tokens
+    aparecen en ella o si la similitud de Jaccard de sus n-gramas supera el umbral.
+    Las esperadas se preparan en un FeatureIndex, que puede construirse una vez con
+    index() y reutilizarse para cada lista generada (ver FeatureIndex). El resultado
+    no depende del orden de evaluación ni de si se compara por pares o con índices.
+
+    Attributes:
+        threshold (float): Similitud mínima para considerar que dos características coinciden.
+        pairwise_features (int): Número de esperadas hasta el que se compara por pares.
+    """
+
+    def __init__(self, threshold: float = 0.7, pairwise_features: int = PAIRWISE_FEATURES):
+        """
+        Inicializa la instancia de FeatureMatcher.
+
+        Args:
+            threshold (float): Similitud mínima (entre 0 y 1) para considerar una coincidencia.
+            pairwise_features (int): Número de esperadas hasta el que se compara cada
+                generada con todas directamente, sin índices.
+        """
+        self.threshold = threshold
+        self.pairwise_features = pairwise_features
+
+    def index(self, expected: Sequence[str]) -> FeatureIndex:
+        """
+        Prepara las características esperadas para compararlas con varias listas generadas.
+
+        Args:
+            expected (Sequence[str]): Características esperadas.
+
+        Returns:
+            FeatureIndex: Características preparadas con el umbral del matcher.
+        """
+        return FeatureIndex(expected, self.threshold, self.pairwise_features)
+
+    def match(self, expected: Sequence[str] | FeatureIndex, generated: Sequence[str]) -> Dict[str, List]:
+        """
+        Empareja las características esperadas con las generadas.
+
+        Args:
+            expected (Sequence[str] | FeatureIndex): Características esperadas, o su
+                índice si ya se han preparado con index().
+            generated (Sequence[str]): Características generadas.
+
+        Returns:
+            Dict[str, List]: Claves 'matched' (pares (esperada, generada, similitud) con la
+            mejor coincidencia de cada esperada; en caso de empate, la primera generada),
+            'missing' (esperadas sin coincidencia) y 'extra' (generadas que no coinciden
+            con ninguna esperada), en el orden de entrada.
+
+        Raises:
+            ValueError: Si el índice se construyó con otro umbral.
+        """
+        if not isinstance(expected, FeatureIndex):
+            expected = self.index(expected)
+        elif expected.threshold != self.threshold:
+            raise ValueError("El índice se construyó con otro umbral")
+
+        best_scores = [0.0] * len(expected)
+        best_indexes = [-1] * len(expected)
+        extra = []
+        for j, scores in enumerate(map(expected.scores, generated)):
+            if not scores:
+                extra.append(generated[j])
+            for i, score in scores:
+                if best_indexes[i] < 0 or score > best_scores[i]:
+                    best_scores[i], best_indexes[i] = score, j
+
+        matched, missing = [], []
+        for i, text in enumerate(expected.features):
+            if best_indexes[i] >= 0:
+                matched.append((text, generated[best_indexes[i]], best_scores[i]))
+            else:
+                missing.append(text)
+        return {"matched": matched, "missing": missing, "extra": extra}
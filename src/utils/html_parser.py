@@ -0,0 +1,60 @@
+import importlib.util
+from typing import List, Tuple
+from src.utils.loggingDecorator import get_logger
+
+logger = get_logger(__name__)
+
+# Backends de BeautifulSoup, del más rápido al más lento
+BS4_PARSERS: Tuple[str, ...] = ("lxml", "html.parser")
+# Todos los backends, incluido el parser rápido selectolax (solo para extracción de texto)
+PARSER_PREFERENCE: Tuple[str, ...] = ("selectolax",) + BS4_PARSERS
+
+_PARSER_MODULES = {"selectolax": "selectolax", "lxml": "lxml", "html.parser": None}
+
+
+def is_parser_available(name: str) -> bool:
+    """
+    Indica si un backend de parseo está instalado.
+
+    Args:
+        name (str): Nombre del backend ('selectolax', 'lxml' o 'html.parser').
+
+    Returns:
+        bool: True si el backend puede utilizarse.
+    """
+    if name not in _PARSER_MODULES:
+        return False
+    module = _PARSER_MODULES[name]
+    return module is None or importlib.util.find_spec(module) is not None
+
+
+def available_parsers(allowed: Tuple[str, ...] = PARSER_PREFERENCE) -> List[str]:
+    """
+    Lista los backends instalados en orden de preferencia.
+
+    Args:
+        allowed (Tuple[str, ...]): Backends a considerar, en orden de preferencia.
+
+    Returns:
+        List[str]: Backends disponibles.
+    """
+    return [name for name in allowed if is_parser_available(name)]
+
+
+def resolve_parser(preferred: str | None = None, allowed: Tuple[str, ...] = PARSER_PREFERENCE) -> str:
+    """
+    Elige el backend de parseo a utilizar.
+
+    Args:
+        preferred (str | None): Backend solicitado. Si es None se elige el más rápido
+            disponible; si no está instalado se recurre al siguiente disponible.
+        allowed (Tuple[str, ...]): Backends aceptables, en orden de preferencia.
+
+    Returns:
+        str: Nombre del backend elegido ('html.parser' siempre está disponible).
+    """
+    if preferred is not None:
+        if preferred in allowed and is_parser_available(preferred):
+            return preferred
+        logger.warning(f"Parser {preferred} no disponible; se usará el siguiente disponible")
+    return available_parsers(allowed)[0]
@@ -0,0 +1,241 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Tuple
+from src.utils.loggingDecorator import log_operation, get_logger
+from src.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+
+class HttpCache:
+    """
+    Caché persistente en disco para las respuestas de las páginas scrapeadas.
+
+    Las respuestas se guardan en SQLite con la clave (URL, método de scraping) junto
+    con sus cabeceras ETag y Last-Modified. Dentro del TTL se sirven directamente
+    desde disco; pasado el TTL se revalidan con una petición condicional. El tamaño
+    total se limita expulsando las entradas usadas hace más tiempo (LRU).
+
+    Attributes:
+        path (str): Ruta del fichero SQLite.
+        ttl_seconds (float): Segundos durante los que una entrada se sirve sin revalidar.
+        max_bytes (int): Tamaño máximo en bytes de los cuerpos almacenados.
+        hits (int): Respuestas servidas desde la caché sin petición.
+        revalidations (int): Respuestas 304 servidas desde la caché.
+        misses (int): Respuestas descargadas completas.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 3600, max_bytes: int = 200 * 1024 * 1024):
+        """
+        Inicializa la instancia de HttpCache.
+
+        Args:
+            path (str): Ruta del fichero SQLite. Se crea si no existe.
+            ttl_seconds (float): Segundos durante los que una entrada se sirve sin revalidar.
+            max_bytes (int): Tamaño máximo en bytes de los cuerpos almacenados.
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT NOT NULL,
+                method TEXT NOT NULL,
+                body BLOB NOT NULL,
+                encoding TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (url, method)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+        logger.info(f"HttpCache inicializada en {path} (ttl={ttl_seconds}s, max_bytes={max_bytes})")
+
+    def get(self, url: str, method: str) -> Dict[str, Any] | None:
+        """
+        Obtiene una entrada de la caché y actualiza su instante de último acceso.
+
+        Args:
+            url (str): URL de la página.
+            method (str): Nombre del método de scraping.
+
+        Returns:
+            Dict[str, Any] | None: Entrada con las claves 'body', 'encoding', 'etag',
+            'last_modified' y 'stored_at', o None si no existe.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, encoding, etag, last_modified, stored_at FROM responses WHERE url = ? AND method = ?",
+                (url, method)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ? AND method = ?",
+                               (time.time(), url, method))
+            self._conn.commit()
+        body, encoding, etag, last_modified, stored_at = row
+        return {"body": body, "encoding": encoding, "etag": etag,
+                "last_modified": last_modified, "stored_at": stored_at}
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """
+        Indica si una entrada puede servirse sin revalidar.
+
+        Args:
+            entry (Dict[str, Any]): Entrada devuelta por get.
+
+        Returns:
+            bool: True si la entrada está dentro del TTL.
+        """
+        return time.time() - entry["stored_at"] < self.ttl_seconds
+
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any] | None) -> Dict[str, str]:
+        """
+        Construye las cabeceras de una petición condicional para una entrada.
+
+        Args:
+            entry (Dict[str, Any] | None): Entrada devuelta por get.
+
+        Returns:
+            Dict[str, str]: Cabeceras If-None-Match / If-Modified-Since aplicables.
+        """
+        headers = {}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url: str, method: str, body: bytes, encoding: str | None = None,
+            etag: str | None = None, last_modified: str | None = None):
+        """
+        Guarda o reemplaza una respuesta y aplica la política de expulsión.
+
+        Args:
+            url (str): URL de la página.
+            method (str): Nombre del método de scraping.
+            body (bytes): Cuerpo de la respuesta.
+            encoding (str | None): Codificación del cuerpo.
+            etag (str | None): Valor de la cabecera ETag.
+            last_modified (str | None): Valor de la cabecera Last-Modified.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, method, body, encoding, etag, last_modified, size, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, method, body, encoding, etag, last_modified, len(body), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, url: str, method: str):
+        """
+        Marca una entrada como recién validada tras recibir un 304.
+
+        Args:
+            url (str): URL de la página.
+            method (str): Nombre del método de scraping.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ? AND method = ?",
+                               (now, now, url, method))
+            self._conn.commit()
+
+    def fetch(self, http_client: Any, url: str, method: str,
+              request_url: str | None = None) -> Tuple[bytes, str | None]:
+        """
+        Obtiene una página usando la caché y peticiones condicionales.
+
+        Args:
+            http_client (Any): Cliente con un método get compatible con HttpClient.
+            url (str): URL de la página, usada como clave de la caché.
+            method (str): Nombre del método de scraping, usado como clave de la caché.
+            request_url (str | None): URL a solicitar realmente, si difiere de url.
+
+        Returns:
+            Tuple[bytes, str | None]: Cuerpo de la respuesta y su codificación.
+
+        Raises:
+            requests.RequestException: Si la petición falla y no hay copia en caché utilizable.
+        """
+        entry = self.get(url, method)
+        if entry and self.is_fresh(entry):
+            self.hits += 1
+            metrics.inc("cache_requests_total", cache="http", result="hit")
+            return entry["body"], entry["encoding"]
+
+        response = http_client.get(request_url or url, headers=self.conditional_headers(entry))
+        if response.status_code == 304 and entry:
+            self.revalidations += 1
+            metrics.inc("cache_requests_total", cache="http", result="revalidated")
+            self.refresh(url, method)
+            return entry["body"], entry["encoding"]
+
+        response.raise_for_status()
+        self.misses += 1
+        metrics.inc("cache_requests_total", cache="http", result="miss")
+        metrics.inc("bytes_downloaded_total", len(response.content), method=method)
+        encoding = response.encoding or response.apparent_encoding
+        self.put(url, method, response.content, encoding,
+                 response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return response.content, encoding
+
+    def _evict(self):
+        """
+        Elimina las entradas menos usadas recientemente hasta respetar max_bytes.
+        """
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for url, method, size in self._conn.execute(
+                "SELECT url, method, size FROM responses ORDER BY accessed_at ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE url = ? AND method = ?", (url, method))
+            total -= size
+            evicted += 1
+        logger.info(f"HttpCache: {evicted} entradas expulsadas por tamaño")
+
+    @log_operation
+    def clear(self):
+        """
+        Elimina todas las entradas de la caché.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Devuelve los contadores de uso de la caché.
+
+        Returns:
+            Dict[str, int]: Aciertos, revalidaciones, fallos, entradas y bytes almacenados.
+        """
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"hits": self.hits, "revalidations": self.revalidations, "misses": self.misses,
+                "entries": entries, "bytes": size}
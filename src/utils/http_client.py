@@ -0,0 +1,150 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Iterable
+
+import requests
+from requests.adapters import HTTPAdapter
+from src.utils.loggingDecorator import get_logger
+
+logger = get_logger(__name__)
+
+
+class HttpClient:
+    """
+    Cliente HTTP con sesión compartida, pool de conexiones, timeouts y reintentos.
+
+    Reutiliza las conexiones keep-alive por host, aplica timeouts de conexión y
+    lectura a todas las peticiones y reintenta con backoff exponencial con jitter
+    las respuestas 429/5xx y los errores de red, respetando la cabecera Retry-After.
+
+    Attributes:
+        session (requests.Session): Sesión HTTP compartida.
+        timeout (tuple[float, float]): Timeouts de conexión y de lectura en segundos.
+        max_retries (int): Número máximo de reintentos por petición.
+        backoff_factor (float): Base en segundos del backoff exponencial.
+        max_backoff (float): Espera máxima en segundos entre reintentos.
+        retry_statuses (frozenset[int]): Códigos de estado HTTP que provocan un reintento.
+    """
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10,
+                 connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 max_retries: int = 3, backoff_factor: float = 0.5, max_backoff: float = 30.0,
+                 retry_statuses: Iterable[int] = (429, 500, 502, 503, 504),
+                 headers: Dict[str, str] | None = None):
+        """
+        Inicializa la instancia de HttpClient.
+
+        Args:
+            pool_connections (int): Número de hosts distintos cuyos pools se mantienen abiertos.
+            pool_maxsize (int): Número máximo de conexiones reutilizables por host.
+            connect_timeout (float): Timeout de conexión en segundos.
+            read_timeout (float): Timeout de lectura en segundos.
+            max_retries (int): Número máximo de reintentos por petición.
+            backoff_factor (float): Base en segundos del backoff exponencial.
+            max_backoff (float): Espera máxima en segundos entre reintentos.
+            retry_statuses (Iterable[int]): Códigos de estado HTTP que provocan un reintento.
+            headers (Dict[str, str] | None): Cabeceras por defecto de la sesión.
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = frozenset(retry_statuses)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if headers:
+            self.session.headers.update(headers)
+        logger.info(f"HttpClient inicializado (pool_maxsize={pool_maxsize}, timeout={self.timeout}, "
+                    f"max_retries={max_retries})")
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Realiza una petición GET con reintentos.
+
+        Args:
+            url (str): URL a solicitar.
+            **kwargs: Argumentos adicionales para requests.Session.get.
+
+        Returns:
+            requests.Response: La última respuesta obtenida. Si se agotan los reintentos
+            sobre un código reintentable se devuelve esa respuesta sin lanzar excepción.
+
+        Raises:
+            requests.RequestException: Si el error de red persiste tras agotar los reintentos.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning(f"Error de red en {url} ({e}); reintento {attempt + 1}/{self.max_retries} "
+                               f"en {delay:.2f}s")
+            else:
+                if response.status_code not in self.retry_statuses or attempt >= self.max_retries:
+                    return response
+                delay = self._retry_delay(attempt, response)
+                logger.warning(f"Respuesta {response.status_code} de {url}; reintento "
+                               f"{attempt + 1}/{self.max_retries} en {delay:.2f}s")
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def _retry_delay(self, attempt: int, response: requests.Response | None = None) -> float:
+        """
+        Calcula la espera antes del siguiente reintento.
+
+        Usa Retry-After si la respuesta lo incluye y, si no, backoff exponencial con
+        jitter completo.
+
+        Args:
+            attempt (int): Número de reintentos ya realizados.
+            response (requests.Response | None): Respuesta que provocó el reintento.
+
+        Returns:
+            float: Segundos de espera.
+        """
+        if response is not None:
+            retry_after = self._parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    @staticmethod
+    def _parse_retry_after(value: str | None) -> float | None:
+        """
+        Interpreta la cabecera Retry-After, en segundos o como fecha HTTP.
+
+        Args:
+            value (str | None): Valor de la cabecera.
+
+        Returns:
+            float | None: Segundos de espera o None si la cabecera no es válida.
+        """
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def close(self):
+        """
+        Cierra la sesión y libera las conexiones del pool.
+        """
+        self.session.close()
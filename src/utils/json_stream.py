@@ -0,0 +1,107 @@
+import json
+from typing import Any, List, Tuple
+from src.utils.loggingDecorator import get_logger
+
+logger = get_logger(__name__)
+
+
+class IncrementalJSONParser:
+    """
+    Parser incremental de un objeto JSON recibido por fragmentos.
+
+    Recorre el texto a medida que llega y entrega cada par clave/valor del objeto
+    de primer nivel en cuanto su valor se cierra, sin esperar al final del documento.
+    Cada carácter se examina una sola vez.
+
+    Attributes:
+        keys (List[str]): Claves de primer nivel completadas hasta el momento.
+    """
+
+    def __init__(self):
+        """
+        Inicializa la instancia de IncrementalJSONParser.
+        """
+        self.keys: List[str] = []
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start: int | None = None
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        """
+        Indica si el objeto de primer nivel ya se ha cerrado.
+
+        Returns:
+            bool: True si se ha recibido la llave de cierre.
+        """
+        return self._closed
+
+    def feed(self, fragment: str) -> List[Tuple[str, Any]]:
+        """
+        Añade un fragmento de texto y devuelve los miembros completados.
+
+        Args:
+            fragment (str): Fragmento recibido del stream.
+
+        Returns:
+            List[Tuple[str, Any]]: Pares (clave, valor) cerrados en este fragmento.
+        """
+        self._text += fragment
+        completed = []
+        text = self._text
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if self._closed:
+                break
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._member_start = i + 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    # Se ha cerrado un valor objeto/lista de primer nivel
+                    self._emit(text[self._member_start:i + 1], completed)
+                    self._member_start = None
+                elif self._depth == 0:
+                    if self._member_start is not None:
+                        self._emit(text[self._member_start:i], completed)
+                    self._closed = True
+            elif char == "," and self._depth == 1:
+                if self._member_start is not None:
+                    self._emit(text[self._member_start:i], completed)
+                self._member_start = i + 1
+        self._pos = len(text)
+        return completed
+
+    def _emit(self, member: str, completed: List[Tuple[str, Any]]):
+        """
+        Decodifica un miembro "clave": valor y lo añade a los completados.
+
+        Args:
+            member (str): Texto del miembro.
+            completed (List[Tuple[str, Any]]): Lista de miembros completados.
+        """
+        if not member.strip():
+            return
+        try:
+            ((key, value),) = json.loads("{" + member + "}").items()
+        except (ValueError, TypeError):
+            logger.warning(f"No se pudo decodificar el miembro JSON: {member[:100]}")
+            return
+        self.keys.append(key)
+        completed.append((key, value))
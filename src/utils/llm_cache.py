@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List
+from src.utils.loggingDecorator import log_operation, get_logger
+
+logger = get_logger(__name__)
+
+
+class LLMCache:
+    """
+    Caché direccionada por contenido para las respuestas del LLM.
+
+    Cada respuesta se guarda en SQLite bajo el hash SHA-256 de la petición
+    (modelo, mensajes y formato de respuesta), de modo que una petición idéntica
+    no vuelve a llamar a la API. Las entradas caducan tras el TTL y, al superar
+    el número máximo de entradas, se expulsan las usadas hace más tiempo (LRU).
+
+    Attributes:
+        path (str): Ruta del fichero SQLite.
+        ttl_seconds (float | None): Segundos de validez de una entrada (None para no caducar).
+        max_entries (int): Número máximo de entradas almacenadas.
+        hits (int): Número de consultas servidas desde la caché.
+        misses (int): Número de consultas no encontradas en la caché.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float | None = 7 * 24 * 3600, max_entries: int = 10_000):
+        """
+        Inicializa la instancia de LLMCache.
+
+        Args:
+            path (str): Ruta del fichero SQLite. Se crea si no existe.
+            ttl_seconds (float | None): Segundos de validez de una entrada (None para no caducar).
+            max_entries (int): Número máximo de entradas almacenadas.
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_accessed ON completions (accessed_at)")
+        self._conn.commit()
+        logger.info(f"LLMCache inicializada en {path} (ttl={ttl_seconds}s, max_entries={max_entries})")
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]], response_format: Dict[str, Any] | None) -> str:
+        """
+        Calcula la clave de caché de una petición.
+
+        Args:
+            model (str): Nombre del modelo.
+            messages (List[Dict[str, str]]): Mensajes de la conversación.
+            response_format (Dict[str, Any] | None): Formato de respuesta solicitado.
+
+        Returns:
+            str: Hash SHA-256 hexadecimal de la petición serializada de forma canónica.
+        """
+        payload = json.dumps({"model": model, "messages": messages, "response_format": response_format},
+                             sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """
+        Obtiene una respuesta almacenada.
+
+        Args:
+            key (str): Clave calculada con make_key.
+
+        Returns:
+            str | None: Contenido de la respuesta, o None si no existe o ha caducado.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT content, created_at FROM completions WHERE key = ?",
+                                     (key,)).fetchone()
+            if row is not None and self.ttl_seconds is not None and now - row[1] >= self.ttl_seconds:
+                self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE completions SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return row[0]
+
+    def put(self, key: str, model: str, content: str):
+        """
+        Guarda una respuesta y aplica la política de expulsión.
+
+        Args:
+            key (str): Clave calculada con make_key.
+            model (str): Nombre del modelo que generó la respuesta.
+            content (str): Contenido de la respuesta.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, model, content, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, content, now, now)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM completions WHERE key IN "
+                    "(SELECT key FROM completions ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+                logger.info(f"LLMCache: {count - self.max_entries} entradas expulsadas")
+            self._conn.commit()
+
+    @log_operation
+    def clear(self):
+        """
+        Elimina todas las entradas de la caché.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Devuelve los contadores de uso de la caché.
+
+        Returns:
+            Dict[str, int]: Aciertos, fallos y número de entradas almacenadas.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
@@ -1,22 +1,135 @@
+import atexit
+import inspect
+import itertools
 import logging
+import logging.handlers
+import queue
 from functools import wraps
+from typing import Iterable
 
 # Configuración del logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def log_operation(func):
+# Longitud máxima con la que se muestra cada argumento en el log
+DEFAULT_MAX_ARG_LENGTH = 200
+REDACTED = "'***'"
+
+
+def _render_value(value, max_length: int) -> str:
+    """
+    Representa un argumento truncándolo a max_length caracteres.
+
+    Las cadenas largas se recortan antes de llamar a repr, de modo que nunca se
+    copia una página completa solo para el log.
+    """
+    if isinstance(value, str) and len(value) > max_length:
+        return f"{value[:max_length]!r}... ({len(value)} caracteres)"
+    text = repr(value)
+    if len(text) > max_length:
+        return f"{text[:max_length]}... ({len(text)} caracteres)"
+    return text
+
+
+class _LazyArguments:
+    """
+    Representación perezosa de los argumentos de una llamada.
+
+    Solo se formatea si el mensaje llega a emitirse, truncando cada valor y
+    ocultando los parámetros indicados en redact.
+    """
+    __slots__ = ("args", "kwargs", "names", "max_length", "redact")
+
+    def __init__(self, args, kwargs, names, max_length, redact):
+        self.args = args
+        self.kwargs = kwargs
+        self.names = names
+        self.max_length = max_length
+        self.redact = redact
+
+    def __str__(self):
+        args = ", ".join(
+            REDACTED if i < len(self.names) and self.names[i] in self.redact
+            else _render_value(arg, self.max_length)
+            for i, arg in enumerate(self.args)
+        )
+        kwargs = ", ".join(
+            f"{key!r}: {REDACTED if key in self.redact else _render_value(value, self.max_length)}"
+            for key, value in self.kwargs.items()
+        )
+        return f"({args}), kwargs: {{{kwargs}}}"
+
+
+def log_operation(func=None, *, level: int = logging.INFO, sample_rate: int = 1,
+                  max_arg_length: int = DEFAULT_MAX_ARG_LENGTH, redact: Iterable[str] = ()):
     """
     Decorador para registrar las operaciones realizadas en una clase.
+
+    Puede usarse directamente (@log_operation) o con opciones
+    (@log_operation(level=logging.DEBUG, sample_rate=10)). El nivel se comprueba
+    antes de hacer ningún formateo y los argumentos se formatean de forma perezosa
+    y truncados.
+
+    Args:
+        func: Función a decorar.
+        level (int): Nivel de logging de los mensajes.
+        sample_rate (int): Registrar solo una de cada sample_rate llamadas.
+        max_arg_length (int): Longitud máxima con la que se muestra cada argumento.
+        redact (Iterable[str]): Nombres de parámetros cuyo valor no debe registrarse.
     """
+    if func is None:
+        return lambda f: log_operation(f, level=level, sample_rate=sample_rate,
+                                       max_arg_length=max_arg_length, redact=redact)
+
+    redact = frozenset(redact)
+    # Nombres de los parámetros posicionales tras self, para poder ocultarlos
+    names = tuple(list(inspect.signature(func).parameters)[1:])
+    calls = itertools.count()
+
     @wraps(func)
     def wrapper(self, *args, **kwargs):
-        logger.info(f"Ejecutando {func.__name__} con args: {args}, kwargs: {kwargs}")
+        if not logger.isEnabledFor(level) or (sample_rate > 1 and next(calls) % sample_rate):
+            return func(self, *args, **kwargs)
+        logger.log(level, "Ejecutando %s con args: %s", func.__name__,
+                   _LazyArguments(args, kwargs, names, max_arg_length, redact))
         result = func(self, *args, **kwargs)
-        logger.info(f"{func.__name__} completado")
+        logger.log(level, "%s completado", func.__name__)
         return result
     return wrapper
 
+
+def enable_async_logging(target: logging.Logger | None = None) -> logging.handlers.QueueListener:
+    """
+    Desacopla la escritura del log del hilo que lo genera.
+
+    Sustituye los handlers del logger por un QueueHandler y los mueve a un
+    QueueListener que escribe desde un hilo propio, de modo que la E/S del log
+    nunca bloquea el scraping ni la extracción. El listener se detiene al salir.
+
+    Args:
+        target (logging.Logger | None): Logger a modificar (por defecto, el raíz).
+
+    Returns:
+        logging.handlers.QueueListener: Listener en ejecución.
+    """
+    target = target or logging.getLogger()
+    handlers = [h for h in target.handlers if not isinstance(h, logging.handlers.QueueHandler)]
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    for handler in handlers:
+        target.removeHandler(handler)
+    target.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener.start()
+
+    def stop_listener():
+        # El listener puede haberse detenido ya manualmente
+        if listener._thread is not None:
+            listener.stop()
+
+    atexit.register(stop_listener)
+    return listener
+
+
 def get_logger(name):
     """
     Obtiene un logger configurado para un módulo específico.
@@ -27,4 +140,4 @@ def get_logger(name):
     Returns:
         logging.Logger: Logger configurado para el módulo especificado.
     """
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
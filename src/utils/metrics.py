@@ -0,0 +1,286 @@
+import contextvars
+import itertools
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+from src.utils.loggingDecorator import get_logger
+
+logger = get_logger(__name__)
+
+METRIC_PREFIX = "llm_scraping_"
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_current_span: contextvars.ContextVar[Dict[str, Any] | None] = contextvars.ContextVar("current_span", default=None)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in pairs) + "}"
+
+
+def percentile(values: List[float], q: float) -> float | None:
+    """
+    Percentil exacto por rango más cercano de una lista de valores.
+
+    Args:
+        values (List[float]): Valores observados, en cualquier orden.
+        q (float): Cuantil entre 0 y 1.
+
+    Returns:
+        float | None: El valor en la posición ceil(q * n) de los valores ordenados, o
+        None si no hay valores.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class Histogram:
+    """
+    Histograma acumulativo con cubos fijos, compatible con el formato de Prometheus.
+
+    Attributes:
+        buckets (Tuple[float, ...]): Límites superiores de los cubos.
+        counts (List[int]): Observaciones por cubo (no acumuladas; el último es +Inf).
+        sum (float): Suma de las observaciones.
+        count (int): Número de observaciones.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float | None:
+        """
+        Estima un cuantil como el límite superior del cubo que lo contiene.
+
+        Args:
+            q (float): Cuantil entre 0 y 1.
+
+        Returns:
+            float | None: Estimación del cuantil o None si no hay observaciones.
+        """
+        if not self.count:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return bound
+        return float("inf")
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas por etapa del pipeline.
+
+    Recoge contadores (bytes descargados, tokens, aciertos de caché...), histogramas
+    de latencia por etapa y spans al estilo de una traza, anidados por sitio. Puede
+    exportarse en formato de texto de Prometheus o como un resumen JSON de la
+    ejecución. Es seguro entre hilos.
+
+    Attributes:
+        max_spans (int): Número máximo de spans conservados (se descartan los más antiguos).
+    """
+
+    def __init__(self, max_spans: int = 10_000):
+        """
+        Inicializa la instancia de MetricsRegistry.
+
+        Args:
+            max_spans (int): Número máximo de spans conservados.
+        """
+        self.max_spans = max_spans
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._spans: deque = deque(maxlen=max_spans)
+        self._span_ids = itertools.count(1)
+        self._started_at = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """
+        Incrementa un contador.
+
+        Args:
+            name (str): Nombre del contador (sin prefijo).
+            value (float): Cantidad a sumar.
+            **labels: Etiquetas del contador.
+        """
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """
+        Registra una observación en un histograma.
+
+        Args:
+            name (str): Nombre del histograma (sin prefijo).
+            value (float): Valor observado.
+            **labels: Etiquetas del histograma.
+        """
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def span(self, stage: str, **attributes) -> Iterator[Dict[str, Any]]:
+        """
+        Mide una etapa como un span de traza y registra su latencia.
+
+        Los spans abiertos dentro de otro quedan como hijos suyos (también entre
+        hilos si se propaga el contexto con contextvars). Los spans raíz abren una
+        nueva traza, normalmente una por sitio.
+
+        Args:
+            stage (str): Nombre de la etapa (scrape, chunk, llm, merge...).
+            **attributes: Atributos del span (sitio, URL, método...).
+
+        Yields:
+            Dict[str, Any]: El span, al que se pueden añadir atributos durante la etapa.
+        """
+        parent = _current_span.get()
+        span = {
+            "trace_id": parent["trace_id"] if parent else uuid.uuid4().hex[:16],
+            "span_id": next(self._span_ids),
+            "parent_id": parent["span_id"] if parent else None,
+            "stage": stage,
+            "attributes": attributes,
+            "start": time.time(),
+            "status": "ok",
+        }
+        token = _current_span.set(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException:
+            span["status"] = "error"
+            raise
+        finally:
+            span["duration"] = time.perf_counter() - start
+            _current_span.reset(token)
+            self.observe("stage_latency_seconds", span["duration"], stage=stage)
+            with self._lock:
+                self._spans.append(span)
+
+    def to_prometheus(self) -> str:
+        """
+        Exporta las métricas en el formato de texto de Prometheus.
+
+        Returns:
+            str: Métricas con sus líneas # TYPE, contadores e histogramas.
+        """
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                metric = f"{METRIC_PREFIX}{name}"
+                lines.append(f"# TYPE {metric} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{metric}{_format_labels(labels)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                metric = f"{METRIC_PREFIX}{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{metric}_bucket{_format_labels(labels, (('le', f'{bound:g}'),))} {cumulative}")
+                    lines.append(f"{metric}_bucket{_format_labels(labels, (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{metric}_sum{_format_labels(labels)} {histogram.sum:g}")
+                    lines.append(f"{metric}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def run_summary(self) -> Dict[str, Any]:
+        """
+        Resume la ejecución: contadores, latencias por etapa y spans.
+
+        Returns:
+            Dict[str, Any]: Resumen serializable como JSON.
+        """
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(labels), "value": value} for labels, value in sorted(series.items())]
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: [{
+                    "labels": dict(labels),
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "mean": histogram.sum / histogram.count if histogram.count else None,
+                    "p50": histogram.quantile(0.5),
+                    "p95": histogram.quantile(0.95),
+                    "p99": histogram.quantile(0.99),
+                } for labels, histogram in sorted(series.items())]
+                for name, series in self._histograms.items()
+            }
+            spans = list(self._spans)
+        return {
+            "started_at": self._started_at,
+            "finished_at": time.time(),
+            "counters": counters,
+            "histograms": histograms,
+            "spans": spans,
+        }
+
+    def write_summary(self, path: str):
+        """
+        Guarda el resumen de la ejecución como JSON.
+
+        Args:
+            path (str): Ruta del fichero a escribir.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.run_summary(), file, indent=2, default=str)
+        logger.info(f"Resumen de métricas guardado en {path}")
+
+    def reset(self):
+        """
+        Elimina todas las métricas y spans registrados.
+        """
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._spans.clear()
+            self._started_at = time.time()
+
+
+# Registro compartido por todos los componentes del proceso
+metrics = MetricsRegistry()
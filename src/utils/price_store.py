@@ -0,0 +1,210 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List
+from src.utils.loggingDecorator import log_operation, get_logger
+
+logger = get_logger(__name__)
+
+NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)?")
+THOUSANDS_SEPARATOR = re.compile(r"(?<=\d),(?=\d{3}\b)")
+
+
+def parse_price(price: Any) -> float | None:
+    """
+    Convierte el precio de un tier en un número.
+
+    Args:
+        price (Any): Precio devuelto por el LLM (número, texto como "$39 / month" o None).
+
+    Returns:
+        float | None: Precio numérico, o None si no contiene ninguno ("Custom", null...).
+    """
+    if isinstance(price, bool):
+        return None
+    if isinstance(price, (int, float)):
+        return float(price)
+    if isinstance(price, str):
+        match = NUMBER_PATTERN.search(THOUSANDS_SEPARATOR.sub("", price))
+        if match:
+            return float(match.group().replace(",", "."))
+    return None
+
+
+def rank_tiers(plans: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Reduce los planes de una respuesta libre a los tiers cheapest, middle y most_expensive.
+
+    Las respuestas del chat usan los nombres de los planes como claves (o responden a
+    preguntas que no son de precios); así se guardan con las mismas claves que la
+    extracción por lotes. Los planes sin precio numérico se descartan.
+
+    Args:
+        plans (Dict[str, Any]): Mapa de plan a {'name', 'price', 'features'}.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Tiers ordenados por precio (el de en medio es el
+        mediano), o un diccionario vacío si ningún plan tiene precio.
+    """
+    priced = [
+        (price, {**details, "name": details.get("name") or plan})
+        for plan, details in plans.items() if isinstance(details, dict)
+        for price in [parse_price(details.get("price"))] if price is not None
+    ]
+    if not priced:
+        return {}
+    # Orden estable: con el mismo precio se conserva el orden de la respuesta
+    tiers = [details for _, details in sorted(priced, key=lambda item: item[0])]
+    return {"cheapest": tiers[0], "middle": tiers[len(tiers) // 2], "most_expensive": tiers[-1]}
+
+
+class PriceStore:
+    """
+    Histórico persistente de los precios extraídos.
+
+    Cada extracción se guarda en SQLite como una fila por tier, indexada por sitio,
+    tier y fecha, de modo que las consultas de "último precio de cada sitio" y de
+    "histórico de un sitio" no necesitan volver a scrapear ni llamar al LLM.
+
+    Attributes:
+        path (str): Ruta del fichero SQLite.
+    """
+
+    def __init__(self, path: str):
+        """
+        Inicializa la instancia de PriceStore.
+
+        Args:
+            path (str): Ruta del fichero SQLite. Se crea si no existe.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS prices (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                site TEXT NOT NULL,
+                tier TEXT NOT NULL,
+                name TEXT,
+                price REAL,
+                price_text TEXT,
+                features TEXT,
+                observed_at REAL NOT NULL
+            )
+        """)
+        # Último precio por sitio e histórico de un sitio (opcionalmente de un tier)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_prices_site_time ON prices (site, observed_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_prices_site_tier_time ON prices (site, tier, observed_at)")
+        self._conn.commit()
+        logger.info(f"PriceStore inicializado en {path}")
+
+    def record(self, site: str, extraction: Dict[str, Any], observed_at: float | None = None) -> int:
+        """
+        Guarda los tiers de una extracción.
+
+        Args:
+            site (str): Nombre del sitio.
+            extraction (Dict[str, Any]): Mapa de tier a {'name', 'price', 'features'}.
+                Las claves que no son tiers (como 'error') se ignoran.
+            observed_at (float | None): Marca de tiempo de la observación. Por defecto, ahora.
+
+        Returns:
+            int: Número de tiers guardados.
+        """
+        observed_at = observed_at or time.time()
+        rows = [
+            (site, tier, details.get("name"), parse_price(details.get("price")),
+             None if details.get("price") is None else str(details.get("price")),
+             json.dumps(details.get("features", []), ensure_ascii=False), observed_at)
+            for tier, details in extraction.items() if isinstance(details, dict)
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO prices (site, tier, name, price, price_text, features, observed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            rows = cursor.fetchall()
+        points = [dict(zip(columns, row)) for row in rows]
+        for point in points:
+            point["features"] = json.loads(point["features"]) if point["features"] else []
+        return points
+
+    def latest(self, site: str | None = None) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Devuelve la última extracción de cada sitio.
+
+        Args:
+            site (str | None): Limitar la consulta a un sitio.
+
+        Returns:
+            Dict[str, Dict[str, Dict[str, Any]]]: Mapa de sitio a tier a su último punto
+            ('name', 'price', 'price_text', 'features', 'observed_at').
+        """
+        sql = ("SELECT p.site, p.tier, p.name, p.price, p.price_text, p.features, p.observed_at FROM prices p "
+               "JOIN (SELECT site, MAX(observed_at) AS observed_at FROM prices {where} GROUP BY site) l "
+               "ON p.site = l.site AND p.observed_at = l.observed_at ORDER BY p.site, p.id")
+        if site is None:
+            points = self._query(sql.format(where=""))
+        else:
+            points = self._query(sql.format(where="WHERE site = ?"), (site,))
+        latest: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for point in points:
+            latest.setdefault(point.pop("site"), {})[point.pop("tier")] = point
+        return latest
+
+    def history(self, site: str, tier: str | None = None, since: float | None = None) -> List[Dict[str, Any]]:
+        """
+        Devuelve el histórico de precios de un sitio en orden cronológico.
+
+        Args:
+            site (str): Nombre del sitio.
+            tier (str | None): Limitar la consulta a un tier.
+            since (float | None): Marca de tiempo mínima.
+
+        Returns:
+            List[Dict[str, Any]]: Puntos con las claves 'tier', 'name', 'price',
+            'price_text', 'features' y 'observed_at'.
+        """
+        conditions, params = ["site = ?"], [site]
+        if tier is not None:
+            conditions.append("tier = ?")
+            params.append(tier)
+        if since is not None:
+            conditions.append("observed_at >= ?")
+            params.append(since)
+        return self._query(
+            "SELECT tier, name, price, price_text, features, observed_at FROM prices "
+            f"WHERE {' AND '.join(conditions)} ORDER BY observed_at, id", tuple(params)
+        )
+
+    def sites(self) -> List[str]:
+        """
+        Devuelve los sitios con algún precio guardado.
+
+        Returns:
+            List[str]: Nombres de los sitios, en orden alfabético.
+        """
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT site FROM prices ORDER BY site")]
+
+    @log_operation
+    def clear(self):
+        """
+        Elimina todo el histórico.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM prices")
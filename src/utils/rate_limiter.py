@@ -0,0 +1,74 @@
+import threading
+import time
+from src.utils.loggingDecorator import get_logger
+
+logger = get_logger(__name__)
+
+
+class RateLimiter:
+    """
+    Planificador token-bucket para respetar los límites de la API de OpenAI.
+
+    Mantiene dos cubos que se rellenan de forma continua: uno de peticiones por
+    minuto (RPM) y otro de tokens por minuto (TPM). Cada llamada debe adquirir una
+    petición y sus tokens estimados antes de enviarse; si no hay saldo suficiente
+    el hilo espera el tiempo justo para que se rellene. Es seguro entre hilos.
+
+    Attributes:
+        requests_per_minute (float): Límite de peticiones por minuto.
+        tokens_per_minute (float): Límite de tokens por minuto.
+    """
+
+    def __init__(self, requests_per_minute: float = 500, tokens_per_minute: float = 200_000):
+        """
+        Inicializa la instancia de RateLimiter con ambos cubos llenos.
+
+        Args:
+            requests_per_minute (float): Límite de peticiones por minuto.
+            tokens_per_minute (float): Límite de tokens por minuto.
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._available_requests = float(requests_per_minute)
+        self._available_tokens = float(tokens_per_minute)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._available_requests = min(self.requests_per_minute,
+                                       self._available_requests + elapsed * self.requests_per_minute / 60)
+        self._available_tokens = min(self.tokens_per_minute,
+                                     self._available_tokens + elapsed * self.tokens_per_minute / 60)
+
+    def acquire(self, tokens: int) -> float:
+        """
+        Bloquea hasta disponer de una petición y de los tokens indicados.
+
+        Args:
+            tokens (int): Tokens estimados de la petición. Si superan el límite por
+                minuto se limitan a él para no bloquear indefinidamente.
+
+        Returns:
+            float: Segundos que se ha esperado.
+        """
+        tokens = min(float(tokens), self.tokens_per_minute)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._available_requests >= 1 and self._available_tokens >= tokens:
+                    self._available_requests -= 1
+                    self._available_tokens -= tokens
+                    if waited:
+                        logger.info(f"RateLimiter: espera de {waited:.2f}s para {int(tokens)} tokens")
+                    return waited
+                wait = max(
+                    (1 - self._available_requests) * 60 / self.requests_per_minute,
+                    (tokens - self._available_tokens) * 60 / self.tokens_per_minute,
+                    0.001
+                )
+            time.sleep(wait)
+            waited += wait
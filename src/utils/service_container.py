@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict
+from src.utils.loggingDecorator import get_logger
+from src.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+
+class ServiceContainer:
+    """
+    Contenedor de servicios compartidos por todo el proceso.
+
+    Crea cada componente (scraper, cliente de OpenAI, tokenizador, procesador de
+    contenido, evaluador...) la primera vez que se usa y lo reutiliza después, de
+    modo que las re-ejecuciones de Streamlit y los distintos consumidores comparten
+    los mismos objetos ya inicializados. Los módulos pesados (tiktoken, openai, bs4)
+    solo se importan al crear el componente que los necesita: los componentes los
+    importan dentro del método que los usa, para no penalizar el arranque.
+
+    Attributes:
+        data_dir (str): Directorio de datos (sitios y cachés).
+        init_times (Dict[str, float]): Segundos empleados en crear cada componente.
+    """
+
+    def __init__(self, data_dir: str = "../data"):
+        """
+        Inicializa la instancia de ServiceContainer sin crear ningún componente.
+
+        Args:
+            data_dir (str): Directorio de datos (sitios y cachés).
+        """
+        self.data_dir = data_dir
+        self.init_times: Dict[str, float] = {}
+        self._services: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def _get(self, name: str, factory: Callable[[], Any]) -> Any:
+        """
+        Devuelve un componente, creándolo la primera vez.
+
+        Args:
+            name (str): Nombre del componente.
+            factory (Callable[[], Any]): Función que crea el componente.
+
+        Returns:
+            Any: El componente compartido.
+        """
+        service = self._services.get(name)
+        if service is not None:
+            return service
+        # RLock: la creación de un componente puede pedir otros componentes
+        with self._lock:
+            if name not in self._services:
+                start = time.perf_counter()
+                self._services[name] = factory()
+                self.init_times[name] = time.perf_counter() - start
+                metrics.observe("stage_latency_seconds", self.init_times[name], stage=f"init_{name}")
+                logger.info(f"Servicio {name} inicializado en {self.init_times[name]:.3f}s")
+            return self._services[name]
+
+    @property
+    def competitor_sites(self):
+        def create():
+            from src.utils.competitor_sites import CompetitorSites
+            return CompetitorSites(os.path.join(self.data_dir, "competitor_sites.json"))
+        return self._get("competitor_sites", create)
+
+    @property
+    def scraper(self):
+        def create():
+            from src.features.scraper import Scraper
+            from src.utils.http_cache import HttpCache
+            return Scraper(cache=HttpCache(os.path.join(self.data_dir, "cache", "http_cache.db")))
+        return self._get("scraper", create)
+
+    @property
+    def scrape_strategy(self):
+        def create():
+            from src.features.scrape_strategy import ScrapeStrategy
+            strategy = ScrapeStrategy(self.scraper, os.path.join(self.data_dir, "cache", "scrape_stats.db"))
+            # Queda disponible en el scraper como el método 'Auto'
+            strategy.register()
+            return strategy
+        return self._get("scrape_strategy", create)
+
+    @property
+    def openai_handler(self):
+        def create():
+            from src.models.openai_handler import OpenAIHandler
+            from src.utils.llm_cache import LLMCache
+            return OpenAIHandler(cache=LLMCache(os.path.join(self.data_dir, "cache", "llm_cache.db")))
+        return self._get("openai_handler", create)
+
+    @property
+    def token_calculator(self):
+        def create():
+            from src.utils.token_cost_calculator import TokenCostCalculator
+            return TokenCostCalculator()
+        return self._get("token_calculator", create)
+
+    @property
+    def content_processor(self):
+        def create():
+            from src.features.chunk_ranker import ChunkRanker
+            from src.features.content_processor import ContentProcessor
+            from src.features.html_reducer import HtmlReducer
+            from src.features.rule_extractor import RuleBasedExtractor
+            reducer = HtmlReducer()
+            return ContentProcessor(self.openai_handler, self.token_calculator, reducer=reducer,
+                                    rule_extractor=RuleBasedExtractor(reducer=reducer),
+                                    chunk_ranker=ChunkRanker())
+        return self._get("content_processor", create)
+
+    @property
+    def change_detector(self):
+        def create():
+            from src.features.change_detector import ChangeDetector
+            return ChangeDetector(os.path.join(self.data_dir, "cache", "fingerprints.db"),
+                                  reducer=self.content_processor.reducer)
+        return self._get("change_detector", create)
+
+    @property
+    def price_store(self):
+        def create():
+            from src.utils.price_store import PriceStore
+            return PriceStore(os.path.join(self.data_dir, "prices.db"))
+        return self._get("price_store", create)
+
+    @property
+    def evaluator(self):
+        def create():
+            from src.features.evaluation import Evaluator
+            return Evaluator(
+                competitor_sites=self.competitor_sites,
+                scraper=self.scraper,
+                openai_handler=self.openai_handler,
+                token_calculator=self.token_calculator,
+                content_processor=self.content_processor
+            )
+        return self._get("evaluator", create)
+
+
+_container: ServiceContainer | None = None
+_container_lock = threading.Lock()
+
+
+def get_container(data_dir: str = "../data") -> ServiceContainer:
+    """
+    Devuelve el contenedor de servicios del proceso, creándolo la primera vez.
+
+    Args:
+        data_dir (str): Directorio de datos; solo se usa al crear el contenedor.
+
+    Returns:
+        ServiceContainer: Contenedor compartido.
+    """
+    global _container
+    if _container is None:
+        with _container_lock:
+            if _container is None:
+                _container = ServiceContainer(data_dir)
+    return _container
@@ -0,0 +1,146 @@
+import re
+from typing import Any, Iterator, List, Tuple
+from src.utils.loggingDecorator import get_logger
+
+logger = get_logger(__name__)
+
+# Puntos de corte preferidos: líneas en blanco, cierres de bloques HTML y encabezados markdown
+BLOCK_BOUNDARY = re.compile(
+    r"\n[ \t]*\n"
+    r"|</(?:p|div|section|article|main|aside|header|footer|nav|li|ul|ol|tr|table|h[1-6]|blockquote|pre)>"
+    r"|\n(?=#{1,6} )",
+    re.IGNORECASE
+)
+
+
+def iter_blocks(content: str) -> Iterator[str]:
+    """
+    Recorre el contenido por bloques HTML/markdown sin copiarlo entero.
+
+    Args:
+        content (str): Contenido a dividir.
+
+    Yields:
+        str: Bloques consecutivos cuya concatenación es el contenido original.
+    """
+    start = 0
+    for match in BLOCK_BOUNDARY.finditer(content):
+        end = match.end()
+        if end > start:
+            yield content[start:end]
+            start = end
+    if start < len(content):
+        yield content[start:]
+
+
+class TokenChunker:
+    """
+    Divisor de contenido en chunks por número real de tokens.
+
+    Acumula bloques HTML/markdown completos mientras quepan en la ventana de
+    tokens y solo corta dentro de un bloque cuando éste, por sí solo, excede el
+    límite. Cada chunk se verifica con el propio tokenizador, de modo que nunca
+    supera max_tokens.
+
+    Attributes:
+        tokenizer: Tokenizador de tiktoken (por ejemplo, el de TokenCostCalculator).
+        max_tokens (int): Número máximo de tokens por chunk.
+        overlap (int): Tokens del final de un chunk que se repiten al inicio del siguiente.
+    """
+
+    def __init__(self, tokenizer: Any, max_tokens: int = 4000, overlap: int = 0):
+        """
+        Inicializa la instancia de TokenChunker.
+
+        Args:
+            tokenizer (Any): Tokenizador con métodos encode y decode.
+            max_tokens (int): Número máximo de tokens por chunk.
+            overlap (int): Tokens de solapamiento entre chunks consecutivos.
+
+        Raises:
+            ValueError: Si max_tokens no es positivo o overlap no es menor que max_tokens.
+        """
+        if max_tokens <= 0:
+            raise ValueError("max_tokens debe ser mayor que 0")
+        if not 0 <= overlap < max_tokens:
+            raise ValueError("overlap debe estar entre 0 y max_tokens - 1")
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        self.overlap = overlap
+
+    def _encode(self, text: str) -> List[int]:
+        return self.tokenizer.encode(text, disallowed_special=())
+
+    def _emit(self, tokens: List[int]) -> Tuple[str, int]:
+        """
+        Decodifica una ventana de tokens garantizando que el texto resultante cabe en max_tokens.
+
+        Al cortar entre tokens puede partirse un carácter multibyte, lo que deja un
+        carácter de reemplazo al final y puede hacer que el texto re-tokenizado ocupe
+        algo más; en ambos casos se recorta la ventana hasta un corte limpio.
+
+        Args:
+            tokens (List[int]): Ventana de tokens a decodificar (como máximo max_tokens).
+
+        Returns:
+            Tuple[str, int]: Texto del chunk y número de tokens de la ventana consumidos.
+        """
+        used = len(tokens)
+        text = self.tokenizer.decode(tokens)
+        excess = len(self._encode(text)) - self.max_tokens
+        while used > 1 and (excess > 0 or text.endswith("\ufffd")):
+            used = max(1, used - max(excess, 1))
+            text = self.tokenizer.decode(tokens[:used])
+            excess = len(self._encode(text)) - self.max_tokens
+        return text, used
+
+    def _advance(self, buffer: List[int], used: int) -> Tuple[List[int], int]:
+        """
+        Descarta los tokens ya emitidos conservando el solapamiento.
+
+        Como en _emit, el corte entre tokens puede partir un carácter multibyte: el
+        solapamiento empieza en el primer token desde el que se decodifica sin un
+        carácter de reemplazo al inicio (o no hay solapamiento si no existe).
+
+        Args:
+            buffer (List[int]): Tokens pendientes.
+            used (int): Tokens del inicio del buffer que se acaban de emitir.
+
+        Returns:
+            Tuple[List[int], int]: Nuevo buffer y número de tokens solapados al inicio.
+        """
+        start = used - self.overlap if used > self.overlap else used
+        while start < used and self.tokenizer.decode(buffer[start:used]).startswith("\ufffd"):
+            start += 1
+        return buffer[start:], used - start
+
+    def iter_chunks(self, content: str) -> Iterator[str]:
+        """
+        Genera los chunks del contenido de forma perezosa.
+
+        Args:
+            content (str): Contenido a dividir.
+
+        Yields:
+            str: Chunks de como máximo max_tokens tokens.
+        """
+        buffer: List[int] = []
+        carried = 0  # tokens del inicio del buffer ya emitidos como solapamiento
+
+        for block in iter_blocks(content):
+            tokens = self._encode(block)
+            if len(buffer) + len(tokens) > self.max_tokens and len(buffer) > carried:
+                text, used = self._emit(buffer)
+                yield text
+                buffer, carried = self._advance(buffer, used)
+            buffer.extend(tokens)
+            # Bloque mayor que la ventana: se corta en ventanas fijas de tokens
+            while len(buffer) > self.max_tokens:
+                text, used = self._emit(buffer[:self.max_tokens])
+                yield text
+                buffer, carried = self._advance(buffer, used)
+
+        while len(buffer) > carried:
+            text, used = self._emit(buffer)
+            yield text
+            buffer, carried = self._advance(buffer, used)
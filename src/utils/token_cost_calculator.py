@@ -1,5 +1,7 @@
-import tiktoken
+import logging
+import time
 from src.utils.loggingDecorator import log_operation, get_logger
+from src.utils.metrics import metrics
 
 logger = get_logger(__name__)
 
@@ -24,13 +26,14 @@ class TokenCostCalculator:
         """
         self.cost_per_million_tokens = cost_per_million_tokens
         try:
+            import tiktoken
             self.tokenizer = tiktoken.get_encoding("cl100k_base")
             logger.info("Tokenizador inicializado correctamente")
         except Exception as e:
             logger.error(f"Error al inicializar el tokenizador: {e}")
             raise
 
-    @log_operation
+    @log_operation(level=logging.DEBUG)
     def count_tokens(self, input_string: str) -> int:
         """
         Cuenta el número de tokens en una cadena de entrada.
@@ -42,8 +45,11 @@ class TokenCostCalculator:
             int: Número de tokens en la cadena de entrada.
         """
         try:
-            tokens = self.tokenizer.encode(input_string)
-            return len(tokens)
+            start = time.perf_counter()
+            num_tokens = len(self.tokenizer.encode(input_string))
+            metrics.observe("stage_latency_seconds", time.perf_counter() - start, stage="tokenize")
+            metrics.inc("tokens_counted_total", num_tokens)
+            return num_tokens
         except Exception as e:
             logger.error(f"Error al contar tokens: {e}")
             raise
@@ -0,0 +1,20 @@
+import tiktoken
+
+from src.utils.token_chunker import TokenChunker
+
+# Caracteres que ocupan varios bytes y que el tokenizador parte entre tokens
+MULTIBYTE_TEXT = "Plan Pro: 39 € al mes · 料金プラン 🚀🚀🚀 Équipe illimitée, soporte en español. " * 40
+
+
+def test_overlap_starts_on_character_boundary():
+    encoding = tiktoken.get_encoding("cl100k_base")
+    chunker = TokenChunker(encoding, max_tokens=37, overlap=11)
+
+    chunks = list(chunker.iter_chunks(MULTIBYTE_TEXT))
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert not chunk.startswith("\ufffd")
+        assert not chunk.endswith("\ufffd")
+        assert chunk in MULTIBYTE_TEXT
+        assert len(encoding.encode(chunk)) <= chunker.max_tokens